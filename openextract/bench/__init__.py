@@ -0,0 +1 @@
+"""Benchmark harness: mock provider server, synthetic corpora and scenarios."""
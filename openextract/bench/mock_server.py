@@ -0,0 +1,366 @@
+"""Local stand-in for an OpenAI-compatible ``/chat/completions`` endpoint.
+
+Used by the benchmarks (and handy for manual testing) so that pipeline
+throughput can be measured without spending API credits. Latency follows a
+configurable distribution, and 429/5xx responses can be injected at fixed
+rates or, with ``capacity``, whenever too many requests are in flight.
+Bodies are either clean JSON or the kinds of non-JSON output models
+produce in practice.
+
+Run standalone:
+    uv run python -m openextract.bench.mock_server --port 8000 --latency-ms 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from openextract.utils.tokens import estimate_messages_tokens
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+BODY_KINDS = ("json", "fenced", "text", "mixed")
+
+_DOC_ID_HEADER = re.compile(r"^### doc_id: (.+)$", re.MULTILINE)
+
+SAMPLE_RESULT = {
+    "文档类型": "通知",
+    "主题领域": "网络安全",
+    "发文目的": "加强网络安全管理",
+    "关键措施": ["建立健全管理制度", "加强技术防护", "定期安全评估"],
+}
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of ``MockChatServer``."""
+
+    latency_ms: float = 200.0  # median / mean, depending on distribution
+    latency_distribution: str = "lognormal"
+    latency_sigma: float = 0.5  # lognormal shape; uniform spans +-sigma*latency
+    error_rate_429: float = 0.0
+    error_rate_5xx: float = 0.0
+    retry_after: float = 1.0
+    body: str = "json"
+    completion_tokens: int = 80  # per document for batched requests
+    batch_drop_rate: float = 0.0  # share of doc_ids left out of batch answers
+    stream_chunk_chars: int = 8  # characters per SSE delta when "stream": true
+    token_interval_ms: float = 2.0  # delay between SSE deltas
+    trailing_chars: int = 0  # prose appended after the answer (a rambling model)
+    capacity: Optional[int] = None  # concurrent requests served; the rest get 429
+    prefill_ms_per_1k_tokens: float = 0.0  # extra latency per 1k prompt tokens
+    seed: Optional[int] = None
+
+
+class MockChatServer:
+    """Threaded HTTP server answering chat completion requests."""
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Create (but do not start) the server.
+
+        Args:
+            config: Latency, error-injection and body settings
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.config = config or MockServerConfig()
+        if self.config.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.config.latency_distribution}")
+        if self.config.body not in BODY_KINDS:
+            raise ValueError(f"Unknown body kind: {self.config.body}")
+        self.requests = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.active = 0
+        self.peak_active = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def api_base(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockChatServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "MockChatServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "peak_active": self.peak_active,
+        }
+
+    def _admit(self) -> bool:
+        """Count one more request in flight, unless that exceeds ``capacity``."""
+        with self._lock:
+            if self.config.capacity is not None and self.active >= self.config.capacity:
+                self.requests += 1
+                self.rate_limited += 1
+                return False
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return True
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def _draw(self) -> Dict[str, float]:
+        """Pick latency and outcome for one request."""
+        config = self.config
+        with self._lock:
+            self.requests += 1
+            rng = self._random
+            base = config.latency_ms / 1000.0
+            if config.latency_distribution == "constant":
+                latency = base
+            elif config.latency_distribution == "uniform":
+                latency = rng.uniform(base * (1 - config.latency_sigma), base * (1 + config.latency_sigma))
+            elif config.latency_distribution == "exponential":
+                latency = rng.expovariate(1 / base) if base > 0 else 0.0
+            else:
+                latency = rng.lognormvariate(0, config.latency_sigma) * base
+            roll = rng.random()
+            if roll < config.error_rate_429:
+                self.rate_limited += 1
+                status = 429
+            elif roll < config.error_rate_429 + config.error_rate_5xx:
+                self.server_errors += 1
+                status = rng.choice((500, 502, 503))
+            else:
+                status = 200
+            kind = rng.choice(BODY_KINDS[:3]) if config.body == "mixed" else config.body
+        return {"latency": max(latency, 0.0), "status": status, "kind": kind}
+
+    def render_content(self, kind: str, doc_ids: Optional[List[str]] = None) -> str:
+        """Return assistant content of the requested ``kind``.
+
+        With ``doc_ids`` (a batched request) the result is an object keyed by
+        doc_id, minus a ``batch_drop_rate`` share of the ids.
+        """
+        if doc_ids:
+            with self._lock:
+                kept = [
+                    doc_id for doc_id in doc_ids if self._random.random() >= self.config.batch_drop_rate
+                ]
+            data = json.dumps({doc_id: SAMPLE_RESULT for doc_id in kept}, ensure_ascii=False)
+        else:
+            data = json.dumps(SAMPLE_RESULT, ensure_ascii=False)
+        if kind == "fenced":
+            return f"好的，以下是抽取结果：\n```json\n{data}\n```\n如需调整请告诉我。"
+        if kind == "text":
+            return "该文件为通知，主题领域为网络安全，主要措施包括建立健全管理制度。"
+        return data
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # keep-alive connections stall on delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send(400, {"error": {"message": "invalid JSON"}})
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                if not server._admit():
+                    self._send(
+                        429,
+                        {"error": {"message": "too many concurrent requests"}},
+                        {"Retry-After": str(server.config.retry_after)},
+                    )
+                    return
+                try:
+                    self._complete(request)
+                finally:
+                    server._leave()
+
+            def _complete(self, request: Dict[str, Any]) -> None:
+                draw = server._draw()
+                time.sleep(draw["latency"])
+                if draw["status"] == 429:
+                    self._send(
+                        429,
+                        {"error": {"message": "rate limited"}},
+                        {"Retry-After": str(server.config.retry_after)},
+                    )
+                    return
+                if draw["status"] != 200:
+                    self._send(draw["status"], {"error": {"message": "injected failure"}})
+                    return
+
+                messages = request.get("messages", [])
+                doc_ids = _DOC_ID_HEADER.findall(
+                    "\n".join(str(message.get("content", "")) for message in messages)
+                )
+                prompt_tokens = estimate_messages_tokens(messages)
+                # Long inputs take longer to prefill
+                time.sleep(prompt_tokens * server.config.prefill_ms_per_1k_tokens / 1e6)
+                completion_tokens = min(
+                    server.config.completion_tokens * max(1, len(doc_ids)),
+                    int(request.get("max_tokens") or server.config.completion_tokens),
+                )
+                content = server.render_content(draw["kind"], doc_ids)
+                if server.config.trailing_chars:
+                    content += "\n\n补充说明：" + "以上内容仅供参考。" * (server.config.trailing_chars // 9 + 1)
+                if request.get("stream"):
+                    self._stream(request, content, prompt_tokens, completion_tokens)
+                    return
+                # A non-streamed answer still takes as long to generate
+                chunks = -(-len(content) // max(1, server.config.stream_chunk_chars))
+                time.sleep(chunks * server.config.token_interval_ms / 1000.0)
+                self._send(
+                    200,
+                    {
+                        "id": f"mock-{server.requests}",
+                        "object": "chat.completion",
+                        "model": request.get("model", "mock"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": content,
+                                },
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                )
+
+            def _stream(
+                self,
+                request: Dict[str, Any],
+                content: str,
+                prompt_tokens: int,
+                completion_tokens: int,
+            ) -> None:
+                """Send ``content`` as chat.completion.chunk SSE events."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                size = max(1, server.config.stream_chunk_chars)
+                events = [
+                    {"choices": [{"index": 0, "delta": {"content": content[i : i + size]}, "finish_reason": None}]}
+                    for i in range(0, len(content), size)
+                ]
+                events.append({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    events.append(
+                        {
+                            "choices": [],
+                            "usage": {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": completion_tokens,
+                                "total_tokens": prompt_tokens + completion_tokens,
+                            },
+                        }
+                    )
+                try:
+                    for event in events:
+                        self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+                        time.sleep(server.config.token_interval_ms / 1000.0)
+                    self._write_chunk("data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early
+                    self.close_connection = True
+
+            def _write_chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock /chat/completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--body", choices=BODY_KINDS, default="json")
+    parser.add_argument("--batch-drop-rate", type=float, default=0.0)
+    parser.add_argument("--trailing-chars", type=int, default=0)
+    parser.add_argument("--capacity", type=int, default=None, help="Concurrent requests before 429s.")
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        latency_sigma=args.latency_sigma,
+        error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx,
+        body=args.body,
+        batch_drop_rate=args.batch_drop_rate,
+        trailing_chars=args.trailing_chars,
+        capacity=args.capacity,
+        prefill_ms_per_1k_tokens=args.prefill_ms_per_1k_tokens,
+    )
+    server = MockChatServer(config, host=args.host, port=args.port).start()
+    print(f"Mock server listening on {server.api_base}/chat/completions (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""End-to-end throughput benchmarks for the pipeline engine.
+
+Each scenario starts a ``MockChatServer``, runs ``BasePipeline`` with a real
+``SiliconFlowProvider`` (wrapped in the retry layer) over a synthetic corpus
+and reports docs/sec, prompt latency percentiles and peak RSS. Scenarios run
+in separate subprocesses so memory numbers do not bleed into each other, and
+the combined report is written as JSON for comparison across commits.
+
+Usage:
+    uv run python -m openextract.bench.runner --output bench/results.json
+    uv run python -m openextract.bench.runner --scenarios concurrent faulty
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from openextract.bench.corpus import iter_documents
+from openextract.bench.mock_server import MockChatServer, MockServerConfig
+from openextract.pipelines.base import BasePipeline
+from openextract.pipelines.batching import BatchConfig, DocumentBatcher
+from openextract.pipelines.dedup import Deduplicator
+from openextract.pipelines.limiter import AdaptiveLimiter, LimiterConfig
+from openextract.pipelines.scheduler import SchedulingConfig
+from openextract.prompts.loader import TemplatePrompt
+from openextract.providers.base import ProviderConfig
+from openextract.providers.retry import RetryingProvider, RetryPolicy
+from openextract.providers.siliconflow import SiliconFlowProvider
+from openextract.utils.metrics import METRICS
+
+_INSTRUCTIONS = """请分析以下政策文档，提取关键信息并以 JSON 格式输出：
+
+标题：{title}
+正文：{content}
+
+请提取以下字段：
+1. 文档类型（如：通知、方案、措施等）
+2. 主题领域（如：网络安全、能源、营商环境等）
+3. 发文目的（简要概括）
+4. 关键措施（列出最多3条核心措施）
+
+请严格按照 JSON 格式输出，不要包含其他说明文字。
+"""
+
+
+@dataclass
+class Scenario:
+    """One benchmark configuration."""
+
+    name: str
+    documents: int = 200
+    prompts: int = 4
+    concurrency: int = 8
+    median_chars: int = 1500
+    sigma: float = 0.9  # log-normal shape of payload lengths
+    max_retries: int = 3
+    batching: Optional[Dict[str, Any]] = None  # BatchConfig settings
+    duplicate_rate: float = 0.0  # share of reposted documents in the corpus
+    dedup: bool = False
+    stream: bool = False
+    adaptive: Optional[Dict[str, Any]] = None  # LimiterConfig settings
+    scheduling: Optional[Dict[str, Any]] = None  # SchedulingConfig settings
+    server: MockServerConfig = field(default_factory=MockServerConfig)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("sequential", documents=30, concurrency=1, server=MockServerConfig(latency_ms=50)),
+        Scenario("concurrent", documents=300, concurrency=16, server=MockServerConfig(latency_ms=50)),
+        Scenario(
+            "heavy-tail",
+            documents=300,
+            concurrency=16,
+            server=MockServerConfig(latency_ms=50, latency_sigma=1.2),
+        ),
+        Scenario(
+            "faulty",
+            documents=300,
+            concurrency=16,
+            server=MockServerConfig(
+                latency_ms=50, error_rate_429=0.02, error_rate_5xx=0.05, retry_after=0.1
+            ),
+        ),
+        Scenario(
+            "short-rows",
+            documents=300,
+            concurrency=16,
+            median_chars=300,
+            server=MockServerConfig(latency_ms=50),
+        ),
+        Scenario(
+            "short-batched",
+            documents=300,
+            concurrency=16,
+            median_chars=300,
+            batching={"max_documents": 8},
+            server=MockServerConfig(latency_ms=50, batch_drop_rate=0.05),
+        ),
+        Scenario(
+            "rambling",
+            documents=200,
+            concurrency=16,
+            server=MockServerConfig(latency_ms=50, body="fenced", trailing_chars=1500),
+        ),
+        Scenario(
+            "rambling-stream",
+            documents=200,
+            concurrency=16,
+            stream=True,
+            server=MockServerConfig(latency_ms=50, body="fenced", trailing_chars=1500),
+        ),
+        Scenario(
+            "reposts-dedup",
+            documents=300,
+            concurrency=16,
+            duplicate_rate=0.3,
+            dedup=True,
+            server=MockServerConfig(latency_ms=50),
+        ),
+        # A provider that serves 12 requests at once: too low, too high, adaptive
+        Scenario(
+            "capacity-low",
+            documents=200,
+            concurrency=3,
+            server=MockServerConfig(latency_ms=50, capacity=12, retry_after=0.1),
+        ),
+        Scenario(
+            "capacity-high",
+            documents=200,
+            concurrency=32,
+            server=MockServerConfig(latency_ms=50, capacity=12, retry_after=0.1),
+        ),
+        Scenario(
+            "capacity-adaptive",
+            documents=200,
+            concurrency=3,
+            adaptive={"initial": 3, "min": 1, "max": 32},
+            server=MockServerConfig(latency_ms=50, capacity=12, retry_after=0.1),
+        ),
+        # Long-tailed sizes, latency growing with input: source order vs largest first
+        Scenario(
+            "skewed-fifo",
+            documents=40,
+            concurrency=16,
+            sigma=1.5,
+            server=MockServerConfig(latency_ms=20, prefill_ms_per_1k_tokens=100),
+        ),
+        Scenario(
+            "skewed-lpt",
+            documents=40,
+            concurrency=16,
+            sigma=1.5,
+            scheduling={},
+            server=MockServerConfig(latency_ms=20, prefill_ms_per_1k_tokens=100),
+        ),
+    ]
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    # VmHWM belongs to the current address space; ru_maxrss can carry over
+    # the parent's high-water mark through fork/exec on Linux.
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+class _TimedProvider:
+    """Records the wall-clock latency of every ``invoke``."""
+
+    def __init__(self, inner: Any):
+        self.inner = inner
+        self.config = inner.config
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, document, payload: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return self.inner.invoke(prompt, document, payload)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.append(elapsed)
+
+
+def build_prompts(count: int) -> List[TemplatePrompt]:
+    """``count - 1`` independent prompts plus one that depends on the first."""
+    prompts = [
+        TemplatePrompt(name=f"p{i}", section=f"p{i}", template=_INSTRUCTIONS, max_tokens=400)
+        for i in range(max(1, count - 1))
+    ]
+    if count > 1:
+        prompts.append(
+            TemplatePrompt(
+                name="summary",
+                section="summary",
+                template="根据以下抽取结果给出一句话摘要：{p0}\n标题：{title}",
+                depends_on=["p0"],
+                max_tokens=200,
+            )
+        )
+    return prompts
+
+
+def _token_totals() -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for entry in METRICS.to_dict()["counters"].get("tokens_total", []):
+        kind = entry["labels"].get("kind", "?")
+        totals[kind] = totals.get(kind, 0) + int(entry["value"])
+    return totals
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    """Run one scenario in this process and return its metrics."""
+    METRICS.reset()
+    limiter = None
+    if scenario.adaptive is not None:
+        limiter = AdaptiveLimiter(LimiterConfig.from_dict(scenario.adaptive))
+    with MockChatServer(scenario.server) as server:
+        provider = RetryingProvider(
+            SiliconFlowProvider(
+                ProviderConfig(
+                    name="mock",
+                    api_base=server.api_base,
+                    model="mock-model",
+                    api_key=f"bench-{scenario.name}",
+                    concurrency=scenario.concurrency,
+                    pool_size=limiter.config.max_limit if limiter is not None else None,
+                    stream=scenario.stream,
+                )
+            ),
+            RetryPolicy(max_retries=scenario.max_retries, base_delay=0.05, max_delay=1.0),
+        )
+        timed = _TimedProvider(provider)
+        prompts = build_prompts(scenario.prompts)
+        batcher = None
+        if scenario.batching is not None:
+            batcher = DocumentBatcher(BatchConfig.from_dict(scenario.batching), prompts)
+        pipeline = BasePipeline(
+            prompts,
+            timed,
+            concurrency=scenario.concurrency,
+            batcher=batcher,
+            deduplicator=Deduplicator() if scenario.dedup else None,
+            limiter=limiter,
+            scheduling=(
+                SchedulingConfig.from_dict(scenario.scheduling)
+                if scenario.scheduling is not None
+                else None
+            ),
+        )
+
+        documents = 0
+        errors = 0
+        start = time.perf_counter()
+        for result in pipeline.run_iter(
+            iter_documents(
+                scenario.documents,
+                median_chars=scenario.median_chars,
+                sigma=scenario.sigma,
+                duplicate_rate=scenario.duplicate_rate,
+            )
+        ):
+            documents += 1
+            errors += len(result.errors)
+        elapsed = time.perf_counter() - start
+        provider.close()
+
+        latencies = sorted(timed.latencies)
+        return {
+            "scenario": scenario.name,
+            "config": asdict(scenario),
+            "documents": documents,
+            "prompt_calls": len(latencies),
+            "prompt_errors": errors,
+            "tokens": _token_totals(),
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(documents / elapsed, 2) if elapsed else None,
+            "prompt_latency_ms": {
+                "mean": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                "p50": round(1000 * percentile(latencies, 50), 2),
+                "p95": round(1000 * percentile(latencies, 95), 2),
+                "p99": round(1000 * percentile(latencies, 99), 2),
+            },
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "server": server.stats(),
+            "concurrency_limit": pipeline.limiter.stats(),
+            "provider": provider.stats(),
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names: List[str], isolate: bool = True) -> Dict[str, Any]:
+    """Run the named scenarios and return the combined report."""
+    results = []
+    for name in names:
+        if isolate:
+            output = subprocess.run(
+                [sys.executable, "-m", "openextract.bench.runner", "--single", name],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        else:
+            results.append(run_scenario(SCENARIOS[name]))
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"commit={report['commit']} python={report['python']}")
+    print(
+        f"{'scenario':<18}{'docs':>7}{'docs/s':>9}{'calls':>7}{'in tok':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'RSS MB':>9}"
+    )
+    for result in report["results"]:
+        latency = result["prompt_latency_ms"]
+        print(
+            f"{result['scenario']:<18}{result['documents']:>7}{result['docs_per_sec']:>9}"
+            f"{result['prompt_calls']:>7}{result['tokens'].get('prompt', 0):>9}"
+            f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}"
+            f"{result['prompt_errors']:>8}{result['peak_rss_mb']:>9}"
+        )
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """Write ``report`` as JSON to ``path``, creating parent directories."""
+    from pathlib import Path
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Report written to {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run pipeline throughput benchmarks.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the JSON report to this path.")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all scenarios in this process.")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_scenario(SCENARIOS[args.single]), ensure_ascii=False))
+        return
+
+    report = run_benchmarks(args.scenarios, isolate=not args.no_isolate)
+    print_report(report)
+    if args.output:
+        save_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""CLI startup budget check.
+
+Short jobs and cron invocations pay the interpreter start plus every import
+the ``openextract`` command performs before doing any work. This check
+builds the argument parser and renders ``--help`` in fresh subprocesses,
+timing the imports with the probe's own CPU clock; the fastest of several
+runs is compared with the budget, because other load on the machine only
+ever adds to it. It also verifies that building the parser imports none of
+``HEAVY_MODULES``. It fails when either regresses, so it can run in CI next
+to the throughput benchmarks. Wall times of ``openextract --help`` and
+``python -c pass`` are reported for reference only: their difference swings
+by more than the whole import cost between runs.
+
+Usage:
+    uv run openextract bench --startup
+    uv run python -m openextract.bench.startup --budget-ms 40
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+# Modules only a command's code path may import, never the parser itself
+HEAVY_MODULES = [
+    "requests",
+    "urllib3",
+    "pandas",
+    "openpyxl",
+    "pyarrow",
+    "yaml",
+    "dotenv",
+    "openextract.factory",
+    "openextract.pipelines.base",
+    "openextract.providers.siliconflow",
+]
+
+# About 15 ms on a developer laptop; the rest is headroom for slower CI hosts.
+# Importing requests alone costs more than the headroom.
+DEFAULT_BUDGET_MS = 40.0
+
+# ``sys`` and ``time`` are loaded by every interpreter, so importing them is free
+_PROBE = (
+    "import sys, time\n"
+    "start = time.process_time()\n"
+    "from openextract.cli import build_parser\n"
+    "build_parser().format_help()\n"
+    "elapsed = time.process_time() - start\n"
+    "import json\n"
+    "heavy = sorted(name for name in {modules!r} if name in sys.modules)\n"
+    "print(json.dumps({{'ms': elapsed * 1000, 'heavy': heavy}}))\n"
+)
+
+
+def _wall_ms(command: List[str], repeat: int) -> float:
+    """Fastest wall time of ``command`` over ``repeat`` fresh processes."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def _probe() -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=HEAVY_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def heavy_imports() -> List[str]:
+    """Return the ``HEAVY_MODULES`` loaded by building the CLI parser."""
+    return _probe()["heavy"]
+
+
+def check_startup(budget_ms: float = DEFAULT_BUDGET_MS, repeat: int = 7) -> Dict[str, Any]:
+    """
+    Measure CLI startup.
+
+    Args:
+        budget_ms: Allowed CPU time of importing the CLI and rendering its
+            help (fastest run)
+        repeat: Processes started per measurement
+
+    Returns:
+        Report with ``import_ms``, ``python_ms``, ``cli_ms``, ``overhead_ms``,
+        ``budget_ms``, ``heavy_imports`` and ``ok``
+    """
+    probes = [_probe() for _ in range(max(1, repeat))]
+    import_ms = min(probe["ms"] for probe in probes)
+    heavy = sorted({name for probe in probes for name in probe["heavy"]})
+    python_ms = _wall_ms([sys.executable, "-c", "pass"], repeat)
+    cli_ms = _wall_ms([sys.executable, "-m", "openextract.cli", "--help"], repeat)
+    return {
+        "import_ms": round(import_ms, 1),
+        "python_ms": round(python_ms, 1),
+        "cli_ms": round(cli_ms, 1),
+        "overhead_ms": round(cli_ms - python_ms, 1),
+        "budget_ms": budget_ms,
+        "heavy_imports": heavy,
+        "ok": import_ms <= budget_ms and not heavy,
+    }
+
+
+def print_startup(report: Dict[str, Any]) -> None:
+    print(f"CLI imports: {report['import_ms']:.1f} ms CPU (budget {report['budget_ms']:.0f} ms)")
+    print(
+        f"Wall time: python -c pass {report['python_ms']:.1f} ms, openextract --help "
+        f"{report['cli_ms']:.1f} ms (overhead {report['overhead_ms']:.1f} ms, not checked)"
+    )
+    if report["heavy_imports"]:
+        print(f"Heavy modules imported at startup: {', '.join(report['heavy_imports'])}")
+    print("Startup: ok" if report["ok"] else "Startup: FAILED")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the openextract CLI startup budget.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    report = check_startup(args.budget_ms, args.repeat)
+    print_startup(report)
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
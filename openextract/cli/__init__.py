@@ -0,0 +1,45 @@
+"""``openextract`` command line entry point.
+
+Startup cost matters for short jobs and cron invocations, so this package
+and the command modules it loads for argument parsing import only the
+standard library. Each command imports the pipeline, providers, sources
+and their dependencies inside its ``main``, and only for the code path it
+takes; ``openextract bench --startup`` checks that this stays true.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+from typing import Dict, List, Optional
+
+# command -> module with ``HELP``, ``add_arguments(parser)`` and ``main(args)``
+COMMANDS: Dict[str, str] = {
+    "run": "openextract.cli.run",
+    "validate": "openextract.cli.validate",
+    "plan": "openextract.cli.plan",
+    "bench": "openextract.cli.bench",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the top-level parser with one subparser per command."""
+    parser = argparse.ArgumentParser(
+        prog="openextract",
+        description="Declarative LLM extraction pipelines.",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for name, module_name in COMMANDS.items():
+        module = importlib.import_module(module_name)
+        subparser = subparsers.add_parser(name, help=module.HELP, description=module.HELP)
+        module.add_arguments(subparser)
+        subparser.set_defaults(handler=module.main)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse ``argv`` (default: ``sys.argv[1:]``) and run the chosen command."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args) or 0
+    except KeyboardInterrupt:
+        return 1
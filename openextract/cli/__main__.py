@@ -0,0 +1,6 @@
+"""Allow ``python -m openextract.cli``."""
+import sys
+
+from openextract.cli import main
+
+sys.exit(main())
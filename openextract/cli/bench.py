@@ -0,0 +1,49 @@
+"""``openextract bench``: throughput benchmarks and the startup budget check."""
+from __future__ import annotations
+
+import argparse
+
+HELP = "Run throughput benchmarks against the mock server, or check CLI startup time."
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    # Scenario names are checked in ``main`` so parsing never imports the runner
+    parser.add_argument("--scenarios", nargs="+", help="Scenarios to run (default: all).")
+    parser.add_argument("--output", help="Write the JSON report to this path.")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all scenarios in this process.")
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="Check CLI startup time and imports instead of running scenarios.",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Allowed CPU time of importing the CLI, in ms (with --startup).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=7, help="Processes timed per measurement (with --startup)."
+    )
+
+
+def main(args: argparse.Namespace) -> int:
+    if args.startup:
+        from openextract.bench.startup import DEFAULT_BUDGET_MS, check_startup, print_startup
+
+        budget_ms = DEFAULT_BUDGET_MS if args.budget_ms is None else args.budget_ms
+        report = check_startup(budget_ms, args.repeat)
+        print_startup(report)
+        return 0 if report["ok"] else 1
+
+    from openextract.bench.runner import SCENARIOS, print_report, run_benchmarks, save_report
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(sorted(SCENARIOS))})")
+        return 2
+    report = run_benchmarks(names, isolate=not args.no_isolate)
+    print_report(report)
+    if args.output:
+        save_report(report, args.output)
+    return 0
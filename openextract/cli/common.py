@@ -0,0 +1,29 @@
+"""Arguments and config loading shared by the CLI commands."""
+from __future__ import annotations
+
+import argparse
+from typing import Any, Dict
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add ``--config`` and ``--settings``."""
+    parser.add_argument("--config", required=True, help="Path to pipeline YAML config.")
+    parser.add_argument("--settings", help="Optional path to global settings YAML.")
+
+
+def load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Load ``.env`` and the merged pipeline configuration named by ``args``."""
+    from dotenv import load_dotenv
+
+    from openextract.config import load_config
+
+    # Load environment variables from .env file
+    load_dotenv()
+    return load_config(args.config, args.settings)
+
+
+def print_stats(stats: Dict[str, Dict[str, Any]]) -> None:
+    """Print ``PipelineParts.stats()`` as one line per component."""
+    for name, counters in stats.items():
+        summary = ", ".join(f"{key}={value}" for key, value in counters.items())
+        print(f"{name.replace('_', ' ').capitalize()}: {summary}")
@@ -0,0 +1,186 @@
+"""``openextract plan``: show what a pipeline config will do, without running it."""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from openextract.cli.common import add_config_arguments, load
+
+HELP = "Estimate calls, tokens, duration and cost of a pipeline run (no provider calls)."
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--static",
+        action="store_true",
+        help="Only print the execution plan; do not read the source.",
+    )
+    parser.add_argument("--output", help="Write the estimate as JSON to this path.")
+
+
+def _enabled(block: Any) -> bool:
+    return bool(block) and block.get("enabled", True)
+
+
+def main(args: argparse.Namespace) -> int:
+    """Print the execution plan, then stream the source and print the estimate."""
+    from openextract.factory import build_prompts
+    from openextract.pipelines.base import plan_prompt_levels
+    from openextract.pipelines.planner import Planner
+
+    config = load(args)
+    pipeline_config = config.get("pipeline", {})
+    prompts = build_prompts(config)
+    planner = Planner.from_config(config, prompts)
+
+    source_config = pipeline_config.get("source", {})
+    print(f"Pipeline: {pipeline_config.get('name', args.config)}")
+    print(f"Source: {source_config.get('type')} {source_config.get('path')}")
+    if source_config.get("max_rows"):
+        print(f"  max_rows: {source_config['max_rows']}")
+
+    print("Providers:")
+    for plan in planner.providers:
+        print(
+            f"  {plan.name} ({plan.adapter}): model={plan.model} concurrency={plan.concurrency} "
+            f"rpm={_number(plan.rpm)} tpm={_number(plan.tpm)}"
+        )
+
+    batched: List[str] = []
+    batching_config = pipeline_config.get("batching") or {}
+    if _enabled(batching_config):
+        from openextract.pipelines.batching import BatchConfig, DocumentBatcher
+
+        batcher = DocumentBatcher(BatchConfig.from_dict(batching_config), prompts)
+        batched = [prompt.name for prompt in batcher.prompts]
+
+    print("Prompts:")
+    for number, level in enumerate(plan_prompt_levels(prompts), 1):
+        for prompt in level:
+            notes = []
+            if getattr(prompt, "depends_on", None):
+                notes.append(f"after {', '.join(prompt.depends_on)}")
+            if prompt.name in batched:
+                notes.append("batched")
+            if getattr(prompt, "max_tokens", None):
+                notes.append(f"max_tokens={prompt.max_tokens}")
+            suffix = f" ({'; '.join(notes)})" if notes else ""
+            print(f"  level {number}: {prompt.name} -> {prompt.section}{suffix}")
+
+    stages = []
+    chunking_config = pipeline_config.get("chunking") or {}
+    if chunking_config:
+        stages.append(f"chunking above {chunking_config.get('max_tokens', 3000)} tokens")
+    if batched:
+        stages.append(f"batching ({len(batched)} prompts)")
+    for key in ("dedup", "structured_output", "scheduling"):
+        if _enabled(pipeline_config.get(key) or {}):
+            stages.append(key.replace("_", " "))
+    provider_config = pipeline_config.get("provider", {})
+    if _enabled(provider_config.get("adaptive_concurrency") or {}):
+        stages.append("adaptive concurrency")
+    cache_config = pipeline_config.get("cache", config.get("cache")) or {}
+    if cache_config:
+        from openextract.providers.cache import normalize_cache_mode
+
+        cache_mode = normalize_cache_mode(cache_config.get("mode", "readwrite"))
+        if cache_mode != "off":
+            stages.append(f"cache ({cache_mode})")
+    print(f"Stages: {', '.join(stages) if stages else 'none'}")
+
+    outputs = pipeline_config.get("outputs", {})
+    targets = [outputs.get("json_path", "output/api_results")]
+    if outputs.get("jsonl_dump"):
+        targets.append("jsonl")
+    for sink in outputs.get("sinks") or []:
+        targets.append(f"{sink.get('type')}:{sink['path']}" if sink.get("path") else sink.get("type"))
+    print(f"Outputs: {', '.join(targets)}")
+    if args.static:
+        return 0
+
+    from openextract.sources import build_source
+
+    source = build_source(
+        source_config, max_rows=pipeline_config.get("runtime", {}).get("max_rows")
+    )
+    started = time.perf_counter()
+    report = planner.plan(source).report()
+    elapsed = time.perf_counter() - started
+    print_estimate(report)
+    print(f"\nPlanned {report['documents']} documents in {elapsed:.1f}s")
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Estimate written to {args.output}")
+    return 1 if report["problems"] else 0
+
+
+def _number(value: Any) -> str:
+    if value is None:
+        return "-"
+    return f"{value:,.0f}"
+
+
+def format_duration(seconds: float) -> str:
+    """Render seconds as the two largest of days, hours, minutes and seconds."""
+    seconds = int(round(seconds))
+    parts = []
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60), ("s", 1)):
+        if seconds >= size or (unit == "s" and not parts):
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+    return " ".join(parts[:2])
+
+
+def print_estimate(report: Dict[str, Any]) -> None:
+    """Print a ``Planner.report()`` as tables of calls, time bounds and cost."""
+    print("\nEstimate (cold cache, no retries):")
+    duplicates = f" ({report['duplicates']} exact duplicates skipped)" if report["duplicates"] else ""
+    print(f"  Documents: {report['documents']:,}{duplicates}")
+    print(f"  {'call':<28}{'calls':>12}{'input tok':>16}{'output tok':>16}  output from")
+    for name, totals in report["calls"].items():
+        base = name.rsplit(".", 1)[0] if name.endswith(".batch") else name
+        print(
+            f"  {name:<28}{totals['calls']:>12,}{totals['input_tokens']:>16,}"
+            f"{totals['output_tokens']:>16,}  {report['output_tokens_from'].get(base, '')}"
+        )
+    total = report["total"]
+    print(
+        f"  {'total':<28}{total['calls']:>12,}{total['input_tokens']:>16,}{total['output_tokens']:>16,}"
+    )
+
+    print(f"  Wall clock: {format_duration(report['seconds'])}")
+    for provider in report["providers"]:
+        bounds = ", ".join(
+            f"{name} {format_duration(seconds)}" for name, seconds in provider["bounds"].items()
+        )
+        print(
+            f"    {provider['name']}: {provider['share']:.0%} of calls, "
+            f"limited by {provider['bottleneck']} ({bounds})"
+        )
+
+    if report["cost"] is not None:
+        print(f"  Cost: {report['cost']:,.2f}")
+    else:
+        print(f"  Cost: unknown (no prices under models for {', '.join(report['unpriced_models'])})")
+
+    oversized = report["oversized"]
+    if report["context_window"] is None:
+        print("  Context window: not checked (no context_window under models)")
+    elif oversized["documents"]:
+        print(
+            f"  Over the {report['context_window']:,}-token context window: "
+            f"{oversized['documents']:,} documents ({oversized['calls']:,} calls)"
+        )
+        for example in oversized["examples"]:
+            print(f"    {example['doc_id']} {example['prompt']}: {example['tokens']:,} tokens")
+    else:
+        print(f"  Context window: every call fits in {report['context_window']:,} tokens")
+
+    for problem in report["problems"]:
+        print(f"  error  {problem}")
@@ -0,0 +1,279 @@
+"""``openextract run``: execute a pipeline over its configured source."""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Mapping, Optional
+
+from openextract.cli.common import add_config_arguments, load, print_stats
+
+if TYPE_CHECKING:
+    from openextract.pipelines.base import Document, PipelineResult
+    from openextract.pipelines.workqueue import QueueConfig, WorkQueue
+
+HELP = "Run a pipeline and write its results."
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--cache-mode",
+        metavar="MODE",
+        help="Override the response cache mode from config (readwrite, read, write, off).",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Path of the JSONL run journal (default: <json_path>/journal.jsonl).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Resume from the journal: skip finished documents, retry failed prompts "
+            "and recompute sections whose prompt, model or document changed."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage timing and token breakdown at the end of the run.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="Write metrics to this path (Prometheus text for .prom/.txt, JSON otherwise).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=(
+            "Enqueue the source into a shared work queue, run this many local "
+            "worker processes and merge their results."
+        ),
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Only work on an existing queue (e.g. from another host) until it is drained.",
+    )
+    parser.add_argument(
+        "--queue",
+        help="Path of the SQLite work queue (default: <json_path>/queue.sqlite).",
+    )
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the pipeline described by ``args.config``."""
+    from openextract.factory import build_pipeline
+    from openextract.pipelines.journal import RunJournal
+    from openextract.pipelines.workqueue import QueueConfig, WorkQueue
+    from openextract.sources import build_source
+    from openextract.utils.metrics import METRICS, format_profile
+    from openextract.writers import build_writer
+    from openextract.writers.jsonl import JsonArrayWriter, JsonlWriter
+
+    try:
+        # Load configuration
+        print(f"Loading configuration from {args.config}...")
+        config = load(args)
+
+        pipeline_config = config.get("pipeline", {})
+        print(f"Pipeline: {pipeline_config.get('name', 'unnamed')}")
+        print(f"Description: {pipeline_config.get('description', 'N/A')}")
+
+        metrics_config = pipeline_config.get("metrics", config.get("metrics")) or {}
+        if metrics_config.get("otel"):
+            METRICS.enable_otel()
+        metrics_out = args.metrics_out or metrics_config.get("export_path")
+
+        outputs_config = pipeline_config.get("outputs", {})
+        output_base = outputs_config.get("json_path", "output/api_results")
+
+        output_path = Path(output_base)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        queue_config = QueueConfig.from_dict(pipeline_config.get("queue") or {})
+        queue_file = Path(args.queue or queue_config.path or output_path / "queue.sqlite")
+        if args.worker:
+            run_worker(config, queue_file, queue_config, args.cache_mode)
+            return 0
+
+        # Initialize data source
+        source_config = pipeline_config.get("source", {})
+        print(f"\nInitializing {source_config.get('type')} source: {source_config.get('path')}...")
+        source = build_source(
+            source_config,
+            max_rows=pipeline_config.get("runtime", {}).get("max_rows"),
+        )
+
+        # Results are journaled as each document finishes so runs can resume
+        journal_file = Path(args.journal or output_path / "journal.jsonl")
+        previous = RunJournal.load(journal_file) if args.resume else {}
+        if args.resume:
+            print(f"Resuming from {journal_file}: {len(previous)} documents journaled")
+
+        # Provider stack, prompts and optional stages (see openextract.factory);
+        # queue workers build their own, so the launcher builds none
+        parts = None
+        if not args.workers:
+            parts = build_pipeline(
+                config,
+                journal=RunJournal(journal_file, resume=args.resume),
+                cache_mode=args.cache_mode,
+            )
+
+        # Create and run pipeline
+        print("\n" + "=" * 60)
+        print("Starting pipeline execution...")
+        print("=" * 60 + "\n")
+
+        queue = None
+        if parts is None:
+            queue = WorkQueue(queue_file, queue_config)
+            results = run_workers(args, config, source, queue, queue_file, previous)
+        else:
+            if parts.limiter is None:
+                print(f"Concurrency: {parts.provider.config.concurrency}")
+            results = parts.pipeline.run_iter(source, previous=previous)
+
+        # Stream results to every sink as documents finish
+        json_file = output_path / "results.json"
+        writers = [JsonArrayWriter(json_file)]
+        jsonl_file = None
+        if outputs_config.get("jsonl_dump"):
+            jsonl_dump = outputs_config["jsonl_dump"]
+            jsonl_path = Path(jsonl_dump if isinstance(jsonl_dump, str) else output_path / "jsonl")
+            jsonl_file = jsonl_path / "results.jsonl"
+            writers.append(JsonlWriter(jsonl_file))
+        # Extra queryable sinks, e.g. Parquet or SQLite
+        sinks = []
+        for sink_config in outputs_config.get("sinks") or []:
+            sink_config = dict(sink_config)
+            sink_config.setdefault("path", output_path / f"results.{sink_config.get('type')}")
+            sinks.append(build_writer(sink_config))
+        writers.extend(sinks)
+
+        processed = 0
+        try:
+            for result in results:
+                for writer in writers:
+                    writer.write(result)
+                processed += 1
+                if queue is None:
+                    status = f"{len(result.errors)} errors" if result.errors else "ok"
+                    print(f"[{processed}] {result.doc_id}: {status}")
+        finally:
+            for writer in writers:
+                writer.close()
+            # Release pooled HTTP connections as soon as dispatching is done
+            if parts is not None:
+                parts.close()
+
+        print(f"\nResults saved to {json_file}")
+        if jsonl_file is not None:
+            print(f"JSONL saved to {jsonl_file}")
+        for sink in sinks:
+            print(f"{type(sink).__name__} output saved to {sink.path}")
+
+        print("\n" + "=" * 60)
+        print(f"Pipeline completed successfully. Processed {processed} documents.")
+        if parts is not None:
+            stats = parts.stats()
+        else:
+            stats = {"queue": queue.stats()}
+            queue.close()
+        print_stats(stats)
+        print("=" * 60)
+
+        if args.profile:
+            print("\nStage breakdown:")
+            print(format_profile())
+        if metrics_out:
+            Path(metrics_out).parent.mkdir(parents=True, exist_ok=True)
+            METRICS.write(metrics_out)
+            print(f"Metrics written to {metrics_out}")
+
+    except Exception as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def run_worker(
+    config: Dict[str, Any],
+    queue_file: Path,
+    queue_config: "QueueConfig",
+    cache_mode: Optional[str] = None,
+) -> None:
+    """Process leased batches from ``queue_file`` until it is drained."""
+    from openextract.factory import build_pipeline
+    from openextract.pipelines.workqueue import QueueWorker, WorkQueue
+
+    if not queue_file.exists():
+        raise FileNotFoundError(f"Work queue not found: {queue_file}")
+    parts = build_pipeline(config, cache_mode=cache_mode)
+    queue = WorkQueue(queue_file, queue_config)
+    worker = QueueWorker(parts.pipeline, queue)
+    print(f"Worker {worker.owner} on {queue_file} ({worker.batch_documents} documents per claim)")
+    try:
+        processed = worker.run()
+    finally:
+        parts.close()
+        queue.close()
+    print(f"Worker {worker.owner} done: {processed} documents")
+    print_stats(parts.stats())
+
+
+def run_workers(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    source: Iterable["Document"],
+    queue: "WorkQueue",
+    queue_file: Path,
+    previous: Optional[Mapping[str, "PipelineResult"]] = None,
+) -> Iterator["PipelineResult"]:
+    """
+    Enqueue ``source``, run ``args.workers`` worker processes, return merged results.
+
+    Sections already in ``previous`` (the journal under ``--resume``) whose
+    fingerprints are current are queued as done.
+    """
+    from openextract.factory import build_fingerprints, build_prompts
+
+    if not args.resume:
+        queue.clear()
+    prompts = build_prompts(config)
+    sections = [prompt.section for prompt in prompts]
+    pending = queue.enqueue(
+        source, sections, build_fingerprints(config, prompts), previous=previous
+    )
+    print(f"Queued {pending} pending units in {queue_file}")
+    if not pending:
+        return queue.results()
+
+    command = [
+        sys.executable,
+        "-m",
+        "openextract.cli",
+        "run",
+        "--config",
+        args.config,
+        "--worker",
+        "--queue",
+        str(queue_file),
+    ]
+    if args.settings:
+        command += ["--settings", args.settings]
+    if args.cache_mode:
+        command += ["--cache-mode", args.cache_mode]
+    workers = [subprocess.Popen(command) for _ in range(args.workers)]
+    failed = sum(1 for worker in workers if worker.wait() != 0)
+    if failed:
+        print(f"Warning: {failed} of {len(workers)} workers exited with an error", file=sys.stderr)
+    if queue.remaining():
+        print(f"Warning: {queue.remaining()} documents still have pending units", file=sys.stderr)
+    return queue.results()
+
@@ -0,0 +1,169 @@
+"""``openextract validate``: check a pipeline config without calling the provider."""
+from __future__ import annotations
+
+import argparse
+import importlib
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from openextract.cli.common import add_config_arguments, load
+
+HELP = "Check a pipeline config, its source, provider settings and prompts."
+
+# (label, location of the block, "module:Class" whose from_dict parses it)
+BLOCKS: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("batching", ("pipeline", "batching"), "openextract.pipelines.batching:BatchConfig"),
+    ("dedup", ("pipeline", "dedup"), "openextract.pipelines.dedup:DedupConfig"),
+    (
+        "structured_output",
+        ("pipeline", "structured_output"),
+        "openextract.pipelines.structured:StructuredOutputConfig",
+    ),
+    ("scheduling", ("pipeline", "scheduling"), "openextract.pipelines.scheduler:SchedulingConfig"),
+    ("queue", ("pipeline", "queue"), "openextract.pipelines.workqueue:QueueConfig"),
+    ("plan", ("pipeline", "plan"), "openextract.pipelines.planner:PlanConfig"),
+    ("cache", ("pipeline", "cache"), "openextract.providers.cache:CacheConfig"),
+    ("service", ("pipeline", "service"), "openextract.service.engine:ServiceConfig"),
+    (
+        "adaptive_concurrency",
+        ("pipeline", "provider", "adaptive_concurrency"),
+        "openextract.pipelines.limiter:LimiterConfig",
+    ),
+    ("retry", ("pipeline", "provider", "retry"), "openextract.providers.retry:RetryPolicy"),
+    (
+        "circuit_breaker",
+        ("pipeline", "provider", "circuit_breaker"),
+        "openextract.providers.retry:CircuitBreaker",
+    ),
+    ("router", ("pipeline", "provider", "router"), "openextract.providers.router:RouterConfig"),
+]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    add_config_arguments(parser)
+
+
+def _block(config: Dict[str, Any], location: Tuple[str, ...]) -> Any:
+    for key in location:
+        if not isinstance(config, dict):
+            return None
+        config = config.get(key)
+    return config
+
+
+def check_config(config: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Check a merged configuration without network access.
+
+    Returns:
+        ``(problems, notes)``: problems make the config unusable, notes
+        describe what was checked
+    """
+    from openextract.config import resolve_api_key
+    from openextract.providers import DEFAULT_ADAPTER, PROVIDER_TYPES
+    from openextract.sources import SOURCE_TYPES
+    from openextract.writers import WRITER_TYPES
+
+    problems: List[str] = []
+    notes: List[str] = []
+    pipeline_config = config.get("pipeline") or {}
+    if not pipeline_config:
+        return ["No pipeline block in config"], notes
+
+    # Source
+    source_config = pipeline_config.get("source") or {}
+    source_type = source_config.get("type")
+    if source_type not in SOURCE_TYPES:
+        problems.append(f"source.type: unsupported source type {source_type!r}")
+    elif source_config.get("path") and not Path(source_config["path"]).exists():
+        problems.append(f"source.path: {source_config['path']} does not exist")
+    else:
+        notes.append(f"source: {source_type} {source_config.get('path')}")
+
+    # Provider(s): names, adapters and API keys
+    provider_config = pipeline_config.get("provider") or {}
+    settings_providers = config.get("providers") or {}
+    provider_name = provider_config.get("name", "siliconflow")
+    if provider_name == "router":
+        names = [entry.get("provider", "siliconflow") for entry in provider_config.get("backends") or []]
+        entries = list(provider_config.get("backends") or [])
+        if not names:
+            problems.append("provider.backends: router needs at least one backend")
+    else:
+        names, entries = [provider_name], [{}]
+    for name, entry in zip(names, entries):
+        if name not in settings_providers and name != "siliconflow":
+            problems.append(f"provider: {name!r} is not listed under providers")
+            continue
+        settings = {**settings_providers.get(name, {}), **entry}
+        adapter = settings.get("adapter", DEFAULT_ADAPTER)
+        if adapter not in PROVIDER_TYPES:
+            problems.append(f"providers.{name}.adapter: unsupported adapter {adapter!r}")
+        try:
+            resolve_api_key(settings)
+        except ValueError as exc:
+            problems.append(f"providers.{name}: {exc}")
+            continue
+        notes.append(f"provider: {name} ({adapter}, model {settings.get('model', 'deepseek-chat')})")
+
+    # Prompts and their dependency plan
+    try:
+        from openextract.factory import build_prompts
+        from openextract.pipelines.base import plan_prompt_levels
+
+        prompts = build_prompts(config)
+        levels = plan_prompt_levels(prompts)
+    except (OSError, ValueError) as exc:
+        problems.append(f"prompts: {exc}")
+    else:
+        if not prompts:
+            problems.append("prompts: no prompt files found")
+        sections = {prompt.section for prompt in prompts}
+        for prompt in prompts:
+            unknown = [dep for dep in getattr(prompt, "depends_on", None) or [] if dep not in sections]
+            if unknown:
+                problems.append(
+                    f"prompts.{prompt.name}: depends on unknown section(s) {', '.join(unknown)}"
+                )
+        notes.append(f"prompts: {len(prompts)} in {len(levels)} dependency levels")
+
+    # Optional blocks parse the same way the pipeline will parse them
+    for label, location, target in BLOCKS:
+        block = _block(config, location)
+        if not block:
+            continue
+        if not isinstance(block, dict):
+            problems.append(f"{label}: expected a mapping")
+            continue
+        module_name, class_name = target.split(":")
+        try:
+            getattr(importlib.import_module(module_name), class_name).from_dict(block)
+        except (TypeError, ValueError) as exc:
+            problems.append(f"{label}: {exc}")
+        else:
+            notes.append(f"{label}: ok")
+
+    for sink in (pipeline_config.get("outputs") or {}).get("sinks") or []:
+        if sink.get("type") not in WRITER_TYPES:
+            problems.append(f"outputs.sinks: unsupported sink type {sink.get('type')!r}")
+    return problems, notes
+
+
+def main(args: argparse.Namespace) -> int:
+    """Print every problem found in ``args.config``; exit 1 if there are any."""
+    try:
+        config = load(args)
+    except Exception as exc:
+        print(f"Error: cannot load {args.config}: {exc}")
+        return 1
+    problems, notes = check_config(config)
+    print()
+    for note in notes:
+        print(f"  ok     {note}")
+    for problem in problems:
+        print(f"  error  {problem}")
+    if problems:
+        print(f"\n{args.config}: {len(problems)} problem(s)")
+        return 1
+    print(f"\n{args.config}: valid")
+    return 0
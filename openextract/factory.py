@@ -0,0 +1,375 @@
+"""Build providers and pipelines from a merged YAML configuration.
+
+Shared by ``openextract run`` (``openextract.cli.run``) and the extraction
+service (``openextract.service``), so both read the same config blocks the
+same way and print the same startup summary.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from openextract.config import resolve_api_key
+from openextract.pipelines.base import BasePipeline, section_fingerprints
+from openextract.pipelines.batching import BatchConfig, DocumentBatcher
+from openextract.pipelines.dedup import DedupConfig, Deduplicator
+from openextract.pipelines.fingerprint import SectionFingerprints
+from openextract.pipelines.journal import RunJournal
+from openextract.pipelines.limiter import AdaptiveLimiter, LimiterConfig
+from openextract.pipelines.merge import SectionMerger
+from openextract.pipelines.planner import provider_plans
+from openextract.pipelines.scheduler import SchedulingConfig
+from openextract.pipelines.structured import StructuredOutput, StructuredOutputConfig
+from openextract.prompts.loader import PromptLoader, TemplatePrompt
+from openextract.providers import DEFAULT_ADAPTER, provider_class
+from openextract.providers.base import ProviderConfig
+from openextract.providers.cache import (
+    CacheConfig,
+    CachedProvider,
+    ResponseCache,
+    normalize_cache_mode,
+)
+from openextract.providers.retry import CircuitBreaker, RetryingProvider, RetryPolicy
+from openextract.providers.router import RouterBackend, RouterConfig, RouterProvider
+from openextract.utils.chunking import TextChunker
+from openextract.utils.metrics import METRICS
+
+
+def build_provider_config(
+    name: str,
+    provider_settings: Dict[str, Any],
+    provider_config: Dict[str, Any],
+    config: Dict[str, Any],
+) -> ProviderConfig:
+    """
+    Build one adapter's ``ProviderConfig``.
+
+    Args:
+        name: Provider (or router backend) name
+        provider_settings: The ``providers.<name>`` block (endpoint, model, key)
+        provider_config: The pipeline ``provider`` block (concurrency, pacing)
+        config: Whole merged configuration, for ``runtime`` defaults
+    """
+    # Resolve API key from settings or environment
+    api_key = resolve_api_key(provider_settings)
+
+    # Concurrency: pipeline provider block > providers.<name> > runtime
+    concurrency = provider_config.get(
+        "concurrency",
+        provider_settings.get(
+            "concurrency", config.get("runtime", {}).get("concurrency", 1)
+        ),
+    )
+
+    # Adaptive concurrency may run up to its ceiling, so size the pool for that
+    adaptive = provider_config.get(
+        "adaptive_concurrency", provider_settings.get("adaptive_concurrency")
+    ) or {}
+    pool_size = provider_config.get("pool_size", provider_settings.get("pool_size"))
+    if pool_size is None and adaptive and adaptive.get("enabled", True):
+        pool_size = LimiterConfig.from_dict(adaptive).max_limit
+
+    return ProviderConfig(
+        name=name,
+        api_base=provider_settings.get("api_base", "https://api.siliconflow.cn/v1"),
+        model=provider_settings.get("model", "deepseek-chat"),
+        api_key=api_key,
+        concurrency=concurrency,
+        sleep_seconds=provider_config.get("sleep_seconds", 1.0),
+        timeout=provider_config.get("timeout", 120.0),
+        think_mode=provider_settings.get("think_mode"),
+        pool_size=pool_size,
+        rpm=provider_config.get("rpm", provider_settings.get("rpm")),
+        tpm=provider_config.get("tpm", provider_settings.get("tpm")),
+        stream=bool(provider_config.get("stream", provider_settings.get("stream", False))),
+    )
+
+
+def build_provider(config: Dict[str, Any], cache_mode: Optional[str] = None) -> Any:
+    """
+    Build the provider stack: adapter or router, retries, response cache.
+
+    Args:
+        config: Whole merged configuration
+        cache_mode: Overrides ``cache.mode`` (e.g. from ``--cache-mode``)
+
+    Returns:
+        The outermost provider layer
+
+    Raises:
+        ValueError: If the configured provider is not listed under ``providers``
+    """
+    pipeline_config = config.get("pipeline", {})
+    provider_config = pipeline_config.get("provider", {})
+    provider_name = provider_config.get("name", "siliconflow")
+    settings_providers = config.get("providers", {})
+
+    if provider_name == "router":
+        # Several keys/endpoints behind one provider, weighted by capacity
+        # Provider-level settings (stream, timeout, rpm, ...) apply to every
+        # backend; a backend entry's own keys take precedence
+        inherited = {
+            key: value
+            for key, value in provider_config.items()
+            if key not in ("name", "backends", "router", "concurrency")
+        }
+        backends = []
+        for index, entry in enumerate(provider_config.get("backends") or []):
+            backend_provider = entry.get("provider", "siliconflow")
+            if backend_provider not in settings_providers and backend_provider != "siliconflow":
+                raise ValueError(f"Unknown provider for router backend: {backend_provider}")
+            backend_settings = {**settings_providers.get(backend_provider, {}), **entry}
+            backend_name = entry.get("name") or (
+                backend_provider if index == 0 else f"{backend_provider}-{index + 1}"
+            )
+            adapter = provider_class(backend_settings.get("adapter", DEFAULT_ADAPTER))
+            backends.append(
+                RouterBackend(
+                    name=backend_name,
+                    provider=adapter(
+                        build_provider_config(
+                            backend_name, backend_settings, {**inherited, **entry}, config
+                        )
+                    ),
+                    content_risk_code=backend_settings.get("content_risk_code"),
+                )
+            )
+        print(f"\nInitializing router over {len(backends)} backends...")
+        provider = RouterProvider(
+            backends, RouterConfig.from_dict(provider_config.get("router") or {})
+        )
+    else:
+        # Any endpoint listed under providers.<name>; ``adapter`` picks the
+        # client class (default: OpenAI-compatible chat completions)
+        if provider_name not in settings_providers and provider_name != "siliconflow":
+            raise ValueError(f"Unsupported provider: {provider_name}")
+        provider_settings = settings_providers.get(provider_name, {})
+        adapter = provider_class(provider_settings.get("adapter", DEFAULT_ADAPTER))
+        print(f"\nInitializing {provider_name} provider...")
+        provider = adapter(
+            build_provider_config(provider_name, provider_settings, provider_config, config)
+        )
+
+    # Retries: provider block > providers.<name> > runtime.max_retries
+    provider_settings = settings_providers.get(provider_name, {})
+    retry_settings = dict(
+        provider_config.get("retry", provider_settings.get("retry")) or {}
+    )
+    retry_settings.setdefault(
+        "max_retries", config.get("runtime", {}).get("max_retries", 3)
+    )
+    breaker_settings = provider_config.get(
+        "circuit_breaker", provider_settings.get("circuit_breaker")
+    ) or {}
+    provider = RetryingProvider(
+        provider,
+        RetryPolicy.from_dict(retry_settings),
+        CircuitBreaker.from_dict(breaker_settings),
+    )
+
+    # Wrap provider with the persistent response cache if enabled
+    cache_settings = dict(pipeline_config.get("cache", config.get("cache")) or {})
+    if cache_mode:
+        cache_settings["mode"] = cache_mode
+    if cache_settings and normalize_cache_mode(cache_settings.get("mode", "readwrite")) != "off":
+        cache_config = CacheConfig.from_dict(cache_settings)
+        print(f"Response cache: {cache_config.path} (mode={cache_config.mode})")
+        provider = CachedProvider(provider, ResponseCache(cache_config))
+    return provider
+
+
+def build_prompts(config: Dict[str, Any]) -> List[TemplatePrompt]:
+    """
+    Load the prompts named by the ``prompts`` block.
+
+    Raises:
+        ValueError: If no prompts directory is configured
+    """
+    pipeline_config = config.get("pipeline", {})
+    prompts_config = pipeline_config.get("prompts", {})
+    prompts_dir = prompts_config.get("dir")
+
+    if not prompts_dir:
+        raise ValueError("No prompts directory specified in config")
+
+    print(f"\nLoading prompts from {prompts_dir}...")
+    prompt_loader = PromptLoader(
+        prompts_dir=prompts_dir,
+        temperature_overrides=prompts_config.get("temperature_overrides", {}),
+        depends_on=prompts_config.get("depends_on"),
+        max_tokens=pipeline_config.get("runtime", {}).get("max_tokens"),
+    )
+    prompts = prompt_loader.load_prompts()
+    print(f"Loaded {len(prompts)} prompts")
+    return prompts
+
+
+@dataclass
+class PipelineParts:
+    """A built pipeline plus the components its run summary reports on."""
+
+    pipeline: BasePipeline
+    provider: Any
+    prompts: List[TemplatePrompt]
+    deduplicator: Optional[Deduplicator] = None
+    limiter: Optional[AdaptiveLimiter] = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the counters printed at the end of a run."""
+        stats = dict(self.provider.stats()) if hasattr(self.provider, "stats") else {}
+        if self.deduplicator is not None:
+            stats["dedup"] = self.deduplicator.stats()
+        if self.limiter is not None:
+            stats["concurrency"] = self.limiter.stats()
+        stale = METRICS.to_dict()["counters"].get("stale_sections_total", [])
+        if stale:
+            stats["recomputed"] = {
+                entry["labels"]["section"]: int(entry["value"]) for entry in stale
+            }
+        return stats
+
+    def close(self) -> None:
+        """Release pooled HTTP connections and the journal."""
+        self.provider.close()
+        if self.pipeline.journal is not None:
+            self.pipeline.journal.close()
+
+
+def build_fingerprints(config: Dict[str, Any], prompts: List[TemplatePrompt]) -> SectionFingerprints:
+    """
+    Section fingerprints as the pipeline built from ``config`` computes them.
+
+    The model is resolved from the settings the way ``build_provider`` does,
+    without constructing clients, so a process that only fills a work queue
+    needs no provider stack.
+    """
+    models = dict.fromkeys(plan.model for plan in provider_plans(config))
+    return section_fingerprints(prompts, "+".join(models))
+
+
+def build_pipeline(
+    config: Dict[str, Any],
+    journal: Optional[RunJournal] = None,
+    cache_mode: Optional[str] = None,
+    provider: Any = None,
+) -> PipelineParts:
+    """
+    Build the provider stack, prompts and pipeline described by ``config``.
+
+    Args:
+        config: Whole merged configuration
+        journal: Journal the pipeline appends finished results to
+        cache_mode: Overrides ``cache.mode``
+        provider: Ready provider to use instead of the configured one
+            (e.g. a stub in tests)
+
+    Returns:
+        The pipeline and the components it was built from
+    """
+    pipeline_config = config.get("pipeline", {})
+    if provider is None:
+        provider = build_provider(config, cache_mode)
+    prompts = build_prompts(config)
+
+    # Optional chunking of long documents with a per-section reduce step
+    chunker = None
+    merger = None
+    chunking_config = pipeline_config.get("chunking") or {}
+    if chunking_config:
+        chunker = TextChunker(
+            max_tokens=chunking_config.get("max_tokens", 3000),
+            overlap_tokens=chunking_config.get("overlap_tokens", 200),
+            sections=chunking_config.get("sections"),
+        )
+        merge_config = chunking_config.get("merge") or {}
+        merger = SectionMerger(
+            strategies=merge_config.get("sections"),
+            default=merge_config.get("default", "union"),
+            reduce_prompts={
+                section: TemplatePrompt(
+                    name=f"{section}.reduce",
+                    section=section,
+                    template=Path(path).read_text(encoding="utf-8"),
+                    max_tokens=pipeline_config.get("runtime", {}).get("max_tokens"),
+                )
+                for section, path in (merge_config.get("reduce_prompts") or {}).items()
+            },
+        )
+        print(f"Chunking documents above {chunker.max_tokens} tokens")
+
+    # Optional multi-document batching for prompts that only read the document
+    batcher = None
+    batching_config = pipeline_config.get("batching") or {}
+    if batching_config and batching_config.get("enabled", True):
+        batcher = DocumentBatcher(BatchConfig.from_dict(batching_config), prompts)
+        batched_names = ", ".join(prompt.name for prompt in batcher.prompts) or "none"
+        print(
+            f"Batching up to {batcher.config.documents_per_request} documents per request "
+            f"for prompts: {batched_names}"
+        )
+
+    # Optional near-duplicate detection: reposts copy their representative's sections
+    deduplicator = None
+    dedup_config = pipeline_config.get("dedup") or {}
+    if dedup_config and dedup_config.get("enabled", True):
+        deduplicator = Deduplicator(DedupConfig.from_dict(dedup_config))
+        print(f"Deduplicating documents (similarity >= {deduplicator.config.threshold})")
+
+    # Optional local JSON repair, schema checks and single-field salvage
+    structured = None
+    structured_config = dict(pipeline_config.get("structured_output") or {})
+    safeguards = pipeline_config.get("safeguards") or {}
+    if "salvage_single_field" in safeguards:
+        structured_config.setdefault("salvage_single_field", safeguards["salvage_single_field"])
+    if structured_config and structured_config.get("enabled", True):
+        structured = StructuredOutput(StructuredOutputConfig.from_dict(structured_config))
+        with_schema = [prompt.name for prompt in prompts if structured.schema_for(prompt)]
+        print(
+            "Structured output: repairing JSON locally"
+            f"{', schemas for ' + ', '.join(with_schema) if with_schema else ''}"
+        )
+
+    # Optional AIMD concurrency: grows while healthy, backs off on 429s/latency
+    limiter = None
+    provider_config = pipeline_config.get("provider", {})
+    provider_settings = config.get("providers", {}).get(
+        provider_config.get("name", "siliconflow"), {}
+    )
+    adaptive_config = provider_config.get(
+        "adaptive_concurrency", provider_settings.get("adaptive_concurrency")
+    ) or {}
+    if adaptive_config and adaptive_config.get("enabled", True):
+        limiter = AdaptiveLimiter(LimiterConfig.from_dict(adaptive_config))
+        print(
+            f"Adaptive concurrency: {limiter.config.min_limit}..{limiter.config.max_limit} "
+            f"(starting at {limiter.limit})"
+        )
+
+    # Optional largest-first dispatch within a read-ahead window
+    scheduling = None
+    scheduling_config = pipeline_config.get("scheduling") or {}
+    if scheduling_config and scheduling_config.get("enabled", True):
+        scheduling = SchedulingConfig.from_dict(scheduling_config)
+        print("Scheduling: largest estimated cost first")
+
+    pipeline = BasePipeline(
+        prompts=prompts,
+        provider=provider,
+        concurrency=provider.config.concurrency,
+        journal=journal,
+        chunker=chunker,
+        merger=merger,
+        batcher=batcher,
+        deduplicator=deduplicator,
+        structured=structured,
+        limiter=limiter,
+        scheduling=scheduling,
+    )
+    return PipelineParts(
+        pipeline=pipeline,
+        provider=provider,
+        prompts=prompts,
+        deduplicator=deduplicator,
+        limiter=limiter,
+    )
@@ -6,8 +6,40 @@ Excel readers, prompt planning, provider execution, and result sinks.
 """
 from __future__ import annotations
 
+import contextvars
+import itertools
+import threading
+import time
+from collections import ChainMap, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Protocol
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+from openextract.pipelines.fingerprint import SectionFingerprints
+from openextract.pipelines.limiter import AdaptiveLimiter
+from openextract.pipelines.scheduler import CostEstimator, LptScheduler, SchedulingConfig
+from openextract.utils.metrics import METRICS, span, usage_scope
+
+if TYPE_CHECKING:
+    from openextract.pipelines.batching import DocumentBatcher
+    from openextract.pipelines.dedup import Deduplicator
+    from openextract.pipelines.journal import RunJournal
+    from openextract.pipelines.merge import SectionMerger
+    from openextract.pipelines.structured import StructuredOutput
+    from openextract.utils.chunking import TextChunker
 
 
 @dataclass
@@ -21,7 +53,14 @@ class Document:
 
 
 class PromptUnit(Protocol):
-    """Single prompt execution unit definition."""
+    """Single prompt execution unit definition.
+
+    Units may also expose ``depends_on``: the sections whose results they
+    read from ``context``. Units without it are treated as depending on
+    every unit before them. A ``fingerprint()`` method, if present, should
+    hash everything in the unit that shapes its output (see
+    ``openextract.pipelines.fingerprint``).
+    """
 
     name: str
     section: str
@@ -50,42 +89,698 @@ class PipelineResult:
     title: str
     structured_tags: Dict[str, Any]
     errors: List[Dict[str, Any]] = field(default_factory=list)
+    usage: Dict[str, int] = field(default_factory=dict)
+    duplicate_of: Optional[str] = None  # doc_id the sections were copied from
+    fingerprints: Dict[str, str] = field(default_factory=dict)  # section -> inputs hash
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        data = {
+            "doc_id": self.doc_id,
+            "title": self.title,
+            "structured_tags": self.structured_tags,
+            "errors": self.errors,
+        }
+        if self.usage:
+            data["usage"] = self.usage
+        if self.duplicate_of is not None:
+            data["duplicate_of"] = self.duplicate_of
+        if self.fingerprints:
+            data["fingerprints"] = self.fingerprints
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PipelineResult":
+        """Rebuild a result from ``to_dict`` output."""
+        return cls(
+            doc_id=str(data["doc_id"]),
+            title=data.get("title", ""),
+            structured_tags=data.get("structured_tags") or {},
+            errors=data.get("errors") or [],
+            usage=data.get("usage") or {},
+            duplicate_of=data.get("duplicate_of"),
+            fingerprints=data.get("fingerprints") or {},
+        )
+
+
+def prompt_dependencies(prompts: List[PromptUnit]) -> List[Set[str]]:
+    """
+    Return the sections each prompt reads from ``context``.
+
+    Declared ``depends_on`` entries are kept if they name another prompt's
+    section; prompts without ``depends_on`` depend on every earlier prompt.
+
+    Args:
+        prompts: Prompt units in their configured order
+
+    Returns:
+        One set of section names per prompt, in the same order
+    """
+    sections = {prompt.section for prompt in prompts}
+    dependencies: List[Set[str]] = []
+    for index, prompt in enumerate(prompts):
+        declared = getattr(prompt, "depends_on", None)
+        if declared is None:
+            deps = {earlier.section for earlier in prompts[:index]}
+        else:
+            deps = {dep for dep in declared if dep in sections and dep != prompt.section}
+        dependencies.append(deps)
+    return dependencies
+
+
+def plan_prompt_levels(prompts: List[PromptUnit]) -> List[List[PromptUnit]]:
+    """
+    Group prompts into dependency levels.
+
+    Prompts in the same level do not depend on each other and may run at the
+    same time; each level only depends on earlier levels. Within a level the
+    original prompt order is kept.
+
+    Args:
+        prompts: Prompt units in their configured order
+
+    Returns:
+        List of levels, each a list of prompt units
+
+    Raises:
+        ValueError: If the declared dependencies contain a cycle
+    """
+    dependencies = prompt_dependencies(prompts)
+    levels: List[List[PromptUnit]] = []
+    done: Set[str] = set()
+    remaining = list(range(len(prompts)))
+    while remaining:
+        ready = [index for index in remaining if dependencies[index] <= done]
+        if not ready:
+            names = ", ".join(prompts[index].name for index in remaining)
+            raise ValueError(f"Prompt dependency cycle between: {names}")
+        levels.append([prompts[index] for index in ready])
+        done.update(prompts[index].section for index in ready)
+        remaining = [index for index in remaining if index not in ready]
+    return levels
+
+
+def section_fingerprints(prompts: List[PromptUnit], model: str = "") -> SectionFingerprints:
+    """Fingerprints a pipeline running ``prompts`` on ``model`` stamps its sections with."""
+    return SectionFingerprints(
+        plan_prompt_levels(prompts),
+        {prompt.section: deps for prompt, deps in zip(prompts, prompt_dependencies(prompts))},
+        model=model,
+    )
+
+
+@dataclass
+class _Executors:
+    """Worker pools shared by one ``run_iter`` call."""
+
+    prompts: ThreadPoolExecutor
+    chunks: Optional[ThreadPoolExecutor] = None
+
+
+def _submit(executor: ThreadPoolExecutor, fn: Any, *args: Any) -> Future:
+    """Submit ``fn`` so that it sees the caller's context (usage scopes)."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
 
 
 class BasePipeline:
-    """Minimal pipeline skeleton."""
+    """Minimal pipeline skeleton.
+
+    Documents are processed by a bounded worker pool: at most
+    ``concurrency`` provider calls are in flight at once. Within a document,
+    prompts are grouped into dependency levels (see ``plan_prompt_levels``)
+    and independent prompts run concurrently, while prompts that read an
+    earlier section from ``context`` wait for it.
+
+    When a ``journal`` is given, every result is appended to it as soon as
+    its document finishes, so an interrupted run can be resumed.
+
+    When a ``chunker`` is given, documents that exceed its token budget are
+    split into chunks; each prompt then runs on all chunks in parallel and
+    the partial results are reduced per section by ``merger``.
+
+    When a ``batcher`` is given, prompts that only read the document are
+    first run for several short documents per request; whatever the batch
+    responses do not cover is run per document as usual.
+
+    When a ``deduplicator`` is given, documents it recognizes as
+    (near-)duplicates of an earlier document are not processed; they get a
+    copy of that document's sections with ``duplicate_of`` set.
+
+    When a ``limiter`` is given, it replaces the fixed ``concurrency``: the
+    number of calls in flight follows its adaptive limit, and the worker
+    pools are sized for its ceiling.
+
+    When ``scheduling`` is given, documents are read ahead in a bounded
+    window and dispatched largest estimated cost first (see
+    ``openextract.pipelines.scheduler``); results are still yielded in
+    source order.
+
+    When ``structured`` is given, every response is repaired into a JSON
+    value and checked against its prompt's schema; missing fields are
+    re-requested on their own instead of re-running the prompt.
+
+    Every result carries a fingerprint per section (see
+    ``openextract.pipelines.fingerprint``). Sections of a ``previous``
+    result whose fingerprint changed, because their prompt, the model, the
+    document or an upstream section changed, are dropped and re-run; the
+    other sections are reused.
+    """
 
     def __init__(
         self,
         prompts: Iterable[PromptUnit],
         provider: ProviderAdapter,
+        concurrency: int = 1,
+        journal: Optional["RunJournal"] = None,
+        chunker: Optional["TextChunker"] = None,
+        merger: Optional["SectionMerger"] = None,
+        batcher: Optional["DocumentBatcher"] = None,
+        deduplicator: Optional["Deduplicator"] = None,
+        structured: Optional["StructuredOutput"] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        scheduling: Optional[SchedulingConfig] = None,
     ) -> None:
         self.prompts = list(prompts)
         self.provider = provider
+        self.concurrency = max(1, int(concurrency or 1))
+        if limiter is not None:
+            self.concurrency = max(self.concurrency, limiter.config.max_limit)
+        self.limiter = limiter or AdaptiveLimiter.fixed(self.concurrency)
+        self.journal = journal
+        self.chunker = chunker
+        if chunker is not None and merger is None:
+            from openextract.pipelines.merge import SectionMerger
 
-    def run(self, documents: Iterable[Document]) -> List[PipelineResult]:
-        """Execute prompts for all documents and return structured results."""
+            merger = SectionMerger()
+        self.merger = merger
+        self.batcher = batcher
+        self.deduplicator = deduplicator
+        # Results (or futures) that later duplicates may copy; kept across
+        # run_iter calls like the dedup index, so a service's micro-batches
+        # copy from representatives seen in earlier batches
+        self._representatives: "OrderedDict[str, Any]" = OrderedDict()
+        self._representatives_lock = threading.Lock()
+        self.structured = structured
+        self.scheduling = scheduling
+        self.costs = CostEstimator(self.prompts) if scheduling is not None else None
+        self.levels = plan_prompt_levels(self.prompts)
+        self.fingerprints = section_fingerprints(
+            self.prompts, getattr(getattr(provider, "config", None), "model", "") or ""
+        )
+
+    def run(
+        self,
+        documents: Iterable[Document],
+        previous: Optional[Mapping[str, PipelineResult]] = None,
+    ) -> List[PipelineResult]:
+        """Execute prompts for all documents and return structured results.
+
+        Convenience wrapper that collects ``run_iter``; prefer ``run_iter``
+        for large corpora so memory stays bounded.
+        """
+
+        return list(self.run_iter(documents, previous=previous))
+
+    def run_iter(
+        self,
+        documents: Iterable[Document],
+        previous: Optional[Mapping[str, PipelineResult]] = None,
+    ) -> Iterator[PipelineResult]:
+        """Execute prompts for all documents, yielding results as they finish.
 
-        results: List[PipelineResult] = []
+        Results are yielded in the same order as ``documents`` regardless
+        of the order in which workers finish them. Only a small window of
+        documents is held in memory at any time.
+
+        Args:
+            documents: Documents to process
+            previous: Results of an earlier run keyed by ``doc_id`` (e.g. from
+                ``RunJournal.load``). Sections whose fingerprint is out of date
+                are dropped first; documents with every section present are
+                then returned as-is, and for the rest only missing sections
+                are run.
+        """
+
+        # Up-to-date copies of the previous results that had stale sections
+        refreshed: Dict[str, PipelineResult] = {}
+        if previous:
+            documents = self._drop_stale(documents, previous, refreshed)
+            previous = ChainMap(refreshed, previous)
+        previous = previous or {}
+        # doc_id -> representative doc_id, filled as documents are read
+        duplicates: Dict[str, str] = {}
+        if self.deduplicator is not None:
+            documents = self._assign_duplicates(documents, duplicates)
+        items = self._seeded(documents, previous, duplicates)
+        if self.concurrency == 1:
+            for document, seed, batched in items:
+                representative = self._representative(document, seed, batched, duplicates)
+                if representative is not None:
+                    result = self._copy_result(document, representative)
+                else:
+                    result = self._resume_or_process(document, seed, None, batched)
+                    self._remember(document.doc_id, result)
+                yield result
+            return
+
+        # Keep a small backlog beyond the worker count so that workers never
+        # idle while the head of the queue is still running, without reading
+        # the whole source into memory. Largest-first dispatch needs a wider
+        # window to choose from.
+        max_pending = self.concurrency * 2
+        if self.scheduling is not None:
+            max_pending = self.scheduling.window(self.concurrency)
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="openextract-doc",
+        ) as executor, ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="openextract-prompt",
+        ) as prompt_executor, ThreadPoolExecutor(
+            max_workers=self.concurrency if self.chunker is not None else 1,
+            thread_name_prefix="openextract-chunk",
+        ) as chunk_executor:
+            executors = _Executors(
+                prompts=prompt_executor,
+                chunks=chunk_executor if self.chunker is not None else None,
+            )
+            scheduler = None
+            if self.scheduling is not None:
+                scheduler = LptScheduler(executor, self.concurrency)
+            pending: Deque[Future[PipelineResult]] = deque()
+            for document, seed, batched in items:
+                representative = self._representative(document, seed, batched, duplicates)
+                if representative is not None:
+                    pending.append(self._copy_later(document, representative))
+                elif not batched and seed is not None and self.is_complete(seed):
+                    done: Future[PipelineResult] = Future()
+                    done.set_result(seed)
+                    pending.append(done)
+                    self._remember(document.doc_id, done)
+                else:
+                    if scheduler is not None:
+                        done_sections = set(batched)
+                        if seed is not None:
+                            done_sections.update(seed.structured_tags)
+                        future = scheduler.submit(
+                            self.costs.document_cost(document, done_sections),
+                            self._resume_or_process,
+                            document,
+                            seed,
+                            executors,
+                            batched,
+                        )
+                    else:
+                        future = executor.submit(
+                            self._resume_or_process, document, seed, executors, batched
+                        )
+                    pending.append(future)
+                    self._remember(document.doc_id, future)
+                if len(pending) >= max_pending:
+                    yield self._next_result(pending, scheduler)
+            while pending:
+                yield self._next_result(pending, scheduler)
+
+    @staticmethod
+    def _next_result(
+        pending: "Deque[Future[PipelineResult]]",
+        scheduler: Optional[LptScheduler],
+    ) -> PipelineResult:
+        """Wait for the oldest pending result.
+
+        With a scheduler, the oldest results (one per worker) jump the queue
+        so that reading ahead is not held up by small documents.
+        """
+        if scheduler is not None and not pending[0].done():
+            scheduler.promote(itertools.islice(pending, scheduler.slots))
+        return pending.popleft().result()
+
+    def is_complete(self, result: PipelineResult) -> bool:
+        """Return True if ``result`` holds a section for every prompt."""
+        return all(prompt.section in result.structured_tags for prompt in self.prompts)
+
+    def _drop_stale(
+        self,
+        documents: Iterable[Document],
+        previous: Mapping[str, PipelineResult],
+        refreshed: Dict[str, PipelineResult],
+    ) -> Iterator[Document]:
+        """Store in ``refreshed`` each previous result minus its stale sections."""
         for document in documents:
-            structured_sections: Dict[str, Any] = {}
-            context: Dict[str, Any] = {}
-            errors: List[Dict[str, Any]] = []
-            for prompt in self.prompts:
-                payload = prompt.render_input(document, context)
-                try:
-                    response = self.provider.invoke(prompt, document, payload)
-                except Exception as exc:  # placeholder error handling
-                    errors.append({"prompt": prompt.name, "error": str(exc)})
+            seed = previous.get(document.doc_id)
+            if seed is not None and seed.fingerprints:
+                expected = self.fingerprints.compute(document)
+                stale = SectionFingerprints.stale(seed.fingerprints, expected)
+                if stale:
+                    for section in stale:
+                        if section in expected:
+                            METRICS.inc("stale_sections_total", section=section)
+                    refreshed[document.doc_id] = PipelineResult(
+                        doc_id=seed.doc_id,
+                        title=seed.title,
+                        structured_tags={
+                            section: value
+                            for section, value in seed.structured_tags.items()
+                            if section not in stale
+                        },
+                        fingerprints={
+                            section: fingerprint
+                            for section, fingerprint in seed.fingerprints.items()
+                            if section not in stale
+                        },
+                    )
+            yield document
+
+    def _seeded(
+        self,
+        documents: Iterable[Document],
+        previous: Mapping[str, PipelineResult],
+        duplicates: Optional[Mapping[str, str]] = None,
+    ) -> Iterator[Tuple[Document, Optional[PipelineResult], Dict[str, Any]]]:
+        """Pair each document with its earlier result and any batched sections."""
+        if self.batcher is not None:
+            yield from self.batcher.seed(
+                documents, previous, self._invoke, self.concurrency, skip=duplicates
+            )
+            return
+        for document in documents:
+            yield document, previous.get(document.doc_id), {}
+
+    def _assign_duplicates(
+        self,
+        documents: Iterable[Document],
+        duplicates: Dict[str, str],
+    ) -> Iterator[Document]:
+        """Record each duplicate's representative in ``duplicates`` as it passes."""
+        for document in documents:
+            with span("dedup"):
+                representative = self.deduplicator.assign(document)
+            if representative is not None and representative != document.doc_id:
+                duplicates[document.doc_id] = representative
+            yield document
+
+    def _representative(
+        self,
+        document: Document,
+        seed: Optional[PipelineResult],
+        batched: Dict[str, Any],
+        duplicates: Dict[str, str],
+    ) -> Any:
+        """Return the known result (or future) ``document`` should copy, if any.
+
+        Earlier complete results win over copying, and representatives that
+        are not (or no longer) remembered are simply processed again.
+        """
+        representative = duplicates.pop(document.doc_id, None)
+        if representative is None:
+            return None
+        if not batched and seed is not None and self.is_complete(seed):
+            return None
+        with self._representatives_lock:
+            return self._representatives.get(representative)
+
+    def _remember(self, doc_id: str, value: Any) -> None:
+        """Keep results that later duplicates may copy, bounded like the index."""
+        if self.deduplicator is None:
+            return
+        limit = self.deduplicator.config.max_entries
+        with self._representatives_lock:
+            self._representatives[doc_id] = value
+            self._representatives.move_to_end(doc_id)
+            if limit is not None and len(self._representatives) > limit:
+                self._representatives.popitem(last=False)
+
+    def _copy_result(self, document: Document, source: PipelineResult) -> PipelineResult:
+        """Give ``document`` the sections of its representative and journal it."""
+        result = PipelineResult(
+            doc_id=document.doc_id,
+            title=document.title,
+            structured_tags=dict(source.structured_tags),
+            errors=list(source.errors),
+            duplicate_of=source.doc_id,
+        )
+        if source.fingerprints:
+            # Stamped for this document, so the copy is only redone when it must be
+            expected = self.fingerprints.compute(document)
+            result.fingerprints = {
+                section: expected[section]
+                for section in source.fingerprints
+                if section in expected
+            }
+        METRICS.inc("duplicates_total")
+        if self.journal is not None:
+            self.journal.append(result)
+        return result
+
+    def _copy_later(
+        self,
+        document: Document,
+        source: "Future[PipelineResult]",
+    ) -> "Future[PipelineResult]":
+        """Future for the copy of ``source``'s result, without holding a worker."""
+        copied: Future[PipelineResult] = Future()
+
+        def _done(future: "Future[PipelineResult]") -> None:
+            try:
+                copied.set_result(self._copy_result(document, future.result()))
+            except BaseException as exc:
+                copied.set_exception(exc)
+
+        source.add_done_callback(_done)
+        return copied
+
+    def _resume_or_process(
+        self,
+        document: Document,
+        seed: Optional[PipelineResult],
+        executors: Optional[_Executors] = None,
+        batched: Optional[Dict[str, Any]] = None,
+    ) -> PipelineResult:
+        """Reuse a complete earlier result, otherwise process and journal it.
+
+        ``batched`` sections (from batch requests) are treated as done.
+        """
+        if batched and self.structured is not None:
+            batched = self._check_batched(batched)
+        if batched:
+            expected = self.fingerprints.compute(document)
+            seed = PipelineResult(
+                doc_id=document.doc_id,
+                title=document.title,
+                structured_tags={**(seed.structured_tags if seed else {}), **batched},
+                fingerprints={
+                    **(seed.fingerprints if seed else {}),
+                    **{section: expected[section] for section in batched},
+                },
+            )
+        elif seed is not None and self.is_complete(seed):
+            return seed
+        result = self._process_document(document, executors, seed)
+        if self.journal is not None:
+            self.journal.append(result)
+        return result
+
+    def _check_batched(self, batched: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep batched sections that pass the schema; the rest run singly."""
+        prompts = {prompt.section: prompt for prompt in self.prompts}
+        checked: Dict[str, Any] = {}
+        for section, response in batched.items():
+            prompt = prompts[section]
+            value, missing = self.structured.parse(prompt, response)
+            if value is None or missing:
+                METRICS.inc("batch_fallbacks_total", prompt=prompt.name)
+                continue
+            checked[section] = self.structured.finish(prompt, response, value)
+        return checked
+
+    def _process_document(
+        self,
+        document: Document,
+        executors: Optional[_Executors] = None,
+        seed: Optional[PipelineResult] = None,
+    ) -> PipelineResult:
+        """Run every prompt for one document, level by level.
+
+        Sections already present in ``seed`` are kept and not re-run. Token
+        usage reported by the provider during this call is attached to the
+        result.
+        """
+
+        with usage_scope() as usage:
+            result = self._run_levels(document, executors, seed)
+        if usage.calls:
+            result.usage = usage.to_dict()
+        METRICS.inc("documents_total", status="error" if result.errors else "ok")
+        return result
+
+    def _run_levels(
+        self,
+        document: Document,
+        executors: Optional[_Executors],
+        seed: Optional[PipelineResult],
+    ) -> PipelineResult:
+        chunks: Optional[List[Document]] = None
+        if self.chunker is not None:
+            chunks = self.chunker.split(document)
+            if len(chunks) == 1:
+                chunks = None
+
+        structured_sections: Dict[str, Any] = dict(seed.structured_tags) if seed else {}
+        # Reused sections stored without a fingerprint predate fingerprints
+        unverified: Set[str] = set()
+        if seed is not None:
+            unverified = {
+                section for section in structured_sections if section not in seed.fingerprints
+            }
+        context: Dict[str, Any] = dict(structured_sections)
+        errors: List[Dict[str, Any]] = []
+        for level in self.levels:
+            runnable: List[PromptUnit] = []
+            for prompt in level:
+                if prompt.section in structured_sections:
+                    continue
+                missing = [
+                    dep
+                    for dep in getattr(prompt, "depends_on", None) or []
+                    if dep not in context
+                ]
+                if missing:
+                    errors.append(
+                        {
+                            "prompt": prompt.name,
+                            "error": f"Skipped: missing dependency {', '.join(missing)}",
+                        }
+                    )
+                    continue
+                runnable.append(prompt)
+
+            if executors is not None and len(runnable) > 1:
+                snapshot = dict(context)
+                futures = [
+                    _submit(
+                        executors.prompts,
+                        self._run_prompt,
+                        prompt,
+                        document,
+                        snapshot,
+                        chunks,
+                        executors,
+                    )
+                    for prompt in runnable
+                ]
+                outcomes = [future.result() for future in futures]
+            else:
+                outcomes = [
+                    self._run_prompt(prompt, document, context, chunks, executors)
+                    for prompt in runnable
+                ]
+
+            for prompt, (response, error) in zip(runnable, outcomes):
+                if error is not None:
+                    errors.append({"prompt": prompt.name, "error": error})
                     continue
                 structured_sections[prompt.section] = response
                 context[prompt.section] = response
-            results.append(
-                PipelineResult(
-                    doc_id=document.doc_id,
-                    title=document.title,
-                    structured_tags=structured_sections,
-                    errors=errors,
-                )
+
+        expected = self.fingerprints.compute(document)
+        return PipelineResult(
+            doc_id=document.doc_id,
+            title=document.title,
+            # Report sections in configured prompt order, not completion order
+            structured_tags={
+                prompt.section: structured_sections[prompt.section]
+                for prompt in self.prompts
+                if prompt.section in structured_sections
+            },
+            errors=errors,
+            fingerprints={
+                prompt.section: expected[prompt.section]
+                for prompt in self.prompts
+                if prompt.section in structured_sections and prompt.section not in unverified
+            },
+        )
+
+    def _run_prompt(
+        self,
+        prompt: PromptUnit,
+        document: Document,
+        context: Dict[str, Any],
+        chunks: Optional[List[Document]] = None,
+        executors: Optional[_Executors] = None,
+    ) -> Tuple[Any, Optional[str]]:
+        """Render and invoke one prompt; return ``(response, error)``.
+
+        With ``chunks``, the prompt is mapped over every chunk and the
+        partial results are reduced into a single section value.
+        """
+
+        try:
+            if not chunks or not self.chunker.applies_to(prompt):
+                return self._render_and_invoke(prompt, document, context), None
+
+            # Chunks are not salvaged: a field may well be absent from one chunk
+            if executors is not None and executors.chunks is not None:
+                futures = [
+                    _submit(executors.chunks, self._render_and_invoke, prompt, chunk, context, False)
+                    for chunk in chunks
+                ]
+                partials = [future.result() for future in futures]
+            else:
+                partials = [
+                    self._render_and_invoke(prompt, chunk, context, False) for chunk in chunks
+                ]
+            merged = self.merger.merge(prompt, document, partials, self._invoke)
+            if self.structured is not None:
+                merged = self.structured.process(prompt, document, {}, merged)
+            return merged, None
+        except Exception as exc:  # placeholder error handling
+            METRICS.inc("prompt_errors_total", prompt=prompt.name)
+            return None, str(exc)
+
+    def _render_and_invoke(
+        self,
+        prompt: PromptUnit,
+        document: Document,
+        context: Dict[str, Any],
+        salvage: bool = True,
+    ) -> Any:
+        with span("render", prompt=prompt.name):
+            payload = prompt.render_input(document, context)
+        response = self._invoke(prompt, document, payload)
+        if self.structured is None:
+            return response
+        if not salvage:
+            # Partial results are merged as JSON values and shaped afterwards
+            value, _ = self.structured.parse(prompt, response)
+            return response if value is None else value
+        return self.structured.process(prompt, document, payload, response, self._invoke)
+
+    def _invoke(self, prompt: PromptUnit, document: Document, payload: Dict[str, Any]) -> Any:
+        """Call the provider while holding one in-flight slot.
+
+        Records the call's latency and token usage under the prompt name,
+        and reports its outcome to the concurrency limiter.
+        """
+        priority = self.costs.prompt_cost(document, prompt) if self.costs is not None else 0.0
+        with span("queue"):
+            ticket = self.limiter.acquire(priority)
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            with usage_scope() as usage:
+                return self.provider.invoke(prompt, document, payload)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.limiter.release(
+                ticket, None if error else elapsed, error=error, key=prompt.name
             )
-        return results
+            METRICS.observe("prompt_seconds", elapsed, prompt=prompt.name)
+            METRICS.inc("prompt_calls_total", prompt=prompt.name)
+            if usage.calls:
+                METRICS.inc("tokens_total", usage.prompt_tokens, prompt=prompt.name, kind="prompt")
+                METRICS.inc(
+                    "tokens_total", usage.completion_tokens, prompt=prompt.name, kind="completion"
+                )
@@ -0,0 +1,368 @@
+"""Multi-document request batching for short documents.
+
+Prompts usually carry a long fixed instruction block and a comparatively
+short document. For prompts that only read the document itself, several
+documents can share one request: the instructions are sent once, followed
+by every document under a ``### doc_id: ...`` header, and the model is
+asked for one JSON object keyed by ``doc_id``. The per-document values are
+handed to the pipeline as already-finished sections; documents whose entry
+is missing or malformed simply fall through to the regular single-document
+call.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Container, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from openextract.pipelines.base import Document, PipelineResult, PromptUnit
+from openextract.utils.jsonrepair import loads_lenient
+from openextract.utils.metrics import METRICS
+from openextract.utils.tokens import estimate_tokens
+
+# Placeholders a prompt may use and still be batched
+BATCHABLE_FIELDS = {"title", "content"}
+
+BATCH_PLACEHOLDER = "（见下方各文档）"
+
+BATCH_INSTRUCTIONS = (
+    "\n\n以上任务需要分别应用于下面 {count} 篇文档，每篇文档以“### doc_id: <编号>”开头。\n"
+    "请对每篇文档分别完成任务，只输出一个 JSON 对象：键为 doc_id（字符串），"
+    "值为该文档按上述要求得到的 JSON 结果。不要遗漏任何 doc_id，不要输出其他说明文字。\n\n"
+)
+
+DOCUMENT_BLOCK = "### doc_id: {doc_id}\n标题：{title}\n正文：{content}\n\n"
+
+# (prompt, document, payload) -> provider response
+InvokeFn = Callable[[Any, Document, Dict[str, Any]], Any]
+
+# (document, earlier result, sections filled by batch calls)
+BatchedItem = Tuple[Document, Optional[PipelineResult], Dict[str, Any]]
+
+
+@dataclass
+class BatchConfig:
+    """Settings for ``DocumentBatcher``."""
+
+    max_documents: int = 8
+    max_input_tokens: int = 6000
+    max_output_tokens: int = 4000
+    output_tokens_per_document: int = 400
+    max_document_tokens: int = 1000  # longer documents are never batched
+    sections: Optional[List[str]] = None  # None: every batchable prompt
+    window: Optional[int] = None  # documents read ahead for packing
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchConfig":
+        """Build from a YAML ``batching`` block."""
+        config = cls(
+            max_documents=data.get("max_documents", cls.max_documents),
+            max_input_tokens=data.get("max_input_tokens", cls.max_input_tokens),
+            max_output_tokens=data.get("max_output_tokens", cls.max_output_tokens),
+            output_tokens_per_document=data.get(
+                "output_tokens_per_document", cls.output_tokens_per_document
+            ),
+            max_document_tokens=data.get("max_document_tokens", cls.max_document_tokens),
+            sections=data.get("sections"),
+            window=data.get("window"),
+        )
+        if config.max_documents < 1:
+            raise ValueError("batching.max_documents must be at least 1")
+        return config
+
+    @property
+    def documents_per_request(self) -> int:
+        """Upper bound on N from both the document cap and the output budget."""
+        by_output = self.max_output_tokens // max(1, self.output_tokens_per_document)
+        return max(1, min(self.max_documents, by_output))
+
+    def request_max_tokens(self, documents: int) -> int:
+        """``max_tokens`` for a request covering ``documents`` documents."""
+        return min(self.output_tokens_per_document * documents, self.max_output_tokens)
+
+
+def document_block(document: Document) -> str:
+    return DOCUMENT_BLOCK.format(
+        doc_id=document.doc_id,
+        title=document.title,
+        content=document.payload,
+    )
+
+
+def pack_documents(
+    documents: Iterable[Document],
+    base_tokens: int,
+    config: BatchConfig,
+    estimate: Callable[[str], int] = estimate_tokens,
+) -> List[List[Document]]:
+    """
+    Greedily pack documents, in order, into token-bounded groups.
+
+    A group is closed when adding the next document would exceed
+    ``config.max_input_tokens`` (counting ``base_tokens`` for the shared
+    instructions once) or ``config.documents_per_request``.
+
+    Args:
+        documents: Candidate documents
+        base_tokens: Estimated tokens of the shared instruction block
+        config: Batch limits
+        estimate: Token estimator for one document block
+
+    Returns:
+        List of document groups; a group may hold a single document
+    """
+    limit = config.documents_per_request
+    packs: List[List[Document]] = []
+    current: List[Document] = []
+    used = base_tokens
+    for document in documents:
+        cost = estimate(document_block(document))
+        if current and (len(current) >= limit or used + cost > config.max_input_tokens):
+            packs.append(current)
+            current, used = [], base_tokens
+        current.append(document)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+@dataclass
+class BatchPrompt:
+    """One request covering several documents for a single prompt.
+
+    ``max_tokens`` comes from the same ``config`` the packer sized the batch
+    with, never from the prompt's single-call ``max_tokens``.
+    """
+
+    prompt: Any
+    documents: List[Document]
+    config: BatchConfig = field(default_factory=BatchConfig)
+
+    @property
+    def name(self) -> str:
+        return f"{self.prompt.name}.batch"
+
+    @property
+    def section(self) -> str:
+        return self.prompt.section
+
+    @property
+    def template(self) -> str:
+        return self.prompt.template + BATCH_INSTRUCTIONS
+
+    def render_input(self, document: Document, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Render the shared instructions once, then every document block."""
+        instructions = self.prompt.template.format(title=BATCH_PLACEHOLDER, content=BATCH_PLACEHOLDER)
+        rendered = (
+            instructions
+            + BATCH_INSTRUCTIONS.format(count=len(self.documents))
+            + "".join(document_block(doc) for doc in self.documents)
+        )
+        payload: Dict[str, Any] = {
+            "messages": [{"role": "user", "content": rendered}],
+            "temperature": getattr(self.prompt, "temperature", 0.2),
+        }
+        payload["max_tokens"] = self.config.request_max_tokens(len(self.documents))
+        return payload
+
+
+def _loads_object(text: str) -> Optional[Dict[str, Any]]:
+    """Parse a JSON object from model output, repairing fences, chatter and truncation."""
+    try:
+        data, _ = loads_lenient(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _raw_value(text: str, doc_id: str, value: Any) -> str:
+    """
+    Return the model's own text of ``doc_id``'s value inside ``text``.
+
+    Falls back to compact JSON when the value cannot be cut out verbatim
+    (e.g. the output needed repairs).
+    """
+    decoder = json.JSONDecoder()
+    key = re.escape(json.dumps(doc_id, ensure_ascii=False)) + r"\s*:\s*"
+    for match in re.finditer(key, text):
+        try:
+            parsed, end = decoder.raw_decode(text, match.end())
+        except ValueError:
+            continue
+        if parsed == value:
+            return text[match.end() : end]
+    return json.dumps(value, ensure_ascii=False)
+
+
+def split_batch_response(response: Any, doc_ids: List[str]) -> Dict[str, Any]:
+    """
+    Split a batch response into per-document section values.
+
+    Responses wrapped as ``{"content": "<text>"}`` are parsed and each
+    document's value is wrapped the same way with the model's own text for
+    it, so batched sections are stored like single calls.
+
+    Args:
+        response: Parsed provider response for a ``BatchPrompt``
+        doc_ids: Document ids that were sent
+
+    Returns:
+        Mapping of doc_id to section value for well-formed entries only
+    """
+    wrapped = isinstance(response, dict) and set(response) == {"content"}
+    if wrapped:
+        text = str(response["content"])
+        data = _loads_object(text)
+    else:
+        data = response if isinstance(response, dict) else None
+    if data is None:
+        return {}
+
+    sections: Dict[str, Any] = {}
+    for doc_id in doc_ids:
+        value = data.get(doc_id)
+        if not isinstance(value, (dict, list)) or not value:
+            continue
+        sections[doc_id] = {"content": _raw_value(text, doc_id, value)} if wrapped else value
+    return sections
+
+
+class DocumentBatcher:
+    """Pre-computes batchable sections for windows of documents."""
+
+    def __init__(
+        self,
+        config: BatchConfig,
+        prompts: Iterable[PromptUnit],
+        estimate: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            config: Batch limits and section selection
+            prompts: All prompts of the pipeline; non-batchable ones are ignored
+            estimate: Token estimator used by the packer
+        """
+        self.config = config
+        self.estimate = estimate
+        self.prompts = [prompt for prompt in prompts if self.batchable(prompt)]
+
+    def batchable(self, prompt: PromptUnit) -> bool:
+        """Template prompts that read nothing but the document can be batched."""
+        from openextract.prompts.loader import template_fields
+
+        template = getattr(prompt, "template", None)
+        if not isinstance(template, str):
+            return False
+        if self.config.sections is not None and prompt.section not in self.config.sections:
+            return False
+        if getattr(prompt, "depends_on", None):
+            return False
+        return set(template_fields(template)) <= BATCHABLE_FIELDS
+
+    def seed(
+        self,
+        documents: Iterable[Document],
+        previous: Mapping[str, PipelineResult],
+        invoke: InvokeFn,
+        concurrency: int = 1,
+        skip: Optional[Container[str]] = None,
+    ) -> Iterator[BatchedItem]:
+        """
+        Yield every document with the sections filled by batch calls.
+
+        Documents are read in windows; within a window each batchable prompt
+        packs the documents that still need it and the packs run in parallel.
+
+        Args:
+            documents: Documents in pipeline order
+            previous: Earlier results keyed by doc_id; finished sections are not batched
+            invoke: Provider call, normally ``BasePipeline._invoke``
+            concurrency: Number of batch requests run at once
+            skip: doc_ids that must not be batched (e.g. known duplicates)
+        """
+        if not self.prompts:
+            for document in documents:
+                yield document, previous.get(document.doc_id), {}
+            return
+
+        size = self.config.window or self.config.documents_per_request * max(1, concurrency)
+        with ThreadPoolExecutor(
+            max_workers=max(1, concurrency),
+            thread_name_prefix="openextract-batch",
+        ) as executor:
+            window: List[Document] = []
+            for document in documents:
+                window.append(document)
+                if len(window) >= size:
+                    yield from self._run_window(window, previous, invoke, executor, skip)
+                    window = []
+            if window:
+                yield from self._run_window(window, previous, invoke, executor, skip)
+
+    def _run_window(
+        self,
+        window: List[Document],
+        previous: Mapping[str, PipelineResult],
+        invoke: InvokeFn,
+        executor: ThreadPoolExecutor,
+        skip: Optional[Container[str]] = None,
+    ) -> Iterator[BatchedItem]:
+        jobs: List[Tuple[str, Future]] = []
+        skip = skip if skip is not None else ()
+        for prompt in self.prompts:
+            todo = [
+                document
+                for document in window
+                if document.doc_id not in skip
+                and not self._done(previous.get(document.doc_id), prompt.section)
+                and self.estimate(document.payload) <= self.config.max_document_tokens
+            ]
+            base = self.estimate(
+                prompt.template.format(title=BATCH_PLACEHOLDER, content=BATCH_PLACEHOLDER)
+            )
+            for pack in pack_documents(todo, base, self.config, self.estimate):
+                # A pack of one costs the same as a regular call
+                if len(pack) > 1:
+                    jobs.append(
+                        (
+                            prompt.section,
+                            executor.submit(
+                                contextvars.copy_context().run, self._run_batch, prompt, pack, invoke
+                            ),
+                        )
+                    )
+
+        filled: Dict[str, Dict[str, Any]] = {}
+        for section, job in jobs:
+            for doc_id, value in job.result().items():
+                filled.setdefault(doc_id, {})[section] = value
+
+        for document in window:
+            yield document, previous.get(document.doc_id), filled.get(document.doc_id, {})
+
+    @staticmethod
+    def _done(result: Optional[PipelineResult], section: str) -> bool:
+        return result is not None and section in result.structured_tags
+
+    def _run_batch(self, prompt: PromptUnit, pack: List[Document], invoke: InvokeFn) -> Dict[str, Any]:
+        """Run one batch request; failures leave every document to the fallback."""
+        batch = BatchPrompt(prompt, pack, self.config)
+        doc_ids = [document.doc_id for document in pack]
+        METRICS.inc("batch_requests_total", prompt=prompt.name)
+        METRICS.inc("batch_documents_total", len(pack), prompt=prompt.name)
+        try:
+            response = invoke(batch, pack[0], batch.render_input(pack[0], {}))
+        except Exception:
+            sections: Dict[str, Any] = {}
+        else:
+            sections = split_batch_response(response, doc_ids)
+        missing = len(doc_ids) - len(sections)
+        if missing:
+            METRICS.inc("batch_fallbacks_total", missing, prompt=prompt.name)
+        return sections
@@ -0,0 +1,223 @@
+"""Near-duplicate detection so reposted documents are extracted only once.
+
+Policy corpora often contain the same notice reposted by several sites with
+only whitespace, punctuation or header lines changed. ``Deduplicator``
+assigns every document either to itself (a new representative) or to an
+earlier representative:
+
+* an exact match on the normalized payload is found by hash lookup;
+* otherwise a MinHash signature over character shingles is looked up in a
+  banded LSH index, and candidates are confirmed by their estimated Jaccard
+  similarity.
+
+Only representatives are processed; ``BasePipeline`` copies their sections
+to the duplicates and records ``duplicate_of`` on each copy.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from openextract.pipelines.base import Document
+
+_NOISE = re.compile(r"[\s　\W_]+", re.UNICODE)
+
+
+@dataclass
+class DedupConfig:
+    """Settings for ``Deduplicator``."""
+
+    threshold: float = 0.85  # estimated Jaccard similarity to count as duplicate
+    num_perm: int = 128
+    shingle_size: int = 5
+    min_chars: int = 50  # shorter normalized payloads are never deduplicated
+    max_entries: Optional[int] = 100_000  # representatives kept in the index
+    seed: int = 1
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DedupConfig":
+        """Build from a YAML ``dedup`` block."""
+        config = cls(
+            threshold=data.get("threshold", cls.threshold),
+            num_perm=data.get("num_perm", cls.num_perm),
+            shingle_size=data.get("shingle_size", cls.shingle_size),
+            min_chars=data.get("min_chars", cls.min_chars),
+            max_entries=data.get("max_entries", cls.max_entries),
+            seed=data.get("seed", cls.seed),
+        )
+        if not 0 < config.threshold <= 1:
+            raise ValueError("dedup.threshold must be in (0, 1]")
+        return config
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, NFKC-normalize and drop whitespace and punctuation."""
+    text = text or ""
+    # The quick check is far cheaper than normalizing already-normal text
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    return _NOISE.sub("", text.casefold())
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick ``(bands, rows)`` with ``bands * rows <= num_perm`` whose S-curve
+    midpoint ``(1 / bands) ** (1 / rows)`` is closest to ``threshold``.
+    """
+    best = (1, num_perm)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures over character shingles (vectorized with numpy)."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        import numpy as np
+
+        self.np = np
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift style hashing needs odd multipliers
+        self._a = rng.integers(0, 2**64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**64, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text: str) -> Any:
+        size = self.shingle_size
+        shingles = {text[i : i + size] for i in range(max(1, len(text) - size + 1))}
+        # crc32 is stable across processes and much cheaper than a digest
+        np = self.np
+        hashes = np.array(
+            [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles], dtype=np.uint64
+        )
+        # splitmix64 finalizer spreads the 32-bit values over 64 bits
+        with np.errstate(over="ignore"):
+            hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            return hashes ^ (hashes >> np.uint64(31))
+
+    def signature(self, text: str) -> Any:
+        """Return the ``num_perm`` minimum hash values of ``text``'s shingles."""
+        np = self.np
+        hashes = self.shingle_hashes(text)
+        # (a*x + b) mod 2**64 per permutation; uint64 arithmetic wraps
+        with np.errstate(over="ignore"):
+            permuted = np.outer(self._a, hashes) + self._b[:, None]
+        return permuted.min(axis=1)
+
+
+class Deduplicator:
+    """Streaming duplicate assignment against earlier representatives."""
+
+    def __init__(self, config: Optional[DedupConfig] = None):
+        """
+        Initialize deduplicator.
+
+        Args:
+            config: Similarity threshold, signature size and index limits
+        """
+        self.config = config or DedupConfig()
+        self.hasher = MinHasher(self.config.num_perm, self.config.shingle_size, self.config.seed)
+        self.bands, self.rows = lsh_bands(self.config.num_perm, self.config.threshold)
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self._exact: Dict[str, str] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        # doc_id -> (exact key, signature) for every indexed representative
+        self._entries: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        # Concurrent run_iter calls (e.g. service micro-batches) assign at once
+        self._lock = threading.Lock()
+
+    def assign(self, document: Document) -> Optional[str]:
+        """
+        Return the doc_id of the representative ``document`` duplicates.
+
+        Documents that are not duplicates become representatives themselves
+        and ``None`` is returned.
+        """
+        text = normalize_text(document.payload)
+        if len(text) < self.config.min_chars:
+            return None
+
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            representative = self._exact.get(key)
+            if representative is not None:
+                self.exact_duplicates += 1
+                return representative
+
+        # The signature is the expensive part, so it is computed unlocked
+        signature = self.hasher.signature(text)
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            # An identical document may have been indexed in the meantime
+            representative = self._exact.get(key)
+            if representative is not None:
+                self.exact_duplicates += 1
+                return representative
+            representative = self._near_match(signature, band_keys)
+            if representative is not None:
+                self.near_duplicates += 1
+                return representative
+            self._add(document.doc_id, key, signature, band_keys)
+        return None
+
+    def _band_keys(self, signature: Any) -> List[bytes]:
+        rows = self.rows
+        return [signature[i * rows : (i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def _near_match(self, signature: Any, band_keys: List[bytes]) -> Optional[str]:
+        seen = set()
+        for bucket, band_key in zip(self._buckets, band_keys):
+            for candidate in bucket.get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self._entries[candidate][1]
+                if float((other == signature).mean()) >= self.config.threshold:
+                    return candidate
+        return None
+
+    def _add(self, doc_id: str, key: str, signature: Any, band_keys: List[bytes]) -> None:
+        if doc_id in self._entries:
+            return
+        self._exact[key] = doc_id
+        self._entries[doc_id] = (key, signature)
+        for bucket, band_key in zip(self._buckets, band_keys):
+            bucket.setdefault(band_key, []).append(doc_id)
+        max_entries = self.config.max_entries
+        if max_entries is not None and len(self._entries) > max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        doc_id, (key, signature) = self._entries.popitem(last=False)
+        self._exact.pop(key, None)
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(band_key)
+            if members is None:
+                continue
+            if doc_id in members:
+                members.remove(doc_id)
+            if not members:
+                del bucket[band_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the run summary."""
+        with self._lock:
+            return {
+                "representatives": len(self._entries),
+                "exact_duplicates": self.exact_duplicates,
+                "near_duplicates": self.near_duplicates,
+            }
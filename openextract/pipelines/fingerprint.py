@@ -0,0 +1,100 @@
+"""Fingerprints of section results for incremental re-extraction.
+
+A section's fingerprint hashes everything its result was computed from:
+the prompt (template text, temperature, completion budget, output schema),
+the model, the document's title and payload, and the fingerprints of the
+sections the prompt reads from ``context``. Editing one prompt therefore changes
+the fingerprint of its own section and of every section downstream of
+it, and of nothing else. ``BasePipeline`` stores the fingerprints on each
+``PipelineResult`` and, when seeded with an earlier result, re-runs only
+the sections whose fingerprint no longer matches.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Set
+
+if TYPE_CHECKING:
+    from openextract.pipelines.base import Document, PromptUnit
+
+
+def digest(*parts: Any) -> str:
+    """Short stable hash of ``parts`` (joined with NUL separators)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def document_fingerprint(document: "Document") -> str:
+    """Hash of the document fields prompts are rendered from."""
+    return digest(document.title, document.payload)
+
+
+def prompt_fingerprint(prompt: "PromptUnit") -> str:
+    """Prompt's own ``fingerprint()`` if it has one, else its name and section."""
+    own = getattr(prompt, "fingerprint", None)
+    if callable(own):
+        return own()
+    return digest(prompt.name, prompt.section)
+
+
+class SectionFingerprints:
+    """Compute the expected fingerprint of every section for a document."""
+
+    def __init__(
+        self,
+        levels: List[List["PromptUnit"]],
+        dependencies: Mapping[str, Set[str]],
+        model: str = "",
+    ):
+        """
+        Initialize from the pipeline's plan.
+
+        Args:
+            levels: Prompt dependency levels (see ``plan_prompt_levels``)
+            dependencies: Sections each section reads from ``context``
+            model: Model name; part of every fingerprint
+        """
+        # Dependencies always come from earlier levels, so one pass suffices
+        self._order = [
+            (
+                prompt.section,
+                digest(prompt_fingerprint(prompt), model),
+                sorted(dependencies.get(prompt.section, ())),
+            )
+            for level in levels
+            for prompt in level
+        ]
+
+    def compute(self, document: "Document") -> Dict[str, str]:
+        """
+        Return the fingerprint each section of ``document`` should carry.
+
+        Args:
+            document: Document the sections are computed from
+
+        Returns:
+            Mapping of section name to fingerprint
+        """
+        doc = document_fingerprint(document)
+        fingerprints: Dict[str, str] = {}
+        for section, prompt, deps in self._order:
+            fingerprints[section] = digest(
+                prompt, doc, *(f"{dep}={fingerprints[dep]}" for dep in deps)
+            )
+        return fingerprints
+
+    @staticmethod
+    def stale(stored: Mapping[str, str], expected: Mapping[str, str]) -> List[str]:
+        """Sections whose stored fingerprint differs from the expected one.
+
+        Sections stored without a fingerprint (results from before
+        fingerprints existed) are not considered stale.
+        """
+        return [
+            section
+            for section, fingerprint in stored.items()
+            if expected.get(section) != fingerprint
+        ]
@@ -0,0 +1,92 @@
+"""Append-only JSONL journal of pipeline results.
+
+The journal makes long runs restartable: ``BasePipeline`` appends each
+``PipelineResult`` as soon as its document finishes, and ``load`` rebuilds
+the latest result per ``doc_id`` so a resumed run can skip finished work.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+from openextract.pipelines.base import PipelineResult
+
+
+class RunJournal:
+    """Thread-safe JSONL journal of ``PipelineResult`` records."""
+
+    def __init__(self, path: str | Path, resume: bool = False, fsync: bool = False):
+        """
+        Open the journal for appending.
+
+        Args:
+            path: Journal file path
+            resume: Keep existing records (append) instead of truncating
+            fsync: Force each record to disk, not just to the OS buffers
+        """
+        self.path = Path(path)
+        self.fsync = fsync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        needs_newline = False
+        if resume and self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if needs_newline:
+            # Terminate a record cut short by a crash so the next one parses
+            self._file.write("\n")
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def load(path: str | Path) -> Dict[str, PipelineResult]:
+        """
+        Read a journal and return the latest result for every ``doc_id``.
+
+        A truncated last line (e.g. from a crash mid-write) is ignored.
+
+        Args:
+            path: Journal file path
+
+        Returns:
+            Mapping of doc_id to its most recent PipelineResult
+        """
+        results: Dict[str, PipelineResult] = {}
+        path = Path(path)
+        if not path.exists():
+            return results
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                result = PipelineResult.from_dict(record)
+                results[result.doc_id] = result
+        return results
+
+    def append(self, result: PipelineResult) -> None:
+        """Append one result and flush it."""
+        line = json.dumps(result.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
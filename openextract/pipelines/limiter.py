@@ -0,0 +1,202 @@
+"""Adaptive limit on the number of provider calls in flight.
+
+``AdaptiveLimiter`` replaces a fixed ``concurrency`` with an AIMD controller
+in the style of TCP congestion control and Vegas/Netflix concurrency
+limiters:
+
+* every healthy call while the limit is in use adds ``increase / limit``,
+  i.e. the limit grows by ``increase`` per round of ``limit`` calls;
+* a 429 or a timeout multiplies the limit by ``backoff``;
+* latency inflation (a smoothed ratio of observed latency to the per-prompt
+  baseline above ``latency_tolerance``) multiplies it by
+  ``latency_backoff``. Retried 429s show up here too, since the backoff
+  sleeps are part of the measured call.
+
+At most one decrease is applied per round: calls that were already in
+flight when the limit was cut cannot cut it again. The current limit is
+published as the ``concurrency_limit`` gauge.
+
+Free slots go to waiting calls in order of their ``priority`` (then
+arrival), which lets the pipeline run expensive calls first.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from openextract.providers.errors import ProviderTimeoutError, RateLimitError
+from openextract.utils.metrics import METRICS
+
+
+@dataclass
+class LimiterConfig:
+    """Settings for ``AdaptiveLimiter``."""
+
+    initial: int = 4
+    min_limit: int = 1  # floor
+    max_limit: int = 32  # ceiling; also the number of worker threads
+    increase: float = 1.0  # added per round of ``limit`` healthy calls
+    backoff: float = 0.5  # multiplier on 429s and timeouts
+    latency_backoff: float = 0.9  # multiplier on latency inflation
+    latency_tolerance: float = 2.0  # smoothed latency / baseline that counts as congested
+    smoothing: float = 0.1  # EWMA weight of the newest latency ratio
+    baseline_drift: float = 0.01  # how fast a baseline follows slower latencies
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LimiterConfig":
+        """Build from a YAML ``adaptive_concurrency`` block (``min``/``max`` accepted)."""
+        config = cls(
+            initial=data.get("initial", cls.initial),
+            min_limit=data.get("min", data.get("min_limit", cls.min_limit)),
+            max_limit=data.get("max", data.get("max_limit", cls.max_limit)),
+            increase=data.get("increase", cls.increase),
+            backoff=data.get("backoff", cls.backoff),
+            latency_backoff=data.get("latency_backoff", cls.latency_backoff),
+            latency_tolerance=data.get("latency_tolerance", cls.latency_tolerance),
+            smoothing=data.get("smoothing", cls.smoothing),
+            baseline_drift=data.get("baseline_drift", cls.baseline_drift),
+        )
+        if not 1 <= config.min_limit <= config.max_limit:
+            raise ValueError("adaptive_concurrency needs 1 <= min <= max")
+        config.initial = min(max(config.initial, config.min_limit), config.max_limit)
+        return config
+
+
+def is_congestion(exc: Optional[BaseException]) -> bool:
+    """Errors that mean the provider wants less traffic."""
+    return isinstance(exc, (RateLimitError, ProviderTimeoutError)) or (
+        getattr(exc, "status_code", None) == 503
+    )
+
+
+class AdaptiveLimiter:
+    """Blocking in-flight limiter whose limit follows the provider's health."""
+
+    def __init__(self, config: Optional[LimiterConfig] = None):
+        """
+        Initialize limiter.
+
+        Args:
+            config: Floor, ceiling and AIMD parameters
+        """
+        self.config = config or LimiterConfig()
+        self._limit = float(self.config.initial)
+        self._inflight = 0
+        self._issued = 0  # tickets handed out so far
+        self._recover_after = 0  # tickets below this cannot trigger a decrease
+        self._baselines: Dict[str, float] = {}
+        self._ratio = 1.0
+        self._waiting: List[Tuple[float, int]] = []  # (-priority, arrival) heap
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+        self.increases = 0
+        self.decreases = 0
+        self.peak = self.limit
+        METRICS.set_gauge("concurrency_limit", self.limit)
+
+    @classmethod
+    def fixed(cls, limit: int) -> "AdaptiveLimiter":
+        """Limiter that never moves from ``limit`` (a plain semaphore)."""
+        limit = max(1, int(limit))
+        return cls(LimiterConfig(initial=limit, min_limit=limit, max_limit=limit))
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.config.min_limit < self.config.max_limit
+
+    def acquire(self, priority: float = 0.0) -> int:
+        """
+        Block until a slot is free; return the ticket to pass to ``release``.
+
+        Args:
+            priority: Waiters with a higher priority get free slots first
+        """
+        with self._cond:
+            entry = (-priority, next(self._arrivals))
+            heapq.heappush(self._waiting, entry)
+            while self._inflight >= int(self._limit) or self._waiting[0] != entry:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._inflight += 1
+            self._issued += 1
+            if self._waiting and self._inflight < int(self._limit):
+                # More slots are free (the limit grew): let the next waiter in
+                self._cond.notify_all()
+            return self._issued
+
+    def release(
+        self,
+        ticket: int,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        key: str = "",
+    ) -> None:
+        """
+        Free a slot and adjust the limit from the call's outcome.
+
+        Args:
+            ticket: Value returned by ``acquire``
+            latency: Seconds the call took (``None`` if it failed)
+            error: Exception the call raised, if any
+            key: Baseline group, normally the prompt name
+        """
+        with self._cond:
+            inflight = self._inflight
+            self._inflight -= 1
+            if self.adaptive:
+                if is_congestion(error):
+                    self._decrease(ticket, self.config.backoff, "congestion")
+                elif error is None and latency is not None:
+                    self._on_latency(ticket, inflight, latency, key)
+            self._cond.notify_all()
+
+    def _on_latency(self, ticket: int, inflight: int, latency: float, key: str) -> None:
+        config = self.config
+        baseline = self._baselines.get(key)
+        if baseline is None or latency < baseline:
+            baseline = latency
+        else:
+            baseline += (latency - baseline) * config.baseline_drift
+        self._baselines[key] = baseline
+        ratio = latency / baseline if baseline > 0 else 1.0
+        self._ratio += (ratio - self._ratio) * config.smoothing
+        if self._ratio > config.latency_tolerance:
+            self._decrease(ticket, config.latency_backoff, "latency")
+        elif inflight * 2 >= self._limit and self._limit < config.max_limit:
+            # Only grow while the current limit is actually being used
+            before = self.limit
+            self._limit = min(float(config.max_limit), self._limit + config.increase / self._limit)
+            if self.limit != before:
+                self.increases += 1
+                self._publish()
+
+    def _decrease(self, ticket: int, factor: float, reason: str) -> None:
+        if ticket < self._recover_after:
+            return
+        self._recover_after = self._issued + 1
+        self._limit = max(float(self.config.min_limit), self._limit * factor)
+        self._ratio = 1.0
+        self.decreases += 1
+        METRICS.inc("concurrency_decreases_total", reason=reason)
+        self._publish()
+
+    def _publish(self) -> None:
+        self.peak = max(self.peak, self.limit)
+        METRICS.set_gauge("concurrency_limit", self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for the run summary."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "peak": self.peak,
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
@@ -0,0 +1,184 @@
+"""Merge strategies for combining per-chunk results into one section.
+
+When a long document is chunked, every prompt runs once per chunk and the
+partial results are reduced back into a single section value, either with
+a structural merge (``union``, ``first``, ``concat``) or by asking the model
+to consolidate them with a reduce prompt. Partials wrapped as
+``{"content": "<text>"}`` (providers without JSON mode) are parsed first so
+the merge sees every chunk's fields rather than one opaque string each.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openextract.pipelines.base import Document, PromptUnit
+from openextract.utils.jsonrepair import loads_lenient
+
+MERGE_STRATEGIES = ("union", "first", "concat")
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _dedup_key(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def merge_first(values: List[Any]) -> Any:
+    """Return the first non-empty value."""
+    for value in values:
+        if not _is_empty(value):
+            return value
+    return values[0] if values else None
+
+
+def merge_union(values: List[Any]) -> Any:
+    """
+    Structurally merge partial results.
+
+    Dicts are merged key by key (recursively), lists are concatenated with
+    duplicates removed in first-seen order, and for scalars the first
+    non-empty value wins. Scalars mixed with lists are folded into the list.
+    """
+    present = [value for value in values if not _is_empty(value)]
+    if not present:
+        return values[0] if values else None
+    if all(isinstance(value, dict) for value in present):
+        keys: List[str] = []
+        for value in present:
+            keys.extend(key for key in value if key not in keys)
+        return {key: merge_union([value[key] for value in present if key in value]) for key in keys}
+    if any(isinstance(value, list) for value in present):
+        merged: List[Any] = []
+        seen = set()
+        for value in present:
+            for item in value if isinstance(value, list) else [value]:
+                key = _dedup_key(item)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        return merged
+    return present[0]
+
+
+def merge_concat(values: List[Any]) -> Any:
+    """Like ``merge_union`` but strings are joined and lists kept whole."""
+    present = [value for value in values if not _is_empty(value)]
+    if not present:
+        return values[0] if values else None
+    if all(isinstance(value, dict) for value in present):
+        keys: List[str] = []
+        for value in present:
+            keys.extend(key for key in value if key not in keys)
+        return {key: merge_concat([value[key] for value in present if key in value]) for key in keys}
+    if all(isinstance(value, str) for value in present):
+        return "\n".join(present)
+    if all(isinstance(value, list) for value in present):
+        return [item for value in present for item in value]
+    return present[0]
+
+
+_MERGERS: Dict[str, Callable[[List[Any]], Any]] = {
+    "union": merge_union,
+    "first": merge_first,
+    "concat": merge_concat,
+}
+
+
+def _is_wrapped(value: Any) -> bool:
+    return isinstance(value, dict) and set(value) == {"content"}
+
+
+def unwrap_partials(partials: List[Any]) -> Tuple[List[Any], bool]:
+    """
+    Parse partials wrapped as ``{"content": "<text>"}`` into JSON values.
+
+    Text that holds no JSON value is kept as a string.
+
+    Returns:
+        ``(values, wrapped)`` where ``wrapped`` tells whether any partial was
+        wrapped, so the merged value can be wrapped the same way
+    """
+    values: List[Any] = []
+    wrapped = False
+    for partial in partials:
+        if not _is_wrapped(partial):
+            values.append(partial)
+            continue
+        wrapped = True
+        text = str(partial["content"])
+        try:
+            value, _ = loads_lenient(text)
+        except ValueError:
+            value = text
+        values.append(value)
+    return values, wrapped
+
+
+# (prompt, document, payload) -> provider response
+InvokeFn = Callable[[PromptUnit, Document, Dict[str, Any]], Any]
+
+
+class SectionMerger:
+    """Per-section reduce step for chunked extraction."""
+
+    def __init__(
+        self,
+        strategies: Optional[Dict[str, str]] = None,
+        default: str = "union",
+        reduce_prompts: Optional[Dict[str, PromptUnit]] = None,
+    ):
+        """
+        Initialize merger.
+
+        Args:
+            strategies: Mapping of section name to a strategy in ``MERGE_STRATEGIES``
+            default: Strategy for sections not listed in ``strategies``
+            reduce_prompts: Mapping of section name to a prompt that receives
+                the partial results as ``{partials}`` (JSON) and returns the
+                consolidated section; takes precedence over ``strategies``
+        """
+        self.strategies = dict(strategies or {})
+        self.default = default
+        self.reduce_prompts = dict(reduce_prompts or {})
+        for strategy in [default, *self.strategies.values()]:
+            if strategy not in _MERGERS:
+                raise ValueError(f"Unknown merge strategy: {strategy} (expected one of {MERGE_STRATEGIES})")
+
+    def merge(
+        self,
+        prompt: PromptUnit,
+        document: Document,
+        partials: List[Any],
+        invoke: InvokeFn,
+    ) -> Any:
+        """
+        Reduce the per-chunk ``partials`` of ``prompt`` into one value.
+
+        Wrapped partials are parsed before merging and the merged value is
+        wrapped again as JSON text, so a chunked section looks like a single
+        call. Partials that are plain text are joined unless the strategy is
+        ``first``.
+        """
+        values, wrapped = unwrap_partials(partials)
+        reduce_prompt = self.reduce_prompts.get(prompt.section)
+        if reduce_prompt is not None:
+            context = {"partials": json.dumps(values, ensure_ascii=False, default=str)}
+            payload = reduce_prompt.render_input(document, context)
+            return invoke(reduce_prompt, document, payload)
+        strategy = self.strategies.get(prompt.section, self.default)
+        if strategy != "first" and all(isinstance(value, str) for value in values if not _is_empty(value)):
+            merged = merge_concat(values)
+        else:
+            merged = _MERGERS[strategy](values)
+        if not wrapped:
+            return merged
+        if isinstance(merged, str):
+            return {"content": merged}
+        return {"content": json.dumps(merged, ensure_ascii=False)}
@@ -0,0 +1,715 @@
+"""Dry-run planning: tokens, requests, duration and cost before dispatch.
+
+``Planner`` streams documents through the decisions the pipeline makes —
+which prompts run, which documents are packed into batch requests, which
+are split into chunks, which repeat an earlier payload — and estimates every
+call without contacting a provider. To plan millions of rows in seconds,
+each template is measured once as literal text plus placeholders; a
+document's title and content are measured once (ASCII and non-ASCII
+character counts, see ``openextract.utils.tokens``) and combined per
+prompt, which gives the estimate of the rendered text without rendering
+it. Sections read from upstream prompts count at their expected output
+size. Each template is also rendered for real on the first document, so
+placeholders the pipeline could not fill are reported up front.
+
+Output tokens per call come from a metrics history (the JSON written by
+``run --metrics-out``) when it has the prompt, then from ``max_tokens``,
+then from ``plan.output_tokens``. Wall-clock time is the largest of three
+bounds per provider: summed call latency over its concurrency, requests
+over ``rpm`` and tokens over ``tpm``; router backends share the calls in
+proportion to their throughput. Cost uses the per-model price table
+(``models`` in the settings). The plan assumes a cold cache and no retries.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import string
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from openextract.pipelines.base import Document, PromptUnit
+from openextract.pipelines.batching import (
+    BATCH_INSTRUCTIONS,
+    BATCH_PLACEHOLDER,
+    DOCUMENT_BLOCK,
+    BatchConfig,
+    DocumentBatcher,
+)
+from openextract.pipelines.dedup import DedupConfig
+from openextract.utils.chunking import TextChunker
+from openextract.utils.tokens import (
+    MESSAGE_OVERHEAD_TOKENS,
+    count_chars,
+    estimate_from_counts,
+    estimate_tokens,
+)
+
+# Prompts without a template are assumed to read the whole document
+_DEFAULT_FIELDS = ["title", "content"]
+
+
+@dataclass
+class ModelInfo:
+    """One entry of the ``models`` table: prices and context window."""
+
+    input_price: Optional[float] = None  # per million prompt tokens
+    output_price: Optional[float] = None  # per million completion tokens
+    context_window: Optional[int] = None  # prompt plus completion tokens
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelInfo":
+        """Build from one ``models.<model>`` block."""
+        return cls(
+            input_price=data.get("input_price"),
+            output_price=data.get("output_price"),
+            context_window=data.get("context_window"),
+        )
+
+    @property
+    def priced(self) -> bool:
+        return self.input_price is not None and self.output_price is not None
+
+
+@dataclass
+class PlanConfig:
+    """Settings for ``Planner``."""
+
+    output_tokens: int = 400  # per call without history or max_tokens
+    latency_seconds: Optional[float] = None  # per call; replaces history and the estimate
+    first_token_seconds: float = 1.0  # estimated latency before the first token
+    output_tokens_per_second: float = 40.0  # estimated decoding speed
+    history: Optional[str] = None  # metrics JSON written by ``run --metrics-out``
+    examples: int = 10  # oversized documents listed in the report
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanConfig":
+        """Build from a YAML ``plan`` block."""
+        config = cls(
+            output_tokens=data.get("output_tokens", cls.output_tokens),
+            latency_seconds=data.get("latency_seconds"),
+            first_token_seconds=data.get("first_token_seconds", cls.first_token_seconds),
+            output_tokens_per_second=data.get(
+                "output_tokens_per_second", cls.output_tokens_per_second
+            ),
+            history=data.get("history"),
+            examples=data.get("examples", cls.examples),
+        )
+        if config.output_tokens < 1:
+            raise ValueError("plan.output_tokens must be at least 1")
+        if config.output_tokens_per_second <= 0:
+            raise ValueError("plan.output_tokens_per_second must be positive")
+        return config
+
+    def latency(self, output_tokens: int) -> float:
+        """Estimated seconds for one call producing ``output_tokens``."""
+        if self.latency_seconds is not None:
+            return self.latency_seconds
+        return self.first_token_seconds + output_tokens / self.output_tokens_per_second
+
+
+@dataclass
+class PromptHistory:
+    """What earlier runs observed for one prompt."""
+
+    calls: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def output_tokens(self) -> Optional[int]:
+        if not self.calls or not self.completion_tokens:
+            return None
+        return round(self.completion_tokens / self.calls)
+
+    @property
+    def latency(self) -> Optional[float]:
+        return self.seconds / self.calls if self.calls else None
+
+
+def load_history(path: str | Path) -> Dict[str, PromptHistory]:
+    """
+    Read per-prompt calls, completion tokens and latency from a metrics file.
+
+    Args:
+        path: JSON written by ``openextract run --metrics-out`` (an uncached
+            run gives the most accurate averages)
+
+    Returns:
+        History keyed by prompt name (batch and reduce calls included)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    history: Dict[str, PromptHistory] = {}
+    for series in data.get("histograms", {}).get("prompt_seconds", []):
+        entry = history.setdefault(series["labels"].get("prompt", ""), PromptHistory())
+        entry.calls += int(series.get("count", 0))
+        entry.seconds += float(series.get("sum", 0.0))
+    for series in data.get("counters", {}).get("tokens_total", []):
+        labels = series["labels"]
+        if labels.get("kind") == "completion":
+            entry = history.setdefault(labels.get("prompt", ""), PromptHistory())
+            entry.completion_tokens += int(series["value"])
+    return history
+
+
+@dataclass
+class ProviderPlan:
+    """Model and pacing of one provider (or router backend)."""
+
+    name: str
+    adapter: str
+    model: str
+    concurrency: int
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+
+
+def provider_plans(config: Dict[str, Any]) -> List[ProviderPlan]:
+    """
+    Resolve model and pacing for each provider the pipeline would call.
+
+    Mirrors ``factory.build_provider`` without resolving API keys or
+    constructing clients.
+
+    Args:
+        config: Whole merged configuration
+
+    Returns:
+        One plan, or one per backend for a router
+    """
+    from openextract.pipelines.limiter import LimiterConfig
+    from openextract.providers import DEFAULT_ADAPTER
+
+    pipeline_config = config.get("pipeline", {})
+    provider_config = pipeline_config.get("provider", {})
+    settings_providers = config.get("providers", {})
+    provider_name = provider_config.get("name", "siliconflow")
+    if provider_name == "router":
+        # Provider-level settings (stream, timeout, rpm, ...) apply to every
+        # backend; a backend entry's own keys take precedence
+        inherited = {
+            key: value
+            for key, value in provider_config.items()
+            if key not in ("name", "backends", "router", "concurrency")
+        }
+        entries = []
+        for index, entry in enumerate(provider_config.get("backends") or []):
+            backend_provider = entry.get("provider", "siliconflow")
+            backend_name = entry.get("name") or (
+                backend_provider if index == 0 else f"{backend_provider}-{index + 1}"
+            )
+            entries.append(
+                (
+                    backend_name,
+                    {**settings_providers.get(backend_provider, {}), **entry},
+                    {**inherited, **entry},
+                )
+            )
+    else:
+        entries = [(provider_name, settings_providers.get(provider_name, {}), provider_config)]
+
+    plans = []
+    for name, settings, pacing in entries:
+        concurrency = pacing.get(
+            "concurrency",
+            settings.get("concurrency", config.get("runtime", {}).get("concurrency", 1)),
+        )
+        adaptive = pacing.get("adaptive_concurrency", settings.get("adaptive_concurrency")) or {}
+        if provider_name != "router" and adaptive and adaptive.get("enabled", True):
+            # Healthy runs grow to the ceiling
+            concurrency = LimiterConfig.from_dict(adaptive).max_limit
+        rpm = pacing.get("rpm", settings.get("rpm"))
+        sleep_seconds = pacing.get("sleep_seconds", 1.0)
+        if rpm is None and sleep_seconds > 0:
+            rpm = 60.0 / sleep_seconds
+        plans.append(
+            ProviderPlan(
+                name=name,
+                adapter=settings.get("adapter", DEFAULT_ADAPTER),
+                model=settings.get("model", "deepseek-chat"),
+                concurrency=max(1, int(concurrency)),
+                rpm=rpm,
+                tpm=pacing.get("tpm", settings.get("tpm")),
+            )
+        )
+    return plans
+
+
+@dataclass
+class CallTotals:
+    """Aggregated estimate for one kind of call (prompt, batch or reduce)."""
+
+    calls: int = 0
+    documents: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0  # summed call latency
+
+    def add(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        seconds: float,
+        documents: int = 1,
+        calls: int = 1,
+    ) -> None:
+        """Count ``calls`` calls with these per-call estimates."""
+        self.calls += calls
+        self.documents += documents
+        self.input_tokens += input_tokens * calls
+        self.output_tokens += output_tokens * calls
+        self.seconds += seconds * calls
+
+
+def _split_template(template: str) -> Tuple[str, List[str]]:
+    """Return a template's literal text and its placeholder names, in order."""
+    literal: List[str] = []
+    names: List[str] = []
+    for text, field_name, _, _ in string.Formatter().parse(template):
+        literal.append(text)
+        if field_name:
+            # "{section.key}" / "{section[0]}" still read "section"
+            names.append(re.split(r"[.\[]", field_name, maxsplit=1)[0])
+    return "".join(literal), names
+
+
+class _Template:
+    """One prompt measured once: literal text and the placeholders it fills."""
+
+    def __init__(self, prompt: PromptUnit, output_tokens: int, reserve: int, latency: float):
+        template = getattr(prompt, "template", None)
+        if isinstance(template, str):
+            literal, names = _split_template(template)
+        else:
+            literal, names = "", list(_DEFAULT_FIELDS)
+        self.prompt = prompt
+        self.literal = count_chars(literal)
+        self.title = names.count("title")
+        self.content = names.count("content")
+        self.context = [name for name in dict.fromkeys(names) if name not in _DEFAULT_FIELDS]
+        self.output = output_tokens
+        self.reserve = reserve  # completion budget counted against the context window
+        self.latency = latency  # expected seconds per call
+        # Upstream sections add their expected output size (see ``Planner``)
+        self.context_tokens = MESSAGE_OVERHEAD_TOKENS
+
+    def tokens(self, title: Tuple[int, int], content: Tuple[int, int]) -> int:
+        """Estimated prompt tokens when rendered with these title/content counts."""
+        ascii_chars = self.literal[0] + title[0] * self.title + content[0] * self.content
+        non_ascii = self.literal[1] + title[1] * self.title + content[1] * self.content
+        return estimate_from_counts(ascii_chars, non_ascii) + self.context_tokens
+
+
+@dataclass
+class _Pack:
+    """Batch request under construction for one prompt, closed like ``pack_documents``."""
+
+    template: _Template
+    base: int  # tokens of the shared instructions
+    count: int = 0
+    used: int = 0
+    # Title and content counts of the first document, run alone if nothing joins it
+    first: Tuple[Tuple[int, int], Tuple[int, int]] = ((0, 0), (0, 0))
+
+    def reset(self) -> None:
+        self.count, self.used = 0, self.base
+
+
+class Planner:
+    """Estimate tokens, calls, duration and cost of a pipeline run."""
+
+    def __init__(
+        self,
+        prompts: List[PromptUnit],
+        providers: List[ProviderPlan],
+        models: Optional[Dict[str, ModelInfo]] = None,
+        config: Optional[PlanConfig] = None,
+        history: Optional[Dict[str, PromptHistory]] = None,
+        chunker: Optional[TextChunker] = None,
+        reduce_prompts: Optional[Dict[str, PromptUnit]] = None,
+        batch_config: Optional[BatchConfig] = None,
+        dedup_config: Optional[DedupConfig] = None,
+    ):
+        """
+        Initialize planner.
+
+        Args:
+            prompts: Prompt units of the pipeline, in configured order
+            providers: Providers the calls are spread over (see ``provider_plans``)
+            models: Price and context window per model name
+            config: Output-size and latency assumptions
+            history: Observed per-prompt averages (see ``load_history``)
+            chunker: Chunking of long documents, if enabled
+            reduce_prompts: Reduce prompt per chunked section, if any
+            batch_config: Multi-document batching, if enabled
+            dedup_config: Duplicate detection, if enabled (identical payloads only)
+        """
+        self.providers = providers
+        self.models = models or {}
+        self.config = config or PlanConfig()
+        self.history = history or {}
+        self.chunker = chunker
+        self.batch_config = batch_config
+        self.dedup_config = dedup_config
+
+        windows = [
+            self.models[plan.model].context_window
+            for plan in providers
+            if plan.model in self.models and self.models[plan.model].context_window
+        ]
+        # Calls may go to any backend, so the smallest window applies
+        self.context_window: Optional[int] = min(windows) if windows else None
+
+        self.documents = 0
+        self.duplicates = 0
+        self.totals: Dict[str, CallTotals] = {}
+        self.output_sources: Dict[str, str] = {}
+        self.problems: List[str] = []
+        self.oversized_calls = 0
+        self.oversized_documents = 0
+        self.examples: List[Dict[str, Any]] = []
+        self._seen: Set[int] = set()
+        self._checked = False
+
+        self._templates = [self._template(prompt) for prompt in prompts]
+        expected: Dict[str, int] = {}
+        for template in self._templates:
+            template.context_tokens += sum(expected.get(name, 0) for name in template.context)
+            expected[template.prompt.section] = template.output
+            self.totals[template.prompt.name] = CallTotals()
+        self._reduce = {
+            section: self._template(prompt) for section, prompt in (reduce_prompts or {}).items()
+        }
+        for template in self._reduce.values():
+            self.totals[template.prompt.name] = CallTotals()
+
+        self._packs: Dict[str, _Pack] = {}
+        self._per_request = batch_config.documents_per_request if batch_config else 0
+        self._window_size = 0
+        self._window_fill = 0
+        if batch_config is not None:
+            batchable = {prompt.name for prompt in DocumentBatcher(batch_config, prompts).prompts}
+            for template in self._templates:
+                if template.prompt.name not in batchable:
+                    continue
+                base = estimate_tokens(
+                    template.prompt.template.format(
+                        title=BATCH_PLACEHOLDER, content=BATCH_PLACEHOLDER
+                    )
+                    + BATCH_INSTRUCTIONS
+                )
+                self._packs[template.prompt.name] = _Pack(template, base, used=base)
+                self.totals[f"{template.prompt.name}.batch"] = CallTotals()
+            concurrency = sum(plan.concurrency for plan in providers) or 1
+            self._window_size = batch_config.window or self._per_request * concurrency
+        self._block = count_chars(_split_template(DOCUMENT_BLOCK)[0])
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], prompts: List[PromptUnit]) -> "Planner":
+        """
+        Build a planner for the merged configuration, as ``build_pipeline`` would.
+
+        Args:
+            config: Whole merged configuration (``models`` and ``pipeline.plan`` included)
+            prompts: Prompt units from ``build_prompts``
+        """
+        from openextract.prompts.loader import TemplatePrompt
+
+        pipeline_config = config.get("pipeline", {})
+        plan_config = PlanConfig.from_dict(pipeline_config.get("plan") or {})
+        models = {
+            name: ModelInfo.from_dict(data or {})
+            for name, data in (config.get("models") or {}).items()
+        }
+
+        chunker = None
+        reduce_prompts: Dict[str, PromptUnit] = {}
+        chunking_config = pipeline_config.get("chunking") or {}
+        if chunking_config:
+            chunker = TextChunker(
+                max_tokens=chunking_config.get("max_tokens", 3000),
+                overlap_tokens=chunking_config.get("overlap_tokens", 200),
+                sections=chunking_config.get("sections"),
+            )
+            merge_config = chunking_config.get("merge") or {}
+            for section, path in (merge_config.get("reduce_prompts") or {}).items():
+                reduce_prompts[section] = TemplatePrompt(
+                    name=f"{section}.reduce",
+                    section=section,
+                    template=Path(path).read_text(encoding="utf-8"),
+                    max_tokens=pipeline_config.get("runtime", {}).get("max_tokens"),
+                )
+
+        batching_config = pipeline_config.get("batching") or {}
+        dedup_config = pipeline_config.get("dedup") or {}
+        return cls(
+            prompts,
+            provider_plans(config),
+            models=models,
+            config=plan_config,
+            history=load_history(plan_config.history) if plan_config.history else None,
+            chunker=chunker,
+            reduce_prompts=reduce_prompts,
+            batch_config=(
+                BatchConfig.from_dict(batching_config)
+                if batching_config and batching_config.get("enabled", True)
+                else None
+            ),
+            dedup_config=(
+                DedupConfig.from_dict(dedup_config)
+                if dedup_config and dedup_config.get("enabled", True)
+                else None
+            ),
+        )
+
+    def _template(self, prompt: PromptUnit) -> _Template:
+        max_tokens = getattr(prompt, "max_tokens", None)
+        output = self._output_tokens(prompt.name, max_tokens)
+        return _Template(prompt, output, max_tokens or output, self._latency(prompt.name, output))
+
+    def _output_tokens(self, name: str, max_tokens: Optional[int]) -> int:
+        observed = self.history.get(name)
+        if observed is not None and observed.output_tokens:
+            self.output_sources[name] = "history"
+            return observed.output_tokens
+        if max_tokens:
+            self.output_sources[name] = "max_tokens"
+            return int(max_tokens)
+        self.output_sources[name] = "default"
+        return self.config.output_tokens
+
+    def _latency(self, name: str, output_tokens: int) -> float:
+        observed = self.history.get(name)
+        if self.config.latency_seconds is None and observed is not None and observed.latency:
+            return observed.latency
+        return self.config.latency(output_tokens)
+
+    def plan(self, documents: Iterable[Document]) -> "Planner":
+        """Add every document of ``documents``; returns ``self`` for chaining."""
+        for document in documents:
+            self.add(document)
+        self.flush()
+        return self
+
+    def add(self, document: Document) -> None:
+        """Account for every call ``document`` would cause."""
+        self.documents += 1
+        if not self._checked:
+            self._checked = True
+            self._check_templates(document)
+        if not self._duplicate(document):
+            self._add(document)
+        if self._packs:
+            # The batcher packs within windows of documents read ahead
+            self._window_fill += 1
+            if self._window_fill >= self._window_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Close every open batch pack (end of a batching window or of the source)."""
+        self._window_fill = 0
+        for pack in self._packs.values():
+            self._close_pack(pack)
+
+    def _duplicate(self, document: Document) -> bool:
+        """Identical payloads only: normalizing every document would dominate the plan.
+
+        The pipeline also matches normalized and near-duplicate payloads, so
+        it can only make fewer calls than planned.
+        """
+        if self.dedup_config is None:
+            return False
+        payload = document.payload or ""
+        if len(payload) < self.dedup_config.min_chars:
+            return False
+        key = hash(payload)
+        if key in self._seen:
+            self.duplicates += 1
+            return True
+        self._seen.add(key)
+        return False
+
+    def _check_templates(self, document: Document) -> None:
+        """Render every prompt once, with upstream sections as empty values."""
+        sections = {template.prompt.section: {} for template in self._templates}
+        for template in [*self._templates, *self._reduce.values()]:
+            render = getattr(template.prompt, "render_input", None)
+            if render is None:
+                continue
+            try:
+                render(document, sections)
+            except KeyError as exc:
+                self.problems.append(f"{template.prompt.name}: unknown placeholder {exc}")
+            except (IndexError, ValueError) as exc:
+                self.problems.append(f"{template.prompt.name}: template does not render: {exc}")
+
+    def _add(self, document: Document) -> None:
+        title = count_chars(document.title or "")
+        content = count_chars(document.payload or "")
+        content_tokens = estimate_from_counts(*content)
+        chunks = self._chunk_count(content_tokens)
+        block: Optional[int] = None
+        oversized = False
+        for template in self._templates:
+            prompt = template.prompt
+            pack = self._packs.get(prompt.name)
+            if pack is not None and content_tokens <= self.batch_config.max_document_tokens:
+                if block is None:
+                    block = self._block_tokens(document, title, content)
+                self._pack(pack, block, title, content)
+                continue
+            if chunks > 1 and self.chunker.applies_to(prompt):
+                # Each chunk carries an even share of the content plus the overlap
+                share = min(
+                    self.chunker.max_tokens,
+                    math.ceil(content_tokens / chunks) + self.chunker.overlap_tokens,
+                )
+                tokens = template.tokens(title, (0, 0)) + share * template.content
+                self._call(template, tokens, calls=chunks)
+                reduce = self._reduce.get(prompt.section)
+                if reduce is not None:
+                    self._call(reduce, reduce.tokens(title, (0, 0)) + chunks * template.output)
+            else:
+                tokens = template.tokens(title, content)
+                self._call(template, tokens)
+            if self.context_window and tokens + template.reserve > self.context_window:
+                oversized = True
+                self.oversized_calls += 1
+                if len(self.examples) < self.config.examples:
+                    self.examples.append(
+                        {
+                            "doc_id": document.doc_id,
+                            "prompt": prompt.name,
+                            "tokens": tokens + template.reserve,
+                        }
+                    )
+        if oversized:
+            self.oversized_documents += 1
+
+    def _chunk_count(self, content_tokens: int) -> int:
+        chunker = self.chunker
+        if chunker is None or content_tokens <= chunker.max_tokens:
+            return 1
+        step = chunker.max_tokens - chunker.overlap_tokens
+        if step <= 0:
+            return math.ceil(content_tokens / chunker.max_tokens)
+        return max(1, math.ceil((content_tokens - chunker.overlap_tokens) / step))
+
+    def _call(self, template: _Template, input_tokens: int, calls: int = 1) -> None:
+        self.totals[template.prompt.name].add(
+            input_tokens, template.output, template.latency, calls=calls
+        )
+
+    def _block_tokens(
+        self, document: Document, title: Tuple[int, int], content: Tuple[int, int]
+    ) -> int:
+        """Estimated tokens of ``document``'s block inside a batch request."""
+        doc_id = count_chars(document.doc_id)
+        return estimate_from_counts(
+            self._block[0] + doc_id[0] + title[0] + content[0],
+            self._block[1] + doc_id[1] + title[1] + content[1],
+        )
+
+    def _pack(
+        self, pack: _Pack, cost: int, title: Tuple[int, int], content: Tuple[int, int]
+    ) -> None:
+        if pack.count and (
+            pack.count >= self._per_request or pack.used + cost > self.batch_config.max_input_tokens
+        ):
+            self._close_pack(pack)
+        if not pack.count:
+            pack.first = (title, content)
+        pack.count += 1
+        pack.used += cost
+
+    def _close_pack(self, pack: _Pack) -> None:
+        template = pack.template
+        if pack.count == 1:
+            # A pack of one runs as a regular call
+            self._call(template, template.tokens(*pack.first))
+        elif pack.count:
+            name = f"{template.prompt.name}.batch"
+            output = min(
+                template.output * pack.count, self.batch_config.request_max_tokens(pack.count)
+            )
+            self.totals[name].add(
+                pack.used + MESSAGE_OVERHEAD_TOKENS,
+                output,
+                self._latency(name, output),
+                documents=pack.count,
+            )
+        pack.reset()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the plan.
+
+        Returns:
+            JSON-serializable report: document counts, per-call totals,
+            provider shares with their time bounds, projected seconds, cost
+            and oversized documents
+        """
+        calls = sum(totals.calls for totals in self.totals.values())
+        input_tokens = sum(totals.input_tokens for totals in self.totals.values())
+        output_tokens = sum(totals.output_tokens for totals in self.totals.values())
+        latency = sum(totals.seconds for totals in self.totals.values())
+
+        providers = []
+        throughput = 0.0
+        for plan in self.providers:
+            bounds = {"concurrency": latency / plan.concurrency}
+            if plan.rpm:
+                bounds["rpm"] = calls * 60.0 / plan.rpm
+            if plan.tpm:
+                bounds["tpm"] = (input_tokens + output_tokens) * 60.0 / plan.tpm
+            seconds = max(bounds.values())
+            rate = calls / seconds if seconds else 0.0
+            throughput += rate
+            providers.append(
+                {
+                    **asdict(plan),
+                    "bounds": bounds,
+                    "bottleneck": max(bounds, key=bounds.get),
+                    "rate": rate,
+                }
+            )
+
+        cost: Optional[float] = 0.0
+        unpriced: List[str] = []
+        for entry in providers:
+            entry["share"] = entry.pop("rate") / throughput if throughput else 1.0 / len(providers)
+            info = self.models.get(entry["model"])
+            if info is None or not info.priced:
+                unpriced.append(entry["model"])
+                continue
+            cost += entry["share"] * (
+                input_tokens * info.input_price + output_tokens * info.output_price
+            ) / 1_000_000
+        if unpriced:
+            cost = None
+
+        return {
+            "documents": self.documents,
+            "duplicates": self.duplicates,
+            "calls": {name: asdict(totals) for name, totals in self.totals.items() if totals.calls},
+            "total": {
+                "calls": calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+            },
+            "output_tokens_from": self.output_sources,
+            "providers": providers,
+            "seconds": calls / throughput if throughput else 0.0,
+            "cost": cost,
+            "unpriced_models": sorted(set(unpriced)),
+            "context_window": self.context_window,
+            "oversized": {
+                "documents": self.oversized_documents,
+                "calls": self.oversized_calls,
+                "examples": self.examples,
+            },
+            "problems": self.problems,
+        }
@@ -0,0 +1,201 @@
+"""Longest-processing-time-first dispatch of documents.
+
+Source order is a poor dispatch order when document sizes vary a lot: a
+few 30k-character reports near the end of a sheet leave one worker busy
+long after the others have gone idle. ``LptScheduler`` reads a bounded
+window of documents ahead and hands each free worker the most expensive
+document it has seen, which is the classic LPT heuristic for shortening
+makespan. The pipeline still yields results in source order.
+
+Costs are estimated without a tokenizer (see ``openextract.utils.tokens``):
+for every prompt still to run, its template size plus the document's
+title and, if the prompt reads it, the document's payload. Documents from
+the same window share the provider's in-flight slots, so the pipeline also
+passes each ``(document, prompt)`` cost to the concurrency limiter, which
+gives free slots to the most expensive waiting call.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from openextract.utils.tokens import estimate_tokens
+
+if TYPE_CHECKING:
+    from openextract.pipelines.base import Document, PromptUnit
+
+# Prompts without a template are assumed to read the whole document
+_DEFAULT_FIELDS = frozenset({"title", "content"})
+
+
+@dataclass
+class SchedulingConfig:
+    """Settings for largest-first document dispatch."""
+
+    lookahead: Optional[int] = None  # documents read ahead; default 8 x concurrency
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchedulingConfig":
+        """Build from a YAML ``scheduling`` block."""
+        lookahead = data.get("lookahead")
+        if lookahead is not None and int(lookahead) < 1:
+            raise ValueError("scheduling.lookahead must be at least 1")
+        return cls(lookahead=int(lookahead) if lookahead is not None else None)
+
+    def window(self, concurrency: int) -> int:
+        """Number of documents to read ahead for ``concurrency`` workers."""
+        return max(self.lookahead or 8 * concurrency, concurrency)
+
+
+class CostEstimator:
+    """Estimate the token cost of running prompts on a document."""
+
+    def __init__(
+        self,
+        prompts: List["PromptUnit"],
+        estimate: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Initialize estimator.
+
+        Args:
+            prompts: Prompt units of the pipeline
+            estimate: Token estimator for one string
+        """
+        from openextract.prompts.loader import template_fields
+
+        self.estimate = estimate
+        # section -> (template tokens, reads title, reads content)
+        self._prompts: Dict[str, Tuple[int, bool, bool]] = {}
+        for prompt in prompts:
+            template = getattr(prompt, "template", None)
+            fields = set(template_fields(template)) if template is not None else _DEFAULT_FIELDS
+            self._prompts[prompt.section] = (
+                estimate(template or ""),
+                "title" in fields,
+                "content" in fields,
+            )
+
+    def prompt_cost(self, document: "Document", prompt: "PromptUnit") -> int:
+        """Estimated prompt tokens of running ``prompt`` on ``document``."""
+        return self._cost(document, prompt.section, self.estimate(document.payload))
+
+    def document_cost(self, document: "Document", done: Container[str] = ()) -> int:
+        """
+        Estimated prompt tokens of the prompts ``document`` still needs.
+
+        Args:
+            document: Document to estimate
+            done: Sections that are already available and will not run
+
+        Returns:
+            Sum of the per-prompt estimates
+        """
+        payload = self.estimate(document.payload)
+        return sum(
+            self._cost(document, section, payload)
+            for section in self._prompts
+            if section not in done
+        )
+
+    def _cost(self, document: "Document", section: str, payload_tokens: int) -> int:
+        # Derived prompts (batches, reduce steps) count as reading everything
+        template, reads_title, reads_content = self._prompts.get(section, (0, True, True))
+        cost = template
+        if reads_title:
+            cost += self.estimate(document.title)
+        if reads_content:
+            cost += payload_tokens
+        return cost
+
+
+class LptScheduler:
+    """Run jobs on an executor largest-first, at most ``slots`` at a time.
+
+    Jobs wait in a priority queue until a slot frees up, so the choice of
+    what runs next is made as late as possible, among every job submitted
+    so far. ``submit`` returns a future for the job's result right away;
+    ``promote`` moves a job that a consumer is blocked on to the front.
+    """
+
+    def __init__(self, executor: Executor, slots: int):
+        """
+        Initialize scheduler.
+
+        Args:
+            executor: Executor running the jobs
+            slots: Jobs allowed to run at once, normally the executor's workers
+        """
+        self.executor = executor
+        self.slots = max(1, int(slots))
+        self._queue: List[Tuple[float, int, Callable[..., Any], Tuple[Any, ...], Future]] = []
+        self._order = itertools.count()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, cost: float, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue ``fn(*args)`` with priority ``cost``; return its future."""
+        future: Future = Future()
+        with self._lock:
+            heapq.heappush(self._queue, (-cost, next(self._order), fn, args, future))
+        self._dispatch()
+        return future
+
+    def promote(self, futures: Iterable[Future]) -> None:
+        """Run the jobs behind ``futures`` next (in submission order) if still queued.
+
+        Results are consumed in source order, so small jobs at the head of
+        that order would otherwise hold up reading further ahead.
+        """
+        wanted = {id(future) for future in futures}
+        with self._lock:
+            self._queue = [
+                (float("-inf"),) + entry[1:] if id(entry[4]) in wanted else entry
+                for entry in self._queue
+            ]
+            heapq.heapify(self._queue)
+
+    def _dispatch(self) -> None:
+        """Start the most expensive queued jobs while slots are free."""
+        started = []
+        with self._lock:
+            while self._queue and self._running < self.slots:
+                started.append(heapq.heappop(self._queue))
+                self._running += 1
+        for _, _, fn, args, future in started:
+            try:
+                job = self.executor.submit(fn, *args)
+            except RuntimeError as exc:  # executor shut down (run abandoned)
+                self._finished(future, exc=exc)
+                continue
+            job.add_done_callback(lambda done, future=future: self._finished(future, done))
+
+    def _finished(
+        self,
+        future: Future,
+        done: Optional[Future] = None,
+        exc: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._running -= 1
+        if done is not None:
+            exc = done.exception()
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(done.result())
+        self._dispatch()
@@ -0,0 +1,246 @@
+"""Structured output handling: local repair, schema checks and field salvage.
+
+Providers hand back either parsed JSON or the raw completion wrapped as
+``{"content": "<text>"}``. ``StructuredOutput`` turns both into a JSON value
+by repairing the text locally (see ``openextract.utils.jsonrepair``), checks
+it against the prompt's optional schema and, when only some fields are
+missing or malformed, asks the model again for just those fields instead of
+re-running the whole prompt.
+
+A schema is a small JSON-Schema subset attached to a prompt as ``schema``
+(``PromptLoader`` reads it from ``<prompt>.schema.json``)::
+
+    {"required": ["文档类型", "关键措施"],
+     "properties": {"文档类型": {"type": "string"}, "关键措施": {"type": "array"}}}
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openextract.pipelines.base import Document, PromptUnit
+from openextract.utils.jsonrepair import loads_lenient
+from openextract.utils.metrics import METRICS
+
+SCHEMA_TYPES = ("string", "number", "integer", "boolean", "array", "object")
+
+SALVAGE_INSTRUCTIONS = (
+    "\n\n注意：只需补充以下字段：{fields}。"
+    "请只输出一个仅包含这些字段的 JSON 对象，不要输出其他说明文字。"
+)
+
+# (prompt, document, payload) -> provider response
+InvokeFn = Callable[[Any, Document, Dict[str, Any]], Any]
+
+
+@dataclass
+class OutputSchema:
+    """Required fields and expected JSON types of one prompt's output."""
+
+    required: List[str] = field(default_factory=list)
+    types: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OutputSchema":
+        """Build from a JSON-Schema style ``{"required": [...], "properties": {...}}``."""
+        types: Dict[str, str] = {}
+        for name, spec in (data.get("properties") or {}).items():
+            kind = spec.get("type") if isinstance(spec, dict) else spec
+            if kind is None:
+                continue
+            if kind not in SCHEMA_TYPES:
+                raise ValueError(f"Unsupported schema type for {name}: {kind}")
+            types[name] = kind
+        return cls(required=list(data.get("required") or types), types=types)
+
+    def check(self, value: Any) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Keep the fields of ``value`` that match the schema.
+
+        Scalars are wrapped into one-element lists where an array is
+        expected and numbers are stringified where a string is expected.
+
+        Returns:
+            ``(fields, missing)``: the valid fields and the required fields
+            that are absent, blank or of the wrong type
+        """
+        if not isinstance(value, dict):
+            return {}, list(self.required)
+        fields: Dict[str, Any] = {}
+        for name, item in value.items():
+            coerced = _coerce(item, self.types.get(name))
+            if coerced is not None:
+                fields[name] = coerced
+        return fields, [name for name in self.required if name not in fields]
+
+
+def _coerce(value: Any, kind: Optional[str]) -> Any:
+    """Return ``value`` as ``kind``, or ``None`` if it is blank or cannot be one."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if kind is None:
+        return value
+    if kind == "array":
+        return value if isinstance(value, list) else [value]
+    if kind == "string":
+        if isinstance(value, str):
+            return value
+        return str(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if kind == "object":
+        return value if isinstance(value, dict) else None
+    if kind == "boolean":
+        return value if isinstance(value, bool) else None
+    if kind == "integer":
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+    if kind == "number":
+        return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    return value
+
+
+@dataclass
+class StructuredOutputConfig:
+    """Settings for ``StructuredOutput``."""
+
+    parse: bool = True  # store sections as JSON values instead of {"content": text}
+    salvage_single_field: bool = True  # re-request only the missing schema fields
+    max_salvage_calls: int = 1
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StructuredOutputConfig":
+        """Build from a YAML ``structured_output`` block."""
+        return cls(
+            parse=data.get("parse", cls.parse),
+            salvage_single_field=data.get("salvage_single_field", cls.salvage_single_field),
+            max_salvage_calls=data.get("max_salvage_calls", cls.max_salvage_calls),
+        )
+
+
+@dataclass
+class SalvagePrompt:
+    """Follow-up request for the missing fields of one prompt's output."""
+
+    prompt: Any
+    payload: Dict[str, Any]
+    fields: List[str]
+
+    @property
+    def name(self) -> str:
+        return f"{self.prompt.name}.salvage"
+
+    @property
+    def section(self) -> str:
+        return self.prompt.section
+
+    def render_input(self, document: Document, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Repeat the original request with an instruction naming the fields."""
+        messages = [dict(message) for message in self.payload.get("messages", [])]
+        instructions = SALVAGE_INSTRUCTIONS.format(fields="、".join(self.fields))
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                message["content"] = f"{message.get('content', '')}{instructions}"
+                break
+        else:
+            messages.append({"role": "user", "content": instructions.strip()})
+        return {**self.payload, "messages": messages}
+
+
+class StructuredOutput:
+    """Repairs, validates and completes prompt outputs."""
+
+    def __init__(self, config: Optional[StructuredOutputConfig] = None):
+        """
+        Initialize structured output handling.
+
+        Args:
+            config: Output shape and salvage settings
+        """
+        self.config = config or StructuredOutputConfig()
+        self._schemas: Dict[str, Optional[OutputSchema]] = {}
+
+    def schema_for(self, prompt: PromptUnit) -> Optional[OutputSchema]:
+        """Return the parsed schema of ``prompt``, if it declares one."""
+        name = prompt.name
+        if name not in self._schemas:
+            schema = getattr(prompt, "schema", None)
+            if isinstance(schema, dict):
+                schema = OutputSchema.from_dict(schema)
+            self._schemas[name] = schema
+        return self._schemas[name]
+
+    def parse(self, prompt: PromptUnit, response: Any) -> Tuple[Any, List[str]]:
+        """
+        Turn a provider response into a JSON value without calling the model.
+
+        Returns:
+            ``(value, missing)``; ``value`` is ``None`` when the output is
+            not JSON at all, ``missing`` lists the schema fields to salvage
+        """
+        value = response
+        if isinstance(response, dict) and set(response) == {"content"}:
+            try:
+                value, repaired = loads_lenient(str(response["content"]))
+            except ValueError:
+                value = None
+            else:
+                if repaired:
+                    METRICS.inc("output_repairs_total", prompt=prompt.name)
+        schema = self.schema_for(prompt)
+        if schema is None:
+            return value, []
+        fields, missing = schema.check(value)
+        return (fields or None), missing
+
+    def process(
+        self,
+        prompt: PromptUnit,
+        document: Document,
+        payload: Dict[str, Any],
+        response: Any,
+        invoke: Optional[InvokeFn] = None,
+    ) -> Any:
+        """
+        Repair and validate ``response``, salvaging missing fields via ``invoke``.
+
+        Args:
+            prompt: Prompt that produced the response
+            document: Document the prompt ran on
+            payload: Payload that was sent; salvage requests extend it
+            response: Parsed provider response
+            invoke: Provider call for salvage requests; ``None`` disables salvage
+
+        Returns:
+            The section value in the configured shape
+
+        Raises:
+            ValueError: If a prompt with a schema yields no usable field
+        """
+        value, missing = self.parse(prompt, response)
+        calls = 0
+        while (
+            missing
+            and invoke is not None
+            and self.config.salvage_single_field
+            and calls < self.config.max_salvage_calls
+        ):
+            calls += 1
+            METRICS.inc("output_salvage_total", prompt=prompt.name)
+            salvage = SalvagePrompt(prompt, payload, missing)
+            extra, _ = self.parse(prompt, invoke(salvage, document, salvage.render_input(document, {})))
+            if isinstance(extra, dict):
+                value = {**(value or {}), **{key: extra[key] for key in missing if key in extra}}
+            missing = [key for key in missing if not isinstance(value, dict) or key not in value]
+        if missing:
+            METRICS.inc("output_missing_fields_total", len(missing), prompt=prompt.name)
+        return self.finish(prompt, response, value)
+
+    def finish(self, prompt: PromptUnit, response: Any, value: Any) -> Any:
+        """Return ``value`` in the configured shape, falling back to ``response``."""
+        if value is None:
+            if self.schema_for(prompt) is not None:
+                raise ValueError(f"{prompt.name}: output has no valid schema fields")
+            METRICS.inc("output_unparsed_total", prompt=prompt.name)
+            return response
+        if self.config.parse:
+            return value
+        return {"content": json.dumps(value, ensure_ascii=False, indent=2)}
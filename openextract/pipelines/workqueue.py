@@ -0,0 +1,608 @@
+"""Durable SQLite work queue shared by several worker processes.
+
+One process is limited by one API key's quota and one machine's sockets.
+To spread a corpus over several workers (local processes, or hosts sharing
+the database file), documents are first enqueued into a task table with
+one unit per ``(doc_id, section)``. Workers then repeatedly claim a leased
+batch of documents that still have pending units, run only those units
+through ``BasePipeline.run_iter`` (done units are passed in as the
+``previous`` result, so prompt dependencies are honoured as usual), and
+record each unit as done or failed.
+
+A lease is renewed by the worker's heartbeat while it works; if a worker
+dies, its lease expires and another worker claims the documents again.
+Fast workers simply claim more batches than slow ones, so no static split
+of the corpus is needed. ``WorkQueue.results`` rebuilds ordered
+``PipelineResult`` records from the units for the usual writers.
+
+Enqueuing an existing document keeps its done units when their
+fingerprints are still current (see ``openextract.pipelines.fingerprint``)
+and resets stale and failed units to pending, like ``--resume``.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from openextract.pipelines.base import Document, PipelineResult
+from openextract.utils.metrics import METRICS
+
+if TYPE_CHECKING:
+    from openextract.pipelines.base import BasePipeline
+    from openextract.pipelines.fingerprint import SectionFingerprints
+
+
+@dataclass
+class QueueConfig:
+    """Settings for ``WorkQueue`` and ``QueueWorker``."""
+
+    path: Optional[str] = None  # default: <json_path>/queue.sqlite
+    lease_seconds: float = 120.0  # claimed documents return to the queue after this
+    heartbeat_seconds: Optional[float] = None  # lease renewal interval; default lease / 3
+    batch_documents: Optional[int] = None  # documents per claim; default 4 x concurrency
+    max_attempts: int = 3  # failed runs of a unit before it is given up
+    poll_seconds: float = 2.0  # wait while the remaining work is leased by others
+    wal: bool = True  # WAL journal; disable when the file is on a network filesystem
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueueConfig":
+        """Build from a YAML ``queue`` block."""
+        config = cls(
+            path=data.get("path", cls.path),
+            lease_seconds=float(data.get("lease_seconds", cls.lease_seconds)),
+            heartbeat_seconds=data.get("heartbeat_seconds", cls.heartbeat_seconds),
+            batch_documents=data.get("batch_documents", cls.batch_documents),
+            max_attempts=max(1, int(data.get("max_attempts", cls.max_attempts))),
+            poll_seconds=float(data.get("poll_seconds", cls.poll_seconds)),
+            wal=bool(data.get("wal", cls.wal)),
+        )
+        if config.lease_seconds <= 0:
+            raise ValueError("queue.lease_seconds must be positive")
+        if config.heartbeat_seconds is not None:
+            config.heartbeat_seconds = float(config.heartbeat_seconds)
+        if config.batch_documents is not None:
+            config.batch_documents = max(1, int(config.batch_documents))
+        return config
+
+    @property
+    def heartbeat_interval(self) -> float:
+        if self.heartbeat_seconds is not None:
+            return self.heartbeat_seconds
+        return self.lease_seconds / 3
+
+
+class WorkQueue:
+    """SQLite task table of ``(doc_id, section)`` units with leased claims."""
+
+    def __init__(self, path: str | Path, config: Optional[QueueConfig] = None):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path: Database file; every worker must open the same file
+            config: Lease and retry settings
+        """
+        self.path = Path(path)
+        self.config = config or QueueConfig()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=60.0, check_same_thread=False, isolation_level=None
+        )
+        if self.config.wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                meta TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                lease_expires REAL,
+                usage TEXT,
+                duplicate_of TEXT
+            );
+            CREATE INDEX IF NOT EXISTS documents_status ON documents (status, seq);
+            CREATE INDEX IF NOT EXISTS documents_owner ON documents (owner);
+            CREATE TABLE IF NOT EXISTS units (
+                doc_id TEXT NOT NULL,
+                section TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                value TEXT,
+                fingerprint TEXT,
+                error TEXT,
+                PRIMARY KEY (doc_id, section)
+            );
+            """
+        )
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock of the database for the block."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def clear(self) -> None:
+        """Remove every document and unit (start a fresh run)."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM units")
+            conn.execute("DELETE FROM documents")
+
+    def enqueue(
+        self,
+        documents: Iterable[Document],
+        sections: List[str],
+        fingerprints: Optional["SectionFingerprints"] = None,
+        chunk_size: int = 500,
+        previous: Optional[Mapping[str, PipelineResult]] = None,
+    ) -> int:
+        """
+        Add documents and create their units.
+
+        Existing documents are updated; their done units are kept when the
+        fingerprint still matches, stale and failed units become pending
+        again, and units of sections no longer configured are removed.
+        Sections of ``previous`` results that are still current are stored
+        as done units, so they are not run again.
+
+        Args:
+            documents: Documents in output order
+            sections: Section of every prompt, in configured order
+            fingerprints: Expected fingerprints; without them done units are kept
+            chunk_size: Documents written per transaction
+            previous: Earlier results keyed by doc_id (e.g. ``RunJournal.load``)
+
+        Returns:
+            Number of units that are pending afterwards
+        """
+        documents = iter(documents)
+        while True:
+            chunk = list(itertools.islice(documents, chunk_size))
+            if not chunk:
+                break
+            with self._transaction() as conn:
+                for document in chunk:
+                    seed = previous.get(document.doc_id) if previous else None
+                    self._enqueue_one(conn, document, sections, fingerprints, seed)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM units WHERE status = 'pending'"
+            ).fetchone()
+        return int(row[0])
+
+    def _enqueue_one(
+        self,
+        conn: sqlite3.Connection,
+        document: Document,
+        sections: List[str],
+        fingerprints: Optional["SectionFingerprints"],
+        seed: Optional[PipelineResult] = None,
+    ) -> None:
+        meta = json.dumps(document.meta, ensure_ascii=False, default=str)
+        conn.execute(
+            """
+            INSERT INTO documents (doc_id, title, payload, meta, status)
+            VALUES (?, ?, ?, ?, 'pending')
+            ON CONFLICT (doc_id) DO UPDATE SET
+                title = excluded.title, payload = excluded.payload, meta = excluded.meta
+            """,
+            (document.doc_id, document.title, document.payload, meta),
+        )
+        expected = fingerprints.compute(document) if fingerprints is not None else {}
+        stored = {
+            section: (status, fingerprint)
+            for section, status, fingerprint in conn.execute(
+                "SELECT section, status, fingerprint FROM units WHERE doc_id = ?",
+                (document.doc_id,),
+            )
+        }
+        for section in set(stored) - set(sections):
+            conn.execute(
+                "DELETE FROM units WHERE doc_id = ? AND section = ?", (document.doc_id, section)
+            )
+        for position, section in enumerate(sections):
+            status, fingerprint = stored.get(section, (None, None))
+            if status == "done" and (not expected or expected.get(section) == fingerprint):
+                conn.execute(
+                    "UPDATE units SET position = ? WHERE doc_id = ? AND section = ?",
+                    (position, document.doc_id, section),
+                )
+                continue
+            if seed is not None and section in seed.structured_tags:
+                # Results without a fingerprint predate fingerprints and count as current
+                seeded = seed.fingerprints.get(section)
+                if not expected or seeded is None or expected.get(section) == seeded:
+                    conn.execute(
+                        """
+                        INSERT INTO units (doc_id, section, position, status, value, fingerprint)
+                        VALUES (?, ?, ?, 'done', ?, ?)
+                        ON CONFLICT (doc_id, section) DO UPDATE SET
+                            position = excluded.position, status = 'done', attempts = 0,
+                            value = excluded.value, fingerprint = excluded.fingerprint,
+                            error = NULL
+                        """,
+                        (
+                            document.doc_id,
+                            section,
+                            position,
+                            json.dumps(seed.structured_tags[section], ensure_ascii=False),
+                            expected.get(section, seeded),
+                        ),
+                    )
+                    continue
+            if status == "done":
+                METRICS.inc("stale_sections_total", section=section)
+            conn.execute(
+                """
+                INSERT INTO units (doc_id, section, position, status)
+                VALUES (?, ?, ?, 'pending')
+                ON CONFLICT (doc_id, section) DO UPDATE SET
+                    position = excluded.position, status = 'pending', attempts = 0,
+                    value = NULL, fingerprint = NULL, error = NULL
+                """,
+                (document.doc_id, section, position),
+            )
+        conn.execute(
+            """
+            UPDATE documents SET status = CASE WHEN EXISTS (
+                SELECT 1 FROM units WHERE units.doc_id = documents.doc_id AND status = 'pending'
+            ) THEN 'pending' ELSE 'done' END
+            WHERE doc_id = ?
+            """,
+            (document.doc_id,),
+        )
+
+    def claim(
+        self,
+        owner: str,
+        limit: int,
+    ) -> List[Tuple[Document, Optional[PipelineResult]]]:
+        """
+        Lease up to ``limit`` documents with pending units, in queue order.
+
+        Documents whose lease expired are claimed like unleased ones.
+
+        Args:
+            owner: Worker identity holding the lease
+            limit: Maximum documents to claim
+
+        Returns:
+            Claimed documents, each with its done units as a seed result
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT seq, doc_id, title, payload, meta, owner FROM documents
+                WHERE status = 'pending' AND (owner IS NULL OR lease_expires < ?)
+                ORDER BY seq LIMIT ?
+                """,
+                (now, limit),
+            ).fetchall()
+            if not rows:
+                return []
+            conn.executemany(
+                "UPDATE documents SET owner = ?, lease_expires = ? WHERE seq = ?",
+                [(owner, now + self.config.lease_seconds, row[0]) for row in rows],
+            )
+            claimed = []
+            for _, doc_id, title, payload, meta, _ in rows:
+                document = Document(
+                    doc_id=doc_id, title=title, payload=payload, meta=json.loads(meta)
+                )
+                done = conn.execute(
+                    """
+                    SELECT section, value, fingerprint FROM units
+                    WHERE doc_id = ? AND status = 'done' ORDER BY position
+                    """,
+                    (doc_id,),
+                ).fetchall()
+                seed = None
+                if done:
+                    seed = PipelineResult(
+                        doc_id=doc_id,
+                        title=title,
+                        structured_tags={section: json.loads(value) for section, value, _ in done},
+                        fingerprints={section: fp for section, _, fp in done if fp},
+                    )
+                claimed.append((document, seed))
+        expired = sum(1 for row in rows if row[5] is not None)
+        if expired:
+            METRICS.inc("queue_leases_expired_total", expired)
+        METRICS.inc("queue_claims_total")
+        return claimed
+
+    def heartbeat(self, owner: str) -> int:
+        """Extend every lease held by ``owner``; return how many were renewed."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE documents SET lease_expires = ? WHERE owner = ?",
+                (time.time() + self.config.lease_seconds, owner),
+            )
+            return cursor.rowcount
+
+    def release(self, owner: str) -> None:
+        """Give up every lease held by ``owner`` (e.g. on shutdown)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE documents SET owner = NULL, lease_expires = NULL WHERE owner = ?",
+                (owner,),
+            )
+
+    def complete(
+        self,
+        owner: str,
+        result: PipelineResult,
+        errors: Optional[Mapping[str, Dict[str, Any]]] = None,
+    ) -> bool:
+        """
+        Record a worker's result and release its lease.
+
+        Sections in ``result`` become done. Every other pending unit of the
+        document counts as a failed attempt and stays pending until it has
+        failed ``max_attempts`` times. Nothing is recorded if ``owner`` no
+        longer holds the lease: the document's current owner (or the one
+        that already completed it) decides its units.
+
+        Args:
+            owner: Worker that processed the document
+            result: The pipeline result
+            errors: Error entry (as in ``PipelineResult.errors``) per failed section
+
+        Returns:
+            False if the lease was lost and the result was discarded
+        """
+        errors = errors or {}
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner FROM documents WHERE doc_id = ?", (result.doc_id,)
+            ).fetchone()
+            if row is None or row[0] != owner:
+                METRICS.inc("queue_lost_leases_total")
+                return False
+            for section, value in result.structured_tags.items():
+                conn.execute(
+                    """
+                    UPDATE units SET status = 'done', value = ?, fingerprint = ?, error = NULL
+                    WHERE doc_id = ? AND section = ?
+                    """,
+                    (
+                        json.dumps(value, ensure_ascii=False),
+                        result.fingerprints.get(section),
+                        result.doc_id,
+                        section,
+                    ),
+                )
+            pending = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT section FROM units WHERE doc_id = ? AND status = 'pending'",
+                    (result.doc_id,),
+                )
+            ]
+            for section in pending:
+                error = errors.get(section) or {"prompt": section, "error": "No result returned"}
+                conn.execute(
+                    """
+                    UPDATE units SET attempts = attempts + 1, error = ?,
+                        status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+                    WHERE doc_id = ? AND section = ?
+                    """,
+                    (
+                        json.dumps(error, ensure_ascii=False),
+                        self.config.max_attempts,
+                        result.doc_id,
+                        section,
+                    ),
+                )
+            row = conn.execute(
+                "SELECT usage FROM documents WHERE doc_id = ?", (result.doc_id,)
+            ).fetchone()
+            usage = json.loads(row[0]) if row and row[0] else {}
+            for key, value in result.usage.items():
+                usage[key] = usage.get(key, 0) + value
+            conn.execute(
+                """
+                UPDATE documents SET
+                    usage = ?,
+                    duplicate_of = ?,
+                    status = CASE WHEN EXISTS (
+                        SELECT 1 FROM units
+                        WHERE units.doc_id = documents.doc_id AND status = 'pending'
+                    ) THEN 'pending' ELSE 'done' END
+                WHERE doc_id = ?
+                """,
+                (json.dumps(usage) if usage else None, result.duplicate_of, result.doc_id),
+            )
+            conn.execute(
+                "UPDATE documents SET owner = NULL, lease_expires = NULL WHERE doc_id = ?",
+                (result.doc_id,),
+            )
+        METRICS.inc("queue_documents_total", status="error" if pending else "ok")
+        return True
+
+    def remaining(self) -> int:
+        """Number of documents that still have pending units (leased or not)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE status = 'pending'"
+            ).fetchone()
+        return int(row[0])
+
+    def stats(self) -> Dict[str, int]:
+        """Return unit counts by status and the number of live leases."""
+        with self._lock:
+            counts = {"pending": 0, "done": 0, "failed": 0}
+            for status, count in self._conn.execute(
+                "SELECT status, COUNT(*) FROM units GROUP BY status"
+            ):
+                counts[status] = count
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE owner IS NOT NULL AND lease_expires >= ?",
+                (time.time(),),
+            ).fetchone()
+        counts["leased_documents"] = int(row[0])
+        return counts
+
+    def results(self) -> Iterator[PipelineResult]:
+        """
+        Rebuild one result per document, in enqueue order.
+
+        Done units become sections; failed and still pending units are
+        reported in ``errors``.
+        """
+        cursor = self._conn.execute(
+            """
+            SELECT d.seq, d.doc_id, d.title, d.usage, d.duplicate_of,
+                   u.section, u.status, u.value, u.fingerprint, u.error
+            FROM documents d LEFT JOIN units u ON u.doc_id = d.doc_id
+            ORDER BY d.seq, u.position
+            """
+        )
+        for _, rows in itertools.groupby(cursor, key=lambda row: row[0]):
+            rows = list(rows)
+            _, doc_id, title, usage, duplicate_of = rows[0][:5]
+            result = PipelineResult(
+                doc_id=doc_id,
+                title=title,
+                structured_tags={},
+                usage=json.loads(usage) if usage else {},
+                duplicate_of=duplicate_of,
+            )
+            for *_, section, status, value, fingerprint, error in rows:
+                if section is None:
+                    continue
+                if status == "done":
+                    result.structured_tags[section] = json.loads(value)
+                    if fingerprint:
+                        result.fingerprints[section] = fingerprint
+                elif error:
+                    result.errors.append(json.loads(error))
+                else:
+                    result.errors.append({"prompt": section, "error": "Not processed"})
+            yield result
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def worker_name() -> str:
+    """Identity of this process in leases: ``host:pid:random``."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class QueueWorker:
+    """Claim leased batches from a ``WorkQueue`` and run them through a pipeline."""
+
+    def __init__(
+        self,
+        pipeline: "BasePipeline",
+        queue: WorkQueue,
+        owner: Optional[str] = None,
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            pipeline: Pipeline to run claimed documents through (without a journal)
+            queue: Shared work queue
+            owner: Lease identity (default: ``worker_name()``)
+        """
+        self.pipeline = pipeline
+        self.queue = queue
+        self.owner = owner or worker_name()
+        config = queue.config
+        self.batch_documents = config.batch_documents or 4 * pipeline.concurrency
+        self._sections = {prompt.name: prompt.section for prompt in pipeline.prompts}
+        self._stop = threading.Event()
+        self.processed = 0
+
+    def run(self) -> int:
+        """
+        Work until no document has pending units; return how many were processed.
+
+        While the remaining documents are leased by other workers, the worker
+        waits, since their leases may still expire.
+        """
+        heartbeat = threading.Thread(
+            target=self._heartbeat, name="openextract-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            while not self._stop.is_set():
+                claimed = self.queue.claim(self.owner, self.batch_documents)
+                if not claimed:
+                    if self.queue.remaining() == 0:
+                        break
+                    self._stop.wait(self.queue.config.poll_seconds)
+                    continue
+                previous = {document.doc_id: seed for document, seed in claimed if seed}
+                documents = [document for document, _ in claimed]
+                for result in self.pipeline.run_iter(documents, previous=previous):
+                    if not self.queue.complete(self.owner, result, self._errors(result)):
+                        print(f"[{self.owner}] {result.doc_id}: lease lost, discarded", flush=True)
+                        continue
+                    self.processed += 1
+                    status = f"{len(result.errors)} errors" if result.errors else "ok"
+                    print(f"[{self.owner}] {result.doc_id}: {status}", flush=True)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            # Whatever was not finished is immediately claimable by others
+            self.queue.release(self.owner)
+        return self.processed
+
+    def stop(self) -> None:
+        """Finish the current batch, then return from ``run``."""
+        self._stop.set()
+
+    def _errors(self, result: PipelineResult) -> Dict[str, Dict[str, Any]]:
+        """Map ``result.errors`` (keyed by prompt name) to sections."""
+        return {
+            self._sections.get(error.get("prompt"), error.get("prompt")): error
+            for error in result.errors
+        }
+
+    def _heartbeat(self) -> None:
+        interval = self.queue.config.heartbeat_interval
+        while not self._stop.wait(interval):
+            self.queue.heartbeat(self.owner)
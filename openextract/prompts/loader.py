@@ -1,12 +1,32 @@
 """Prompt loading and rendering for OpenExtract."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import re
+import string
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List
 
 from openextract.pipelines.base import Document
 
+# Placeholders always provided by the document itself
+DOCUMENT_FIELDS = {"title", "content"}
+
+
+def template_fields(template: str) -> List[str]:
+    """Return the top-level placeholder names used in a format template."""
+    names: List[str] = []
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if not field_name:
+            continue
+        # "{section.key}" / "{section[0]}" still depend on "section"
+        name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        if name and name not in names:
+            names.append(name)
+    return names
+
 
 @dataclass
 class TemplatePrompt:
@@ -16,6 +36,18 @@ class TemplatePrompt:
     section: str
     template: str
     temperature: float = 0.2
+    depends_on: List[str] = field(default_factory=list)
+    max_tokens: int | None = None
+    schema: Dict[str, Any] | None = None  # see openextract.pipelines.structured
+    
+    def fingerprint(self) -> str:
+        """Hash of the template, sampling settings and schema (see pipelines.fingerprint)."""
+        parts: List[Any] = [self.template, self.temperature, self.max_tokens]
+        # Appended only when present so schema-less prompts keep their fingerprints
+        if self.schema is not None:
+            parts.append(json.dumps(self.schema, sort_keys=True))
+        material = json.dumps(parts)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
     
     def render_input(self, document: Document, context: Dict[str, Any]) -> Dict[str, Any]:
         """Render prompt template with document and context."""
@@ -30,25 +62,39 @@ class TemplatePrompt:
             {"role": "user", "content": rendered}
         ]
         
-        return {
+        payload: Dict[str, Any] = {
             "messages": messages,
             "temperature": self.temperature,
         }
+        if self.max_tokens is not None:
+            payload["max_tokens"] = self.max_tokens
+        return payload
 
 
 class PromptLoader:
     """Load prompts from directory structure."""
     
-    def __init__(self, prompts_dir: str | Path, temperature_overrides: Dict[str, float] | None = None):
+    def __init__(
+        self,
+        prompts_dir: str | Path,
+        temperature_overrides: Dict[str, float] | None = None,
+        depends_on: Dict[str, List[str]] | None = None,
+        max_tokens: int | None = None,
+    ):
         """
         Initialize prompt loader.
         
         Args:
             prompts_dir: Directory containing prompt files
             temperature_overrides: Optional dict mapping prompt names to temperatures
+            depends_on: Optional dict mapping prompt names to the sections they
+                depend on; overrides the dependencies inferred from placeholders
+            max_tokens: Optional completion budget applied to every prompt
         """
         self.prompts_dir = Path(prompts_dir)
         self.temperature_overrides = temperature_overrides or {}
+        self.depends_on = depends_on or {}
+        self.max_tokens = max_tokens
         
         if not self.prompts_dir.exists():
             raise FileNotFoundError(f"Prompts directory not found: {self.prompts_dir}")
@@ -57,6 +103,11 @@ class PromptLoader:
         """
         Load all prompt files from directory.
         
+        Dependencies between prompts are inferred from template placeholders
+        that name another prompt's section, unless given explicitly via
+        ``depends_on``. A ``<name>.schema.json`` file next to a prompt is
+        loaded as its output schema.
+        
         Returns:
             List of TemplatePrompt objects
         """
@@ -73,8 +124,30 @@ class PromptLoader:
                 prompt = self._load_prompt_file(file_path)
                 prompts.append(prompt)
         
+        self._resolve_dependencies(prompts)
         return prompts
     
+    def _resolve_dependencies(self, prompts: List[TemplatePrompt]) -> None:
+        """Fill ``depends_on`` for each prompt from config or placeholders."""
+        sections = {prompt.section for prompt in prompts}
+        for prompt in prompts:
+            if prompt.name in self.depends_on:
+                declared = list(self.depends_on[prompt.name] or [])
+                unknown = [dep for dep in declared if dep not in sections]
+                if unknown:
+                    raise ValueError(
+                        f"Prompt {prompt.name} depends on unknown sections: {unknown}"
+                    )
+                prompt.depends_on = declared
+            else:
+                prompt.depends_on = [
+                    name
+                    for name in template_fields(prompt.template)
+                    if name in sections
+                    and name != prompt.section
+                    and name not in DOCUMENT_FIELDS
+                ]
+    
     def _load_prompt_file(self, file_path: Path) -> TemplatePrompt:
         """Load a single prompt file."""
         name = file_path.stem
@@ -85,9 +158,17 @@ class PromptLoader:
         
         temperature = self.temperature_overrides.get(name, 0.2)
         
+        schema = None
+        schema_path = file_path.with_name(f"{name}.schema.json")
+        if schema_path.exists():
+            with open(schema_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+        
         return TemplatePrompt(
             name=name,
             section=section,
             template=template,
             temperature=temperature,
+            max_tokens=self.max_tokens,
+            schema=schema,
         )
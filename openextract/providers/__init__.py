@@ -1 +1,27 @@
-"""Pipeline package for OpenExtract."""
\ No newline at end of file
+"""Pipeline package for OpenExtract."""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict
+
+# adapter name -> "module:Class"; adapters (and their HTTP stacks) are imported only when used
+PROVIDER_TYPES: Dict[str, str] = {
+    "openai": "openextract.providers.siliconflow:SiliconFlowProvider",
+    "siliconflow": "openextract.providers.siliconflow:SiliconFlowProvider",
+}
+
+# Adapter used when ``providers.<name>`` does not set ``adapter``
+DEFAULT_ADAPTER = "openai"
+
+
+def provider_class(adapter: str) -> Any:
+    """
+    Import and return the provider class registered as ``adapter``.
+
+    Raises:
+        ValueError: If ``adapter`` is not a known adapter name
+    """
+    if adapter not in PROVIDER_TYPES:
+        raise ValueError(f"Unsupported provider adapter: {adapter}")
+    module_name, class_name = PROVIDER_TYPES[adapter].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
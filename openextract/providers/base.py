@@ -21,6 +21,10 @@ class ProviderConfig:
     sleep_seconds: float = 0.0
     timeout: float = 120.0
     think_mode: bool | None = None
+    pool_size: int | None = None  # defaults to ``concurrency``
+    rpm: int | None = None  # requests/minute; defaults to 60 / sleep_seconds
+    tpm: int | None = None  # estimated tokens/minute
+    stream: bool = False  # read SSE and stop at the first complete JSON value
 
 
 class Provider(Protocol):
@@ -42,3 +46,6 @@ class Provider(Protocol):
         prepared = self.prepare_payload(payload)
         response = self.dispatch(prepared)
         return self.parse_response(response)
+
+    def close(self) -> None:
+        """Release pooled connections and other resources held by the adapter."""
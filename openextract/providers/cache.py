@@ -0,0 +1,284 @@
+"""Persistent, content-addressed response cache for provider calls.
+
+The cache sits between ``BasePipeline`` and a concrete provider. Entries are
+keyed by a hash of everything that determines the model output: provider
+name, model, the fully prepared request payload and the prompt template.
+Raw provider responses are stored in SQLite so that reruns of unchanged work
+never reach the network.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from openextract.providers.base import Provider
+
+CACHE_MODES = ("readwrite", "read", "write", "off")
+
+
+def normalize_cache_mode(mode: Any) -> str:
+    """Map YAML booleans (an unquoted ``off`` loads as ``False``) to cache modes."""
+    if isinstance(mode, bool):
+        return "readwrite" if mode else "off"
+    return str(mode)
+
+
+@dataclass
+class CacheConfig:
+    """Settings for ``ResponseCache``."""
+
+    path: str = ".openextract/cache.sqlite"
+    mode: str = "readwrite"
+    max_entries: int | None = None
+    max_bytes: int | None = 512 * 1024 * 1024
+    max_age_seconds: float | None = None
+    evict_every: int = 200  # run eviction after this many writes
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CacheConfig":
+        """Build from a YAML ``cache`` block (``max_age_days`` is accepted)."""
+        config = cls(
+            path=data.get("path", cls.path),
+            mode=normalize_cache_mode(data.get("mode", cls.mode)),
+            max_entries=data.get("max_entries", cls.max_entries),
+            max_bytes=data.get("max_bytes", cls.max_bytes),
+            max_age_seconds=data.get("max_age_seconds", cls.max_age_seconds),
+        )
+        if data.get("max_age_days") is not None:
+            config.max_age_seconds = float(data["max_age_days"]) * 86400
+        if config.mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported cache mode: {config.mode} (expected one of {CACHE_MODES})")
+        return config
+
+
+def cache_key(
+    provider_name: str,
+    model: str,
+    payload: Dict[str, Any],
+    template: str | None = None,
+) -> str:
+    """Return the content hash identifying one provider request."""
+    material = json.dumps(
+        {
+            "provider": provider_name,
+            "model": model,
+            "payload": payload,
+            "template": template,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with size/age limits and LRU eviction."""
+
+    def __init__(self, config: CacheConfig):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            config: Cache location, mode and limits
+        """
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        path = Path(config.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+
+    @property
+    def readable(self) -> bool:
+        return self.config.mode in ("readwrite", "read")
+
+    @property
+    def writable(self) -> bool:
+        return self.config.mode in ("readwrite", "write")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for ``key`` or ``None``."""
+        if not self.readable:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a raw provider response under ``key``."""
+        if not self.writable:
+            return
+        value = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self.writes += 1
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.config.evict_every:
+                self._evict_locked(now)
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones over the limits."""
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        max_age = self.config.max_age_seconds
+        return max_age is not None and now - created_at > max_age
+
+    def _evict_locked(self, now: float) -> None:
+        self._writes_since_evict = 0
+        conn = self._conn
+        if self.config.max_age_seconds is not None:
+            cursor = conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.config.max_age_seconds,),
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        if self.config.max_entries is not None:
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            excess = count - self.config.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+        if self.config.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.config.max_bytes:
+                to_free = total - self.config.max_bytes
+                freed = 0
+                doomed = []
+                for key, size in conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= to_free:
+                        break
+                conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for the run summary."""
+        return {
+            "mode": self.config.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Apply limits one last time and close the database."""
+        with self._lock:
+            if self.writable:
+                self._evict_locked(time.time())
+            self._conn.close()
+
+
+class CachedProvider:
+    """Provider wrapper that serves repeated requests from a ``ResponseCache``."""
+
+    def __init__(self, inner: Provider, cache: ResponseCache):
+        """
+        Wrap a provider with a response cache.
+
+        Args:
+            inner: Provider performing the actual requests
+            cache: Opened response cache
+        """
+        self.inner = inner
+        self.cache = cache
+        self.config = inner.config
+
+    def __enter__(self) -> "CachedProvider":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def prepare_payload(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.inner.prepare_payload(prompt_payload)
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.inner.dispatch(payload)
+
+    def parse_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return self.inner.parse_response(response)
+
+    def invoke(self, prompt, document, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve from cache when possible, otherwise dispatch and store."""
+        prepared = self.inner.prepare_payload(payload)
+        key = cache_key(
+            self.config.name,
+            self.config.model,
+            prepared,
+            getattr(prompt, "template", None),
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self.inner.parse_response(cached)
+
+        response = self.inner.dispatch(prepared)
+        parsed = self.inner.parse_response(response)
+        # Only responses that parse are worth replaying
+        self.cache.put(key, response)
+        return parsed
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return counters of this wrapper and any wrapped provider."""
+        inner_stats = getattr(self.inner, "stats", None)
+        return {**(inner_stats() if inner_stats else {}), "cache": self.cache.stats()}
+
+    def close(self) -> None:
+        self.cache.close()
+        self.inner.close()
@@ -0,0 +1,70 @@
+"""Exception hierarchy for provider failures.
+
+Adapters raise these instead of bare ``RuntimeError`` so that the retry
+layer can tell transient failures (timeouts, 5xx, 429) from permanent ones
+(other 4xx, 501, 505). All of them still subclass ``RuntimeError`` for
+callers that catch the old type.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+# Statuses that usually succeed when retried
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+# Server errors that repeat for the same request (method or protocol unsupported)
+PERMANENT_SERVER_STATUSES = frozenset({501, 505})
+
+
+class ProviderError(RuntimeError):
+    """Base class for provider request failures."""
+
+    retryable = False
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        body: Optional[str] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.body = body
+
+
+class TransientProviderError(ProviderError):
+    """Failure that is expected to go away (5xx, connection reset, ...)."""
+
+    retryable = True
+
+
+class RateLimitError(TransientProviderError):
+    """HTTP 429: the provider asked us to slow down."""
+
+
+class ProviderTimeoutError(TransientProviderError):
+    """The request timed out before a response arrived."""
+
+
+class PermanentProviderError(ProviderError):
+    """Failure that will repeat if retried unchanged (auth, bad request, ...)."""
+
+
+def error_for_status(
+    status_code: int,
+    message: str,
+    retry_after: Optional[float] = None,
+    body: Optional[str] = None,
+) -> ProviderError:
+    """Build the matching ``ProviderError`` subclass for an HTTP status."""
+    if status_code == 429:
+        cls: type[ProviderError] = RateLimitError
+    elif status_code in RETRYABLE_STATUSES or (
+        status_code >= 500 and status_code not in PERMANENT_SERVER_STATUSES
+    ):
+        cls = TransientProviderError
+    else:
+        cls = PermanentProviderError
+    return cls(message, status_code=status_code, retry_after=retry_after, body=body)
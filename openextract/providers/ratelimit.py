@@ -0,0 +1,235 @@
+"""Shared token-bucket rate limiting for provider adapters.
+
+Limiters are keyed by endpoint and API key and shared by every provider
+instance and thread in the process, so several pipelines (or several
+providers pointing at the same account) draw from one budget. Each limiter
+enforces requests per minute and estimated tokens per minute, and honours
+``Retry-After`` / ``x-ratelimit-*`` headers returned by the API.
+"""
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+class TokenBucket:
+    """Token bucket that allows going into debt.
+
+    ``reserve`` always succeeds and returns how long the caller must wait
+    before its reservation is covered, so concurrent callers queue up in
+    reservation order without polling. Not thread-safe on its own; the
+    owning ``RateLimiter`` serializes access.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` and return the seconds until it is available."""
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def credit(self, amount: float, now: float) -> None:
+        """Return (or, if negative, take) ``amount`` without waiting."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` would be available, without taking it."""
+        self._refill(now)
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def drain_to(self, remaining: float, now: float) -> None:
+        """Lower the level to what the server reports as remaining."""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one endpoint/key."""
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        burst_seconds: float = 1.0,
+        request_burst: Optional[float] = None,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            rpm: Requests per minute (None disables the request budget)
+            tpm: Estimated tokens per minute (None disables the token budget)
+            burst_seconds: Bucket capacity expressed in seconds of refill
+            request_burst: Explicit request bucket capacity (1 = strict pacing)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self.requests = (
+            TokenBucket(rpm, request_burst or max(1.0, rpm / 60.0 * burst_seconds))
+            if rpm
+            else None
+        )
+        self.tokens = TokenBucket(tpm, max(1.0, tpm / 60.0 * burst_seconds)) if tpm else None
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request of ``tokens`` estimated tokens may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._blocked_until - now, 0.0)
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def ready_in(self, tokens: int = 0) -> float:
+        """
+        Seconds an ``acquire(tokens)`` issued now would wait, without reserving.
+
+        Lets callers compare the remaining headroom of several limiters.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._blocked_until - now, 0.0)
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_for(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.wait_for(tokens, now))
+        return wait
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Correct the token budget once the real usage is known."""
+        if self.tokens is None or not actual:
+            return
+        with self._lock:
+            self.tokens.credit(estimated - actual, time.monotonic())
+
+    def penalize(self, seconds: float) -> None:
+        """Pause all callers for ``seconds`` (e.g. from a 429 ``Retry-After``)."""
+        with self._lock:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Sync the buckets with rate-limit headers from a response.
+
+        Understands ``Retry-After`` and the OpenAI-style
+        ``x-ratelimit-remaining-{requests,tokens}`` /
+        ``x-ratelimit-reset-{requests,tokens}`` headers.
+
+        Returns:
+            The ``Retry-After`` delay in seconds, if the response carried one
+        """
+        retry_after = parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+        now = time.monotonic()
+        with self._lock:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = _to_float(headers.get(f"x-ratelimit-remaining-{kind}"))
+                if remaining is None:
+                    continue
+                if bucket is not None:
+                    bucket.drain_to(remaining, now)
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if remaining <= 0 and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "throttled": self.throttled,
+        }
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse ``"20ms"``, ``"1.5s"``, ``"6m0s"`` or a bare number of seconds."""
+    if not value:
+        return None
+    number = _to_float(value)
+    if number is not None:
+        return number
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    seconds = _to_float(value)
+    if seconds is not None:
+        return max(seconds, 0.0)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_key(api_base: str, api_key: str) -> str:
+    """Key identifying one quota: endpoint plus a digest of the API key."""
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return f"{api_base.rstrip('/')}#{digest}"
+
+
+def shared_limiter(key: str, **kwargs: Any) -> RateLimiter:
+    """
+    Return the process-wide limiter for ``key``, creating it on first use.
+
+    Later callers share the first limiter's budgets; ``kwargs`` are the
+    ``RateLimiter`` arguments used when it is created.
+    """
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = _LIMITERS[key] = RateLimiter(**kwargs)
+        return limiter
@@ -0,0 +1,251 @@
+"""Retry policy and circuit breaker around provider dispatch.
+
+``RetryingProvider`` wraps any provider and re-sends failed requests with
+exponential backoff and full jitter. A per-provider ``CircuitBreaker``
+pauses dispatch while the recent error rate is high, instead of letting
+every worker pile up timeouts against a struggling endpoint.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, Optional
+
+from openextract.providers.base import Provider
+from openextract.providers.errors import (
+    RETRYABLE_STATUSES,
+    ProviderError,
+    RateLimitError,
+)
+
+
+@dataclass
+class RetryPolicy:
+    """Which failures to retry and how long to wait between attempts."""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: RETRYABLE_STATUSES)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetryPolicy":
+        """Build from a YAML ``retry`` block."""
+        policy = cls()
+        for key in ("max_retries", "base_delay", "max_delay"):
+            if data.get(key) is not None:
+                setattr(policy, key, type(getattr(policy, key))(data[key]))
+        if data.get("retry_statuses") is not None:
+            policy.retry_statuses = frozenset(int(code) for code in data["retry_statuses"])
+        return policy
+
+    def should_retry(self, exc: BaseException) -> bool:
+        """Return True if ``exc`` is worth another attempt."""
+        if not isinstance(exc, ProviderError):
+            return False
+        if exc.status_code is not None:
+            return exc.status_code in self.retry_statuses
+        return exc.retryable
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than ``Retry-After``."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker that pauses callers while open.
+
+    Closed: calls pass and outcomes are recorded in a sliding window. When
+    at least ``min_calls`` outcomes are recorded and the failure ratio reaches
+    ``failure_rate`` the breaker opens. Open: callers wait until
+    ``cooldown_seconds`` have passed, then a single probe call is let through
+    (half-open); its success closes the breaker, its failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        cooldown_seconds: float = 30.0,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.opened = 0
+        self.paused_seconds = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CircuitBreaker":
+        """Build from a YAML ``circuit_breaker`` block."""
+        return cls(
+            failure_rate=float(data.get("failure_rate", 0.5)),
+            window=int(data.get("window", 20)),
+            min_calls=int(data.get("min_calls", 10)),
+            cooldown_seconds=float(data.get("cooldown_seconds", 30.0)),
+        )
+
+    def before_call(self) -> None:
+        """Block while the breaker is open or a half-open probe is running."""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.state == "closed":
+                    break
+                if self.state == "open" and now >= self._opened_until:
+                    self.state = "half_open"
+                if self.state == "half_open" and not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    break
+                timeout = self._opened_until - now if self.state == "open" else None
+                self._cond.wait(timeout)
+            waited = time.monotonic() - started
+            self.paused_seconds += waited if waited > 0.001 else 0.0
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self.state == "half_open":
+                self.state = "closed"
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                self._cond.notify_all()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self._outcomes.append(False)
+            if self.state == "half_open":
+                self._open()
+                return
+            if self.state == "closed" and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def record_neutral(self) -> None:
+        """Release a half-open probe whose outcome says nothing about health."""
+        with self._cond:
+            if self.state == "half_open" and self._probe_in_flight:
+                self._probe_in_flight = False
+                self._cond.notify_all()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self.opened += 1
+        self._probe_in_flight = False
+        self._opened_until = time.monotonic() + self.cooldown_seconds
+        self._outcomes.clear()
+        self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "opened": self.opened,
+            "paused_seconds": round(self.paused_seconds, 3),
+        }
+
+
+class RetryingProvider:
+    """Provider wrapper adding retries with backoff and a circuit breaker."""
+
+    def __init__(
+        self,
+        inner: Provider,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Wrap a provider with retry handling.
+
+        Args:
+            inner: Provider performing the actual requests
+            policy: Retry policy (defaults to ``RetryPolicy()``)
+            breaker: Circuit breaker (defaults to ``CircuitBreaker()``)
+        """
+        self.inner = inner
+        self.config = inner.config
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self.gave_up = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RetryingProvider":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def prepare_payload(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.inner.prepare_payload(prompt_payload)
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch with retries; re-raise the last error once exhausted."""
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            error: Optional[BaseException] = None
+            outcome = "neutral"
+            try:
+                response = self.inner.dispatch(payload)
+                outcome = "success"
+            except Exception as exc:
+                error = exc
+                retryable = self.policy.should_retry(exc)
+                # 429s are the rate limiter's job; 4xx say nothing about health
+                if retryable and not isinstance(exc, RateLimitError):
+                    outcome = "failure"
+            finally:
+                # Also runs on KeyboardInterrupt & co., so a half-open probe
+                # slot is always released
+                if outcome == "success":
+                    self.breaker.record_success()
+                elif outcome == "failure":
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_neutral()
+            if error is None:
+                return response
+            if not retryable or attempt >= self.policy.max_retries:
+                if retryable:
+                    with self._lock:
+                        self.gave_up += 1
+                raise error
+            with self._lock:
+                self.retries += 1
+            time.sleep(self.policy.delay(attempt, getattr(error, "retry_after", None)))
+            attempt += 1
+
+    def parse_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return self.inner.parse_response(response)
+
+    def invoke(self, prompt, document, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute full request cycle: prepare -> dispatch (with retries) -> parse."""
+        prepared = self.prepare_payload(payload)
+        response = self.dispatch(prepared)
+        return self.parse_response(response)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return counters of this wrapper and any wrapped provider."""
+        inner_stats = getattr(self.inner, "stats", None)
+        return {
+            **(inner_stats() if inner_stats else {}),
+            "retry": {"retries": self.retries, "gave_up": self.gave_up},
+            "circuit_breaker": self.breaker.stats(),
+        }
+
+    def close(self) -> None:
+        self.inner.close()
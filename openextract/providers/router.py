@@ -0,0 +1,264 @@
+"""Route requests over several backends (keys, endpoints, providers).
+
+``RouterProvider`` implements the provider protocol on top of a pool of
+backends, typically several API keys of one service plus other
+OpenAI-compatible endpoints. Each request goes to a backend chosen at
+random with probability proportional to its current capacity:
+
+* the EWMA of its observed latency and of its error rate,
+* the headroom left in its rate limiter (how long a request would wait),
+* how many of its concurrency slots are already in use.
+
+When a backend fails with a transient error, a 429, an authentication
+error or its ``content_risk_code``, the request fails over to the next best
+backend at once; only when every backend has failed does the error reach
+the caller (normally ``RetryingProvider``). Backends that keep failing are
+benched for a cooldown period.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from openextract.providers.base import Provider, ProviderConfig
+from openextract.providers.errors import ProviderError, RateLimitError
+from openextract.utils.metrics import METRICS
+from openextract.utils.tokens import estimate_messages_tokens
+
+# Statuses that are specific to one key/account, so another backend may succeed
+_KEY_STATUSES = frozenset({401, 402, 403})
+
+BACKEND_FIELD = "_backend"
+
+
+@dataclass
+class RouterConfig:
+    """Settings for ``RouterProvider``."""
+
+    ewma_alpha: float = 0.2  # weight of the newest observation
+    initial_latency: float = 1.0  # seconds assumed before a backend has answered
+    max_consecutive_failures: int = 3  # bench a backend after this many in a row
+    cooldown_seconds: float = 30.0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RouterConfig":
+        """Build from a YAML ``router`` block."""
+        return cls(
+            ewma_alpha=data.get("ewma_alpha", cls.ewma_alpha),
+            initial_latency=data.get("initial_latency", cls.initial_latency),
+            max_consecutive_failures=data.get(
+                "max_consecutive_failures", cls.max_consecutive_failures
+            ),
+            cooldown_seconds=data.get("cooldown_seconds", cls.cooldown_seconds),
+            seed=data.get("seed"),
+        )
+
+
+@dataclass
+class RouterBackend:
+    """One provider in the pool plus its observed health."""
+
+    name: str
+    provider: Provider
+    content_risk_code: Optional[str] = None
+    latency: Optional[float] = None  # EWMA of successful request seconds
+    error_rate: float = 0.0  # EWMA of failures (1) and successes (0)
+    inflight: int = 0
+    requests: int = 0
+    errors: int = 0
+    failovers: int = 0
+    consecutive_failures: int = 0
+    benched_until: float = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self.provider.config.concurrency or 1))
+
+    def ready_in(self, tokens: int) -> float:
+        """Seconds the backend's rate limiter would make a request wait."""
+        limiter = getattr(self.provider, "rate_limiter", None)
+        return limiter.ready_in(tokens) if limiter is not None else 0.0
+
+    def is_content_risk(self, exc: BaseException) -> bool:
+        code = self.content_risk_code
+        if not code:
+            return False
+        return code in str(exc) or code in (getattr(exc, "body", None) or "")
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "failovers": self.failovers,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
+        inner_stats = getattr(self.provider, "stats", None)
+        if inner_stats:
+            for counters in inner_stats().values():
+                stats.update(counters)
+        return stats
+
+
+class RouterProvider:
+    """Provider spreading requests over backends by their current capacity."""
+
+    def __init__(self, backends: List[RouterBackend], config: Optional[RouterConfig] = None):
+        """
+        Initialize router.
+
+        Args:
+            backends: Providers to route over; names must be unique
+            config: EWMA and cooldown settings
+        """
+        if not backends:
+            raise ValueError("RouterProvider needs at least one backend")
+        names = [backend.name for backend in backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate router backend names: {names}")
+        self.backends = backends
+        self.router_config = config or RouterConfig()
+        self._by_name = {backend.name: backend for backend in backends}
+        self._lock = threading.Lock()
+        self._random = random.Random(self.router_config.seed)
+        first = backends[0].provider.config
+        # The pipeline sizes its worker pool from this: every backend's slots
+        self.config = ProviderConfig(
+            name="router",
+            api_base=first.api_base,
+            model="+".join(dict.fromkeys(b.provider.config.model for b in backends)),
+            api_key="",
+            concurrency=sum(backend.concurrency for backend in backends),
+            timeout=max(b.provider.config.timeout for b in backends),
+            think_mode=first.think_mode,
+            # Each backend streams per its own config; this only reports it
+            stream=all(b.provider.config.stream for b in backends),
+        )
+
+    def __enter__(self) -> "RouterProvider":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def prepare_payload(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the prompt payload; each backend prepares it once chosen."""
+        return dict(prompt_payload)
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send ``payload`` to the best backend, failing over on backend errors.
+
+        The raw response is tagged with the backend name under ``_backend``.
+
+        Raises:
+            ProviderError: The last backend's error once every backend failed,
+                or immediately for errors another backend would repeat
+        """
+        tokens = estimate_messages_tokens(payload.get("messages", []))
+        tokens += int(payload.get("max_tokens") or 0)
+        tried: Set[str] = set()
+        while True:
+            backend = self._acquire(tokens, tried)
+            tried.add(backend.name)
+            start = time.perf_counter()
+            try:
+                response = backend.provider.dispatch(backend.provider.prepare_payload(payload))
+            except ProviderError as exc:
+                reason = self._failover_reason(backend, exc)
+                # Only failures that say something about the backend count against it
+                outcome = "failed" if reason in ("transient", "unauthorized") else None
+                self._release(backend, time.perf_counter() - start, outcome)
+                if reason is None or len(tried) == len(self.backends):
+                    raise
+                with self._lock:
+                    backend.failovers += 1
+                METRICS.inc("router_failovers_total", backend=backend.name, reason=reason)
+                continue
+            except BaseException:
+                self._release(backend, time.perf_counter() - start, "failed")
+                raise
+            self._release(backend, time.perf_counter() - start, "ok")
+            METRICS.inc("router_requests_total", backend=backend.name)
+            return {**response, BACKEND_FIELD: backend.name}
+
+    @staticmethod
+    def _failover_reason(backend: RouterBackend, exc: ProviderError) -> Optional[str]:
+        """Why another backend may succeed where ``backend`` failed, if it may."""
+        if backend.is_content_risk(exc):
+            return "content_risk"
+        if isinstance(exc, RateLimitError):
+            return "rate_limited"
+        if exc.retryable:
+            return "transient"
+        if exc.status_code in _KEY_STATUSES:
+            return "unauthorized"
+        return None
+
+    def _acquire(self, tokens: int, exclude: Set[str]) -> RouterBackend:
+        """Pick a backend not in ``exclude`` and take one of its slots."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b.name not in exclude]
+            healthy = [b for b in candidates if b.benched_until <= now] or candidates
+            weights = [self._capacity(backend, tokens) for backend in healthy]
+            backend = self._random.choices(healthy, weights=weights)[0]
+            backend.inflight += 1
+            backend.requests += 1
+        return backend
+
+    def _capacity(self, backend: RouterBackend, tokens: int) -> float:
+        """Expected requests per second the backend can take right now."""
+        latency = backend.latency
+        if latency is None:
+            latency = self.router_config.initial_latency
+        # Each slot in use stretches the expected service time
+        load = 1.0 + backend.inflight / backend.concurrency
+        expected = latency * load + backend.ready_in(tokens)
+        health = (1.0 - min(backend.error_rate, 0.99)) ** 2
+        return health / max(expected, 1e-3)
+
+    def _release(self, backend: RouterBackend, elapsed: float, outcome: Optional[str]) -> None:
+        """Return the slot and fold an ``"ok"``/``"failed"`` outcome into the EWMAs."""
+        alpha = self.router_config.ewma_alpha
+        with self._lock:
+            backend.inflight -= 1
+            if outcome is None:
+                return
+            failed = outcome == "failed"
+            backend.error_rate += alpha * ((1.0 if failed else 0.0) - backend.error_rate)
+            if failed:
+                backend.errors += 1
+                backend.consecutive_failures += 1
+                if backend.consecutive_failures >= self.router_config.max_consecutive_failures:
+                    backend.benched_until = time.monotonic() + self.router_config.cooldown_seconds
+                    backend.consecutive_failures = 0
+                    METRICS.inc("router_benched_total", backend=backend.name)
+                return
+            backend.consecutive_failures = 0
+            if backend.latency is None:
+                backend.latency = elapsed
+            else:
+                backend.latency += alpha * (elapsed - backend.latency)
+
+    def parse_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse with the backend that produced ``response``."""
+        backend = self._by_name.get(response.get(BACKEND_FIELD), self.backends[0])
+        return backend.provider.parse_response(response)
+
+    def invoke(self, prompt, document, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute full request cycle: prepare -> dispatch (routed) -> parse."""
+        return self.parse_response(self.dispatch(self.prepare_payload(payload)))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-backend routing counters for the run summary."""
+        with self._lock:
+            return {f"backend_{backend.name}": backend.stats() for backend in self.backends}
+
+    def close(self) -> None:
+        for backend in self.backends:
+            backend.provider.close()
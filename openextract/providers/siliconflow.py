@@ -1,21 +1,109 @@
 """SiliconFlow provider adapter for OpenExtract."""
 from __future__ import annotations
 
+import json
+import threading
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from openextract.providers.base import Provider, ProviderConfig
+from openextract.providers.errors import (
+    ProviderTimeoutError,
+    TransientProviderError,
+    error_for_status,
+)
+from openextract.providers.ratelimit import RateLimiter, limiter_key, shared_limiter
+from openextract.utils.jsonrepair import loads_lenient
+from openextract.utils.jsonstream import JsonStreamScanner
+from openextract.utils.metrics import METRICS, record_usage, span
+from openextract.utils.tokens import estimate_messages_tokens, estimate_tokens
 
 
 class SiliconFlowProvider:
-    """SiliconFlow API provider implementation."""
+    """SiliconFlow API provider implementation.
+    
+    HTTP connections are pooled per provider instance: every worker thread
+    gets its own ``requests.Session`` (sessions are not thread-safe), but all
+    sessions share a single keep-alive connection pool sized from
+    ``config.pool_size`` or ``config.concurrency``.
+    
+    Requests are paced by a ``RateLimiter`` shared with every other provider
+    using the same endpoint and API key.
+    
+    With ``config.stream`` the completion is read as server-sent events and
+    the connection is closed as soon as a complete JSON value has arrived;
+    output that clearly is not JSON aborts the request early so a retry can
+    start sooner.
+    """
     
     def __init__(self, config: ProviderConfig):
         """Initialize SiliconFlow provider with configuration."""
         self.config = config
-        self._last_request_time = 0.0
+        self.rate_limiter = self._build_rate_limiter(config)
+        self._url = f"{config.api_base}/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {config.api_key}",
+            "Content-Type": "application/json",
+        }
+        pool_size = max(1, config.pool_size or config.concurrency or 1)
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+    
+    @staticmethod
+    def _build_rate_limiter(config: ProviderConfig) -> RateLimiter:
+        """Shared limiter for this endpoint/key from ``rpm``/``tpm``.
+        
+        Without an explicit ``rpm``, ``sleep_seconds`` keeps its old meaning
+        of a minimum gap between requests (strict pacing, no burst).
+        """
+        rpm: float | None = config.rpm
+        request_burst = None
+        if rpm is None and config.sleep_seconds > 0:
+            rpm = 60.0 / config.sleep_seconds
+            request_burst = 1.0
+        return shared_limiter(
+            limiter_key(config.api_base, config.api_key),
+            rpm=rpm,
+            tpm=config.tpm,
+            request_burst=request_burst,
+        )
+    
+    def __enter__(self) -> "SiliconFlowProvider":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def _session(self) -> requests.Session:
+        """Return the calling thread's session, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            session.headers.update(self._headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return rate-limiter counters for the run summary."""
+        return {"rate_limit": self.rate_limiter.stats()}
+    
+    def close(self) -> None:
+        """Close every session and drain the shared connection pool."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+        self._local = threading.local()
     
     def prepare_payload(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare payload for SiliconFlow API."""
@@ -33,45 +121,166 @@ class SiliconFlowProvider:
             payload["stream"] = False
             payload["response_format"] = {"type": "json_object"}
         
+        if self.config.stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        
         return payload
     
     def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Execute HTTP request to SiliconFlow API."""
-        # Rate limiting
-        if self.config.sleep_seconds > 0:
-            elapsed = time.time() - self._last_request_time
-            if elapsed < self.config.sleep_seconds:
-                time.sleep(self.config.sleep_seconds - elapsed)
+        # Rate limiting: prompt tokens plus the completion budget
+        estimated_tokens = estimate_messages_tokens(payload.get("messages", []))
+        estimated_tokens += int(payload.get("max_tokens") or 0)
+        with span("rate_limit_wait"):
+            self.rate_limiter.acquire(estimated_tokens)
         
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
-        }
+        streaming = bool(payload.get("stream"))
+        sent_at = time.perf_counter()
+        try:
+            with span("http"):
+                response = self._session().post(
+                    self._url,
+                    json=payload,
+                    timeout=self.config.timeout,
+                    stream=streaming,
+                )
+        except requests.exceptions.Timeout as e:
+            raise ProviderTimeoutError(f"SiliconFlow API request timed out: {e}") from e
+        except requests.exceptions.RequestException as e:
+            raise TransientProviderError(f"SiliconFlow API request failed: {e}") from e
         
-        url = f"{self.config.api_base}/chat/completions"
+        # Servers that ignore "stream" answer with a regular JSON body
+        if (
+            streaming
+            and response.status_code < 400
+            and response.headers.get("Content-Type", "").startswith("text/event-stream")
+        ):
+            data = self._read_stream(response, payload, sent_at)
+            usage = data.get("usage") or {}
+            self.rate_limiter.reconcile(estimated_tokens, int(usage.get("total_tokens") or 0))
+            record_usage(usage)
+            return data
         
-        try:
-            response = requests.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=self.config.timeout,
+        retry_after = self.rate_limiter.update_from_headers(response.headers)
+        if response.status_code == 429:
+            # Back off every caller sharing this key, not just this one
+            self.rate_limiter.penalize(retry_after if retry_after is not None else 1.0)
+        if response.status_code >= 400:
+            raise error_for_status(
+                response.status_code,
+                f"SiliconFlow API request failed: HTTP {response.status_code}: {response.text[:500]}",
+                retry_after=retry_after,
+                body=response.text,
             )
-            response.raise_for_status()
-            self._last_request_time = time.time()
-            return response.json()
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise TransientProviderError(f"SiliconFlow API returned invalid JSON: {e}") from e
+        
+        usage = data.get("usage") or {}
+        self.rate_limiter.reconcile(estimated_tokens, int(usage.get("total_tokens") or 0))
+        if usage:
+            record_usage(usage)
+        return data
+    
+    def _read_stream(
+        self,
+        response: requests.Response,
+        payload: Dict[str, Any],
+        sent_at: float,
+    ) -> Dict[str, Any]:
+        """Consume an SSE completion until a complete JSON value arrives.
+        
+        Returns a response shaped like a non-streamed completion. When the
+        connection is closed early, usage is estimated from the received text.
+        Time to first token and time to completion are measured from ``sent_at``.
+        """
+        self.rate_limiter.update_from_headers(response.headers)
+        scanner = JsonStreamScanner()
+        pieces: List[str] = []
+        usage: Optional[Dict[str, Any]] = None
+        finish_reason = None
+        first_token: Optional[float] = None
+        try:
+            with span("stream"):
+                for line in response.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    try:
+                        event = json.loads(data)
+                    except ValueError as e:
+                        raise TransientProviderError(f"SiliconFlow stream sent invalid JSON: {e}") from e
+                    if event.get("usage"):
+                        usage = event["usage"]
+                    for choice in event.get("choices") or []:
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        delta = (choice.get("delta") or {}).get("content")
+                        if not delta:
+                            continue
+                        if first_token is None:
+                            first_token = time.perf_counter()
+                            METRICS.observe("ttft_seconds", first_token - sent_at)
+                        pieces.append(delta)
+                        try:
+                            complete = scanner.feed(delta)
+                        except ValueError as e:
+                            METRICS.inc("stream_aborts_total")
+                            raise TransientProviderError(
+                                f"SiliconFlow stream aborted, output is not JSON: {e}"
+                            ) from e
+                        if complete is not None:
+                            METRICS.inc("stream_early_stops_total")
+                            finish_reason = "stop"
+                            break
+                    if scanner.done:
+                        break
         except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"SiliconFlow API request failed: {e}") from e
+            raise TransientProviderError(f"SiliconFlow stream failed: {e}") from e
+        finally:
+            # Closing mid-stream tells the server to stop generating
+            response.close()
+        METRICS.observe("ttc_seconds", time.perf_counter() - sent_at)
+        
+        content = scanner.value_text if scanner.done else "".join(pieces)
+        if usage is None:
+            prompt_tokens = estimate_messages_tokens(payload.get("messages", []))
+            completion_tokens = estimate_tokens("".join(pieces))
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "estimated": True,
+            }
+        return {
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": usage,
+        }
     
     def parse_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Extract structured result from SiliconFlow response."""
+        with span("parse"):
+            return self._parse_content(response)
+    
+    def _parse_content(self, response: Dict[str, Any]) -> Dict[str, Any]:
         try:
             content = response["choices"][0]["message"]["content"]
             
             # Try to parse as JSON if response_format was json_object
             if self.config.think_mode:
-                import json
-                return json.loads(content)
+                value, repaired = loads_lenient(content)
+                if repaired:
+                    METRICS.inc("output_repairs_total", provider=self.config.name)
+                return value
             
             # Otherwise return as-is wrapped in a dict
             return {"content": content}
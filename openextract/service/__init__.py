@@ -0,0 +1 @@
+"""Long-running extraction service: warm pipeline, micro-batching, HTTP/inbox APIs."""
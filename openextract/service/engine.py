@@ -0,0 +1,259 @@
+"""Micro-batching front end that keeps one pipeline warm.
+
+``ExtractionService`` owns a ``BasePipeline`` built once at startup, so the
+prompts, provider connection pools, rate limiters, response cache and
+dedup index stay warm between requests. Documents submitted from any
+thread are queued; a dispatcher collects them into micro-batches (up to
+``max_batch`` documents, waiting at most ``max_wait_ms`` for the batch to
+fill) and runs each batch through ``BasePipeline.run_iter``, so concurrent
+execution, multi-document batching and scheduling apply across requests.
+Every submitted document gets a ``Future`` for its ``PipelineResult``.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from openextract.pipelines.base import BasePipeline, Document, PipelineResult
+from openextract.utils.metrics import METRICS
+
+
+class ServiceBusy(Exception):
+    """The service queue is full; the caller should retry later."""
+
+
+@dataclass
+class ServiceConfig:
+    """Settings for ``ExtractionService``."""
+
+    max_batch: int = 32  # documents per micro-batch
+    max_wait_ms: float = 20.0  # how long the first arrival waits for others
+    batch_workers: int = 2  # micro-batches running at once
+    max_queue: int = 10000  # queued documents before submissions are refused
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ServiceConfig":
+        """Build from a YAML ``service`` block."""
+        return cls(
+            max_batch=max(1, int(data.get("max_batch", cls.max_batch))),
+            max_wait_ms=float(data.get("max_wait_ms", cls.max_wait_ms)),
+            batch_workers=max(1, int(data.get("batch_workers", cls.batch_workers))),
+            max_queue=max(1, int(data.get("max_queue", cls.max_queue))),
+        )
+
+
+def document_from_dict(data: Dict[str, Any]) -> Document:
+    """
+    Build a ``Document`` from a request object.
+
+    Accepts ``doc_id`` (or ``id``), ``title``, ``content`` (or ``payload``)
+    and ``meta``; a missing ``doc_id`` is generated.
+
+    Raises:
+        ValueError: If ``data`` is not an object
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each document must be a JSON object")
+    doc_id = data.get("doc_id", data.get("id"))
+    return Document(
+        doc_id=str(doc_id) if doc_id is not None else uuid.uuid4().hex,
+        title=str(data.get("title") or ""),
+        payload=str(data.get("content", data.get("payload")) or ""),
+        meta=dict(data.get("meta") or {}),
+    )
+
+
+@dataclass
+class _Job:
+    document: Document
+    future: Future
+    enqueued: float
+
+
+_STOP = object()
+
+
+class ExtractionService:
+    """Queue documents from many callers and run them in micro-batches."""
+
+    def __init__(self, pipeline: BasePipeline, config: Optional[ServiceConfig] = None):
+        """
+        Initialize service (call ``start`` to begin dispatching).
+
+        Args:
+            pipeline: Pipeline kept warm for the service's lifetime
+            config: Batching and queue settings
+        """
+        self.pipeline = pipeline
+        self.config = config or ServiceConfig()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.max_queue)
+        self._slots = threading.BoundedSemaphore(self.config.batch_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.batch_workers,
+            thread_name_prefix="openextract-batch",
+        )
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.documents = 0
+        self.running = 0
+
+    def __enter__(self) -> "ExtractionService":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start(self) -> "ExtractionService":
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name="openextract-dispatch", daemon=True
+        )
+        self._dispatcher.start()
+        return self
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, document: Document) -> "Future[PipelineResult]":
+        """
+        Queue one document.
+
+        Returns:
+            Future resolving to the document's ``PipelineResult``
+
+        Raises:
+            ServiceBusy: If the queue is full or the service is closing
+        """
+        return self.submit_many([document])[0]
+
+    def submit_many(self, documents: List[Document]) -> List["Future[PipelineResult]"]:
+        """
+        Queue several documents, all or none.
+
+        Returns:
+            Futures resolving to the documents' ``PipelineResult``, in order
+
+        Raises:
+            ServiceBusy: If the queue cannot take every document or the
+                service is closing; nothing is queued then
+        """
+        now = time.perf_counter()
+        jobs = [_Job(document, Future(), now) for document in documents]
+        # Only submitters add to the queue, so room checked under the lock stays free
+        with self._submit_lock:
+            if self._closed:
+                raise ServiceBusy("Service is shutting down")
+            free = self.config.max_queue - self._queue.qsize()
+            if len(jobs) > free:
+                METRICS.inc("service_rejected_total", len(jobs))
+                raise ServiceBusy(
+                    f"Queue full ({self.config.max_queue} documents, room for {max(0, free)})"
+                )
+            for job in jobs:
+                self._queue.put_nowait(job)
+        METRICS.set_gauge("service_queue_depth", self._queue.qsize())
+        return [job.future for job in jobs]
+
+    def extract(
+        self,
+        documents: List[Document],
+        timeout: Optional[float] = None,
+    ) -> List[PipelineResult]:
+        """Queue ``documents`` and wait for their results, in the same order."""
+        futures = self.submit_many(documents)
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _dispatch_loop(self) -> None:
+        """Group queued jobs into micro-batches and hand them to batch workers."""
+        max_wait = self.config.max_wait_ms / 1000.0
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + max_wait
+            while len(batch) < self.config.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        job = self._queue.get(timeout=remaining)
+                    else:
+                        job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            METRICS.set_gauge("service_queue_depth", self._queue.qsize())
+            # Waiting for a free worker here leaves later arrivals queued,
+            # where they join the next (fuller) batch
+            self._slots.acquire()
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[_Job]) -> None:
+        """Run one micro-batch and resolve its futures in order."""
+        started = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            self.running += 1
+        # Mean batch size = service_batch_documents_total / service_batches_total
+        METRICS.inc("service_batches_total")
+        METRICS.inc("service_batch_documents_total", len(batch))
+        for job in batch:
+            METRICS.observe("service_queue_seconds", started - job.enqueued)
+        done = 0
+        try:
+            results = self.pipeline.run_iter(job.document for job in batch)
+            for job, result in zip(batch, results):
+                job.future.set_result(result)
+                done += 1
+                METRICS.observe("service_request_seconds", time.perf_counter() - job.enqueued)
+                METRICS.inc("service_documents_total", status="error" if result.errors else "ok")
+        except Exception as exc:
+            for job in batch[done:]:
+                job.future.set_exception(exc)
+            METRICS.inc("service_documents_total", len(batch) - done, status="failed")
+        finally:
+            with self._lock:
+                self.documents += len(batch)
+                self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and throughput counters."""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches_running": self.running,
+                "batches": self.batches,
+                "documents": self.documents,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting documents, finish the queued ones, stop workers."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if self._dispatcher is not None and wait:
+            self._dispatcher.join()
+            # Jobs that raced the shutdown are refused rather than left hanging
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not _STOP:
+                    job.future.set_exception(ServiceBusy("Service is shutting down"))
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,120 @@
+"""Watched inbox directory feeding an ``ExtractionService``.
+
+Upstream systems that cannot call HTTP drop files into the inbox: a
+``.jsonl`` file with one document object per line, or a ``.json`` file with
+one object or a list of them. Each file's results are written to
+``<outbox>/<name>.results.jsonl`` (via a temporary file and a rename, so a
+reader never sees half a file) and the input is moved to ``done/``, or to
+``failed/`` if it cannot be parsed. Files whose name starts with ``.`` are
+ignored, so writers should create ``.name.tmp`` and rename it when done.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from openextract.pipelines.base import Document
+from openextract.service.engine import ExtractionService, ServiceBusy, document_from_dict
+from openextract.utils.metrics import METRICS
+
+INBOX_SUFFIXES = (".json", ".jsonl")
+
+
+def read_documents(path: Path) -> List[Document]:
+    """
+    Parse an inbox file into documents.
+
+    Raises:
+        ValueError: If the file is not valid JSON/JSONL of document objects
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        data = json.loads(text)
+        records = data if isinstance(data, list) else [data]
+    return [document_from_dict(record) for record in records]
+
+
+class InboxWatcher:
+    """Poll a directory and run every new file through the service."""
+
+    def __init__(
+        self,
+        service: ExtractionService,
+        inbox: str | Path,
+        outbox: Optional[str | Path] = None,
+        poll_seconds: float = 1.0,
+    ):
+        """
+        Initialize watcher (call ``start`` to begin polling).
+
+        Args:
+            service: Service the documents are submitted to
+            inbox: Directory to watch
+            outbox: Directory for result files (default: ``<inbox>/results``)
+            poll_seconds: Delay between directory scans
+        """
+        self.service = service
+        self.inbox = Path(inbox)
+        self.outbox = Path(outbox) if outbox is not None else self.inbox / "results"
+        self.poll_seconds = poll_seconds
+        for directory in (self.inbox, self.outbox, self.inbox / "done", self.inbox / "failed"):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "InboxWatcher":
+        self._thread = threading.Thread(target=self._loop, name="openextract-inbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.scan()
+            self._stop.wait(self.poll_seconds)
+
+    def scan(self) -> int:
+        """Process every complete file in the inbox; return how many were handled."""
+        handled = 0
+        for path in sorted(self.inbox.iterdir()):
+            if path.is_file() and path.suffix in INBOX_SUFFIXES and not path.name.startswith("."):
+                self.process(path)
+                handled += 1
+        return handled
+
+    def process(self, path: Path) -> None:
+        """Run one inbox file and write its results to the outbox."""
+        try:
+            documents = read_documents(path)
+        except (OSError, ValueError) as exc:
+            print(f"Inbox: cannot read {path.name}: {exc}")
+            METRICS.inc("service_inbox_files_total", status="failed")
+            path.replace(self.inbox / "failed" / path.name)
+            return
+        # Submit in slices so large files do not overflow the service queue
+        config = self.service.config
+        size = config.max_batch * config.batch_workers
+        results = []
+        try:
+            for start in range(0, len(documents), size):
+                results.extend(self.service.extract(documents[start : start + size]))
+        except ServiceBusy:
+            # Left in place; the next scan tries the whole file again
+            return
+        target = self.outbox / f"{path.stem}.results.jsonl"
+        temporary = self.outbox / f".{target.name}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        os.replace(temporary, target)
+        path.replace(self.inbox / "done" / path.name)
+        METRICS.inc("service_inbox_files_total", status="ok")
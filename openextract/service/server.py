@@ -0,0 +1,270 @@
+"""HTTP (TCP or Unix socket) front end for ``ExtractionService``.
+
+Endpoints:
+
+* ``POST /extract`` - body ``{"documents": [...]}``, a list of documents or
+  a single document object (``doc_id``, ``title``, ``content``, ``meta``).
+  Answers ``{"results": [...]}`` in request order once all are done, or,
+  with ``?stream=1``, one NDJSON line per result as soon as it finishes.
+  A full queue answers 503 with ``Retry-After``.
+* ``GET /metrics`` - Prometheus text of the process-wide metrics
+  (queue depth, queue/request latency, batch sizes, provider timings).
+* ``GET /healthz`` - service counters as JSON.
+
+Run standalone:
+    uv run python -m openextract.service.server --config examples/pipelines/test_extraction.yaml --port 8765
+    uv run python -m openextract.service.server --config pipeline.yaml --unix /tmp/openextract.sock
+    uv run python -m openextract.service.server --config pipeline.yaml --inbox data/inbox
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from openextract.pipelines.base import Document
+from openextract.service.engine import (
+    ExtractionService,
+    ServiceBusy,
+    ServiceConfig,
+    document_from_dict,
+)
+from openextract.utils.metrics import METRICS
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # A socket file left by a previous (crashed) run would fail the bind
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def _parse_documents(body: Any) -> List[Document]:
+    """Accept ``{"documents": [...]}``, a list, or one document object."""
+    if isinstance(body, dict) and "documents" in body:
+        body = body["documents"]
+    records = body if isinstance(body, list) else [body]
+    return [document_from_dict(record) for record in records]
+
+
+class ServiceServer:
+    """Serve an ``ExtractionService`` over HTTP on TCP or a Unix socket."""
+
+    def __init__(
+        self,
+        service: ExtractionService,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: Optional[str] = None,
+    ):
+        """
+        Create (but do not start) the server.
+
+        Args:
+            service: Service handling the documents
+            host: TCP host (ignored with ``unix_socket``)
+            port: TCP port; 0 picks a free one
+            unix_socket: Path of a Unix socket to listen on instead of TCP
+        """
+        self.service = service
+        self.unix_socket = unix_socket
+        # TCP_NODELAY only exists on TCP sockets
+        handler = self._handler_class(tcp=not unix_socket)
+        if unix_socket:
+            self._httpd: Any = UnixHTTPServer(unix_socket, handler)
+        else:
+            self._httpd = ThreadingHTTPServer((host, port), handler)
+            self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "ServiceServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "ServiceServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+
+    def _handler_class(self, tcp: bool = True) -> type:
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = tcp
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                path = urlsplit(self.path).path.rstrip("/")
+                if path == "/metrics":
+                    data = METRICS.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                elif path == "/healthz":
+                    self._send(200, {"status": "ok", **service.stats()})
+                else:
+                    self._send(404, {"error": f"unknown path {self.path}"})
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                url = urlsplit(self.path)
+                if url.path.rstrip("/") != "/extract":
+                    self._send(404, {"error": f"unknown path {self.path}"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    documents = _parse_documents(json.loads(self.rfile.read(length) or b"null"))
+                except ValueError as exc:
+                    self._send(400, {"error": str(exc)})
+                    return
+                try:
+                    futures = service.submit_many(documents)
+                except ServiceBusy as exc:
+                    self._send(503, {"error": str(exc)}, {"Retry-After": "1"})
+                    return
+                stream = parse_qs(url.query).get("stream", ["0"])[0] not in ("0", "false", "")
+                if stream:
+                    self._stream(futures)
+                    return
+                try:
+                    results = [future.result().to_dict() for future in futures]
+                except Exception as exc:
+                    self._send(500, {"error": str(exc)})
+                    return
+                self._send(200, {"results": results})
+
+            def _stream(self, futures: List[Any]) -> None:
+                """Send one NDJSON line per result, in completion order."""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for future in as_completed(futures):
+                    try:
+                        record = future.result().to_dict()
+                    except Exception as exc:
+                        record = {"error": str(exc)}
+                    self._write_chunk(json.dumps(record, ensure_ascii=False) + "\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    """Build the configured pipeline once and serve it until interrupted."""
+    from dotenv import load_dotenv
+
+    from openextract.config import load_config
+    from openextract.factory import build_pipeline
+    from openextract.providers.cache import CACHE_MODES
+    from openextract.service.inbox import InboxWatcher
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Serve an OpenExtract pipeline.")
+    parser.add_argument("--config", required=True, help="Path to pipeline YAML config.")
+    parser.add_argument("--settings", help="Optional path to global settings YAML.")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, help="Override the response cache mode.")
+    parser.add_argument("--host", help="TCP host (default from config or 127.0.0.1).")
+    parser.add_argument("--port", type=int, help="TCP port (default from config or 8765).")
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--inbox", help="Also watch this directory for .json/.jsonl files.")
+    parser.add_argument("--outbox", help="Directory for inbox results (default: <inbox>/results).")
+    parser.add_argument("--no-http", action="store_true", help="Only watch the inbox.")
+    args = parser.parse_args()
+
+    config = load_config(args.config, args.settings)
+    service_config = config.get("pipeline", {}).get("service", config.get("service")) or {}
+    parts = build_pipeline(config, cache_mode=args.cache_mode)
+    service = ExtractionService(parts.pipeline, ServiceConfig.from_dict(service_config)).start()
+
+    server = None
+    if not args.no_http:
+        server = ServiceServer(
+            service,
+            host=args.host or service_config.get("host", "127.0.0.1"),
+            port=args.port if args.port is not None else int(service_config.get("port", 8765)),
+            unix_socket=args.unix or service_config.get("unix_socket"),
+        ).start()
+        print(f"Serving on {server.address} (POST /extract, GET /metrics, GET /healthz)")
+    watcher = None
+    inbox = args.inbox or service_config.get("inbox")
+    if inbox:
+        watcher = InboxWatcher(
+            service,
+            inbox,
+            outbox=args.outbox or service_config.get("outbox"),
+            poll_seconds=float(service_config.get("poll_seconds", 1.0)),
+        ).start()
+        print(f"Watching inbox {watcher.inbox} (results in {watcher.outbox})")
+    if server is None and watcher is None:
+        print("Nothing to serve: --no-http needs --inbox", file=sys.stderr)
+        sys.exit(2)
+
+    def _terminate(*_: Any) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        if server is not None:
+            server.stop()
+        if watcher is not None:
+            watcher.stop()
+        service.close()
+        parts.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,37 @@
 """Data source adapters for OpenExtract."""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict, Optional
+
+# source.type -> "module:Class"; adapters are imported only when used
+SOURCE_TYPES: Dict[str, str] = {
+    "excel": "openextract.sources.excel:ExcelSource",
+    "csv": "openextract.sources.csv:CSVSource",
+    "jsonl": "openextract.sources.jsonl:JSONLSource",
+    "parquet": "openextract.sources.parquet:ParquetSource",
+}
+
+
+def build_source(source_config: Dict[str, Any], max_rows: Optional[int] = None) -> Any:
+    """
+    Instantiate the source adapter described by a pipeline ``source`` block.
+
+    Args:
+        source_config: Mapping with ``type``, ``path`` and adapter options
+        max_rows: Optional limit on number of rows to process
+
+    Returns:
+        An iterable of ``Document`` objects
+
+    Raises:
+        ValueError: If ``type`` is not a known source type
+    """
+    source_type = source_config.get("type")
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f"Unsupported source type: {source_type}")
+
+    module_name, class_name = SOURCE_TYPES[source_type].split(":")
+    source_cls = getattr(importlib.import_module(module_name), class_name)
+    options = {key: value for key, value in source_config.items() if key != "type"}
+    return source_cls(max_rows=max_rows, **options)
@@ -2,15 +2,20 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, Dict, Iterator, Optional, Sequence
 
-import pandas as pd
+from openpyxl import load_workbook
 
-from openextract.pipelines.base import Document
+from openextract.sources.base import TabularSource
 
 
-class ExcelSource:
-    """Read documents from Excel file."""
+class ExcelSource(TabularSource):
+    """Read documents from Excel file.
+    
+    Rows are streamed with openpyxl's read-only mode and only the configured
+    columns are materialized, so memory stays flat regardless of sheet size
+    and ``max_rows`` stops reading early.
+    """
     
     def __init__(
         self,
@@ -20,6 +25,7 @@ class ExcelSource:
         title_column: str = "Title",
         content_column: str = "Content",
         max_rows: Optional[int] = None,
+        meta_columns: Optional[Sequence[str]] = None,
     ):
         """
         Initialize Excel source.
@@ -31,39 +37,51 @@ class ExcelSource:
             title_column: Column name for document title
             content_column: Column name for document content
             max_rows: Optional limit on number of rows to process
+            meta_columns: Optional extra columns to copy into ``Document.meta``
         """
-        self.path = Path(path)
+        super().__init__(
+            path,
+            id_column=id_column,
+            title_column=title_column,
+            content_column=content_column,
+            meta_columns=meta_columns,
+            max_rows=max_rows,
+        )
         self.sheet = sheet
-        self.id_column = id_column
-        self.title_column = title_column
-        self.content_column = content_column
-        self.max_rows = max_rows
-        
-        if not self.path.exists():
-            raise FileNotFoundError(f"Excel file not found: {self.path}")
     
-    def __iter__(self) -> Iterator[Document]:
-        """Yield Document objects from Excel rows."""
-        df = pd.read_excel(
-            self.path,
-            sheet_name=self.sheet,
-            nrows=self.max_rows,
-        )
-        
-        for idx, row in df.iterrows():
-            doc_id = str(row.get(self.id_column, f"row_{idx}"))
-            title = str(row.get(self.title_column, ""))
-            payload = str(row.get(self.content_column, ""))
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield projected rows from the configured sheet."""
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            if isinstance(self.sheet, int):
+                worksheet = workbook.worksheets[self.sheet]
+            else:
+                worksheet = workbook[self.sheet]
+            
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
             
-            # Collect remaining columns as metadata
-            meta: Dict[str, Any] = {}
-            for col in df.columns:
-                if col not in [self.id_column, self.title_column, self.content_column]:
-                    meta[col] = row[col]
+            positions = {
+                str(name).strip(): pos
+                for pos, name in enumerate(header)
+                if name is not None
+            }
+            projection = [
+                (column, positions[column])
+                for column in self.columns
+                if column in positions
+            ]
             
-            yield Document(
-                doc_id=doc_id,
-                title=title,
-                payload=payload,
-                meta=meta,
-            )
+            for row in rows:
+                record = {
+                    column: row[pos] if pos < len(row) else None
+                    for column, pos in projection
+                }
+                # read-only mode can report formatted-but-empty trailing rows
+                if all(value is None for value in record.values()):
+                    continue
+                yield record
+        finally:
+            workbook.close()
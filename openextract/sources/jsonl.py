@@ -0,0 +1,58 @@
+"""JSON Lines data source for OpenExtract."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from openextract.sources.base import TabularSource
+
+
+class JSONLSource(TabularSource):
+    """Stream documents from a JSONL file (one JSON object per line)."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        id_column: str = "Id",
+        title_column: str = "Title",
+        content_column: str = "Content",
+        max_rows: Optional[int] = None,
+        meta_columns: Optional[Sequence[str]] = None,
+        encoding: str = "utf-8",
+    ):
+        """
+        Initialize JSONL source.
+
+        Args:
+            path: Path to JSONL file
+            id_column: Key for document ID
+            title_column: Key for document title
+            content_column: Key for document content
+            max_rows: Optional limit on number of rows to process
+            meta_columns: Optional extra keys to copy into ``Document.meta``
+            encoding: File encoding
+        """
+        super().__init__(
+            path,
+            id_column=id_column,
+            title_column=title_column,
+            content_column=content_column,
+            meta_columns=meta_columns,
+            max_rows=max_rows,
+        )
+        self.encoding = encoding
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield projected objects, skipping blank lines."""
+        columns = self.columns
+        with open(self.path, "r", encoding=self.encoding) as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_no} of {self.path}: {e}") from e
+                yield {column: record.get(column) for column in columns}
@@ -0,0 +1,131 @@
+"""Length-aware document chunking.
+
+Text is split along paragraph boundaries first; only paragraphs that do not
+fit the budget are broken into sentences (Chinese and Western punctuation),
+and only over-long sentences are cut by length. The resulting units are
+packed greedily into chunks of at most ``max_tokens`` estimated tokens, with
+the tail of each chunk repeated at the start of the next as overlap.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional, Tuple
+
+from openextract.pipelines.base import Document, PromptUnit
+from openextract.utils.tokens import estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"(\n[ \t　]*\n\s*)")
+_SENTENCE = re.compile(r"[^。！？!?；;\n]+[。！？!?；;\n”’\"']*|[。！？!?；;\n”’\"']+")
+
+
+def _paragraphs(text: str) -> List[str]:
+    """Split into paragraphs, keeping each separator attached to its paragraph."""
+    parts = _PARAGRAPH_BREAK.split(text)
+    paragraphs = []
+    for i in range(0, len(parts), 2):
+        segment = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
+        if segment:
+            paragraphs.append(segment)
+    return paragraphs
+
+
+def _hard_split(text: str, tokens: int, max_tokens: int) -> List[str]:
+    """Cut ``text`` into roughly equal pieces that each fit ``max_tokens``."""
+    pieces = -(-tokens // max_tokens)
+    size = max(1, -(-len(text) // pieces))
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _units(
+    text: str, max_tokens: int, estimate: Callable[[str], int]
+) -> List[Tuple[str, int]]:
+    """Break text into the largest natural units that fit ``max_tokens``."""
+    units: List[Tuple[str, int]] = []
+    for paragraph in _paragraphs(text):
+        tokens = estimate(paragraph)
+        if tokens <= max_tokens:
+            units.append((paragraph, tokens))
+            continue
+        for sentence in _SENTENCE.findall(paragraph):
+            tokens = estimate(sentence)
+            if tokens <= max_tokens:
+                units.append((sentence, tokens))
+            else:
+                units.extend((piece, estimate(piece)) for piece in _hard_split(sentence, tokens, max_tokens))
+    return units
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    estimate: Callable[[str], int] = estimate_tokens,
+) -> List[str]:
+    """
+    Split ``text`` into token-bounded chunks.
+
+    Args:
+        text: Text to split
+        max_tokens: Upper bound on estimated tokens per chunk
+        overlap_tokens: Estimated tokens repeated from the end of the previous chunk
+        estimate: Token estimator
+
+    Returns:
+        List of chunks (a single chunk if the text already fits)
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if estimate(text) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+    for unit in _units(text, max_tokens, estimate):
+        if current and current_tokens + unit[1] > max_tokens:
+            chunks.append("".join(part for part, _ in current))
+            # Carry over trailing units as overlap, as long as the new unit still fits
+            carried: List[Tuple[str, int]] = []
+            carried_tokens = 0
+            for part in reversed(current):
+                if carried_tokens + part[1] > overlap_tokens:
+                    break
+                if carried_tokens + part[1] + unit[1] > max_tokens:
+                    break
+                carried.insert(0, part)
+                carried_tokens += part[1]
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit[1]
+    if current:
+        chunks.append("".join(part for part, _ in current))
+    return chunks
+
+
+@dataclass
+class TextChunker:
+    """Chunking strategy splitting ``Document.payload`` by token budget."""
+
+    max_tokens: int = 3000
+    overlap_tokens: int = 200
+    sections: Optional[List[str]] = None  # None: chunk for every prompt
+
+    def applies_to(self, prompt: PromptUnit) -> bool:
+        """Return True if ``prompt`` should run per chunk."""
+        return self.sections is None or prompt.section in self.sections
+
+    def split(self, document: Document) -> List[Document]:
+        """Return chunk documents, or ``[document]`` when it already fits."""
+        chunks = chunk_text(document.payload, self.max_tokens, self.overlap_tokens)
+        if len(chunks) == 1:
+            return [document]
+        return [
+            replace(
+                document,
+                doc_id=f"{document.doc_id}#chunk{index}",
+                payload=chunk,
+                meta={**document.meta, "chunk_index": index, "chunk_count": len(chunks)},
+            )
+            for index, chunk in enumerate(chunks)
+        ]
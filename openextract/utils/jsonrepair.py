@@ -0,0 +1,189 @@
+"""Tolerant parsing of JSON produced by language models.
+
+Model output that is meant to be JSON is often almost JSON: wrapped in a
+code fence or a sentence of prose, with a trailing comma, an unescaped
+quote inside a string, or cut off by ``max_tokens`` halfway through an
+array. Repairing such output locally takes microseconds, whereas asking the
+model again takes seconds, so ``loads_lenient`` tries ``json.loads`` first
+and only then extracts and repairs the value.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json|JSON)?[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+# After a quote that really ends a string, the next non-space character is one of these
+_STRING_END_FOLLOWERS = set(",:}]")
+
+
+def strip_fences(text: str) -> str:
+    """Return the body of the first ```-fenced block, or ``text`` unchanged."""
+    match = _FENCE.search(text)
+    if match and match.group(1).strip():
+        return match.group(1)
+    return text
+
+
+def extract_json(text: str) -> Optional[str]:
+    """
+    Cut the first top-level object or array out of surrounding prose.
+
+    The value runs from the first ``{``/``[`` to its matching bracket, or to
+    the end of the text when it is truncated.
+
+    Returns:
+        The candidate JSON text, or ``None`` if no bracket is present
+    """
+    text = strip_fences(text)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return None
+    start = min(starts)
+    depth = 0
+    in_string = escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : index + 1]
+    return text[start:]
+
+
+def _next_significant(text: str, index: int) -> str:
+    for char in text[index:]:
+        if not char.isspace():
+            return char
+    return ""
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the common defects of model-written JSON.
+
+    * trailing commas before ``}``/``]`` are dropped;
+    * quotes inside strings that are not followed by ``, : } ]`` are escaped;
+    * truncated output is closed: an open string is terminated, an
+      incomplete trailing member is dropped and open brackets are closed.
+
+    The result is not guaranteed to parse; callers still run ``json.loads``.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open brackets) right before each top-level comma of a
+    # container, i.e. after the last complete member
+    checkpoints: List[Tuple[int, List[str]]] = []
+    in_string = escape = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                if _next_significant(text, index + 1) in _STRING_END_FOLLOWERS | {""}:
+                    in_string = False
+                else:
+                    out.append("\\")
+            out.append(char)
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if stack and stack[-1] == char:
+                stack.pop()
+            else:
+                continue  # stray closer
+            if not stack:
+                out.append(char)
+                break
+        elif char == ",":
+            checkpoints.append((len(out), list(stack)))
+        out.append(char)
+
+    if not stack and not in_string:
+        return "".join(out)
+
+    # Truncated: close the string and brackets as they are first
+    tail = list(out)
+    if in_string:
+        if escape:
+            tail.pop()
+        tail.append('"')
+    _drop_trailing_comma(tail)
+    candidate = "".join(tail) + "".join(reversed(stack))
+    if _parses(candidate):
+        return candidate
+    # Otherwise the last member is incomplete ("key" / "key": / partial
+    # literal): cut back to the last complete member
+    while checkpoints:
+        length, open_brackets = checkpoints.pop()
+        candidate = "".join(out[:length]) + "".join(reversed(open_brackets))
+        if _parses(candidate):
+            return candidate
+    return candidate
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+
+def _parses(text: str) -> bool:
+    try:
+        json.loads(text, strict=False)
+    except ValueError:
+        return False
+    return True
+
+
+def loads_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parse model output as JSON, repairing it if necessary.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        ``(value, repaired)`` where ``repaired`` tells whether anything beyond
+        plain ``json.loads`` was needed
+
+    Raises:
+        ValueError: If no JSON value can be recovered
+    """
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+    candidate = extract_json(text)
+    if candidate is None:
+        raise ValueError("no JSON object or array in output")
+    try:
+        return json.loads(candidate, strict=False), True
+    except ValueError:
+        pass
+    repaired = repair_json(candidate)
+    try:
+        return json.loads(repaired, strict=False), True
+    except ValueError as e:
+        raise ValueError(f"unrepairable JSON: {e}") from e
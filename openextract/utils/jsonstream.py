@@ -0,0 +1,108 @@
+"""Incremental detection of a complete top-level JSON value in streamed text.
+
+Models asked for JSON often wrap it in prose or code fences and sometimes
+keep generating after the closing brace. ``JsonStreamScanner`` is fed the
+text as it streams in and reports the first complete object or array as
+soon as its closing bracket arrives, so the caller can stop reading. It
+also fails fast when the output clearly is not going to be JSON.
+"""
+from __future__ import annotations
+
+import json
+from typing import List, Optional
+
+_CLOSERS = {"{": "}", "[": "]"}
+# Characters that may appear outside strings inside a JSON value
+_BARE = set("{}[],:-+.0123456789eE \t\r\ntruefalsn")
+
+
+class JsonStreamScanner:
+    """Track bracket depth and string state over streamed chunks."""
+
+    def __init__(self, max_preamble_chars: int = 200):
+        """
+        Initialize scanner.
+
+        Args:
+            max_preamble_chars: How much non-whitespace text may precede the
+                opening bracket before the output is declared invalid
+        """
+        self.max_preamble_chars = max_preamble_chars
+        self.text = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._pos = 0
+        self._preamble = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None
+
+    @property
+    def value_text(self) -> Optional[str]:
+        """Text of the complete JSON value, once ``done``."""
+        if self.start is None or self.end is None:
+            return None
+        return self.text[self.start : self.end]
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Consume the next chunk of streamed text.
+
+        Returns:
+            The complete JSON value text once its closing bracket is seen,
+            otherwise ``None``
+
+        Raises:
+            ValueError: If the text can no longer become a JSON value
+        """
+        if self.done:
+            return self.value_text
+        self.text += chunk
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self.start is None:
+                if char in _CLOSERS:
+                    self.start = index
+                    self._stack.append(_CLOSERS[char])
+                elif not char.isspace():
+                    self._preamble += 1
+                    if self._preamble > self.max_preamble_chars:
+                        raise ValueError(
+                            f"no JSON value within the first {self.max_preamble_chars} characters"
+                        )
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char in "}]":
+                if self._stack.pop() != char:
+                    raise ValueError(f"mismatched {char!r} at offset {index - self.start}")
+                if not self._stack:
+                    self.end = index + 1
+                    self._pos = index + 1
+                    candidate = self.value_text
+                    try:
+                        json.loads(candidate)
+                    except ValueError as e:
+                        raise ValueError(f"streamed JSON is invalid: {e}") from e
+                    return candidate
+            elif char not in _BARE:
+                raise ValueError(f"unexpected {char!r} outside a string at offset {index - self.start}")
+        self._pos = len(text)
+        return None
@@ -0,0 +1,361 @@
+"""In-process metrics: stage timings, token usage and export helpers.
+
+The pipeline, sources and providers report into a process-wide
+``MetricsRegistry`` (``METRICS``):
+
+* ``span(stage)`` times a block into the ``stage_seconds`` histogram
+  (source reads, prompt rendering, in-flight queueing, rate-limit waits,
+  HTTP, response parsing).
+* ``record_usage`` adds the API ``usage`` block of a response to every
+  active ``usage_scope``; the pipeline opens one scope per document and one
+  per provider call, which is how token counts end up per prompt and per
+  document.
+
+The registry renders as Prometheus text or JSON, and can mirror spans to
+OpenTelemetry when ``opentelemetry-api`` is installed.
+"""
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the ``q`` quantile (``max`` past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(q * self.count)
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms."""
+
+    def __init__(self, prefix: str = "openextract", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Create an empty registry.
+
+        Args:
+            prefix: Metric name prefix used by the Prometheus export
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._tracer: Any = None
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add ``value`` to counter ``name``."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set gauge ``name`` to ``value``."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record ``value`` in histogram ``name``."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[None]:
+        """Time the enclosed block into ``stage_seconds{stage=...}``.
+
+        ``attributes`` are only passed on to OpenTelemetry spans; they are not
+        used as metric labels to keep cardinality bounded.
+        """
+        tracer = self._tracer
+        start = time.perf_counter()
+        if tracer is None:
+            try:
+                yield
+            finally:
+                self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+            return
+        with tracer.start_as_current_span(f"{self.prefix}.{stage}", attributes=attributes):
+            try:
+                yield
+            finally:
+                self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def enable_otel(self, tracer_name: str = "openextract") -> None:
+        """Mirror every ``span`` to an OpenTelemetry tracer.
+
+        Raises:
+            ImportError: If ``opentelemetry-api`` is not installed
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetry hooks require opentelemetry-api: pip install opentelemetry-api"
+            ) from e
+        self._tracer = trace.get_tracer(tracer_name)
+
+    def reset(self) -> None:
+        """Drop every recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Current value of one counter series (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def gauge(self, name: str, **labels: Any) -> Optional[float]:
+        """Current value of one gauge series, or ``None`` if never set."""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """One histogram series, or ``None`` if nothing was observed."""
+        with self._lock:
+            return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def series(self, name: str) -> List[Tuple[Dict[str, str], Histogram]]:
+        """Every labelled series of histogram ``name``."""
+        with self._lock:
+            return [(dict(key), hist) for key, hist in self._histograms.get(name, {}).items()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return every series as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(key), **hist.to_dict()} for key, hist in series.items()]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._gauges.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{metric}_bucket{_format_labels(key, le=_format_value(bound))} {cumulative}"
+                        )
+                    lines.append(f"{metric}_bucket{_format_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write Prometheus text for ``.prom``/``.txt`` paths, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + sorted(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + body + "}"
+
+
+METRICS = MetricsRegistry()
+
+
+def span(stage: str, **attributes: Any):
+    """Shortcut for ``METRICS.span``."""
+    return METRICS.span(stage, **attributes)
+
+
+@dataclass
+class TokenUsage:
+    """Accumulated API ``usage`` of one scope (a document or a call)."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    calls: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, usage: Mapping[str, Any]) -> None:
+        prompt = int(usage.get("prompt_tokens") or 0)
+        completion = int(usage.get("completion_tokens") or 0)
+        total = int(usage.get("total_tokens") or 0) or prompt + completion
+        with self._lock:
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            self.total_tokens += total
+            self.calls += 1
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "calls": self.calls,
+        }
+
+
+_usage_scopes: ContextVar[Tuple[TokenUsage, ...]] = ContextVar("openextract_usage_scopes", default=())
+
+
+@contextmanager
+def usage_scope() -> Iterator[TokenUsage]:
+    """Collect the usage reported by every call made inside the block.
+
+    Scopes nest, and worker threads see the scopes of the submitting thread
+    when tasks are submitted through ``contextvars.copy_context().run``.
+    """
+    usage = TokenUsage()
+    token = _usage_scopes.set(_usage_scopes.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _usage_scopes.reset(token)
+
+
+def record_usage(usage: Mapping[str, Any]) -> None:
+    """Add one API ``usage`` block to every active scope."""
+    for scope in _usage_scopes.get():
+        scope.add(usage)
+
+
+def format_profile(registry: MetricsRegistry = METRICS) -> str:
+    """Human-readable stage and token breakdown for ``--profile``."""
+    data = registry.to_dict()
+    lines = [
+        f"{'stage':<18}{'count':>8}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"
+    ]
+    stages = sorted(registry.series("stage_seconds"), key=lambda item: -item[1].sum)
+    for labels, hist in stages:
+        lines.append(
+            f"{labels.get('stage', '?'):<18}{hist.count:>8}{hist.sum:>10.2f}"
+            f"{1000 * hist.sum / hist.count:>10.1f}{1000 * hist.quantile(0.95):>10.1f}"
+            f"{1000 * hist.max:>10.1f}"
+        )
+
+    latency = [
+        (label, hist)
+        for name, label in (("ttft_seconds", "time to first token"), ("ttc_seconds", "time to complete"))
+        for _, hist in registry.series(name)
+    ]
+    if latency:
+        lines.append("")
+        for label, hist in latency:
+            lines.append(
+                f"{label:<22}count={hist.count} mean={1000 * hist.sum / hist.count:.1f}ms "
+                f"p95={1000 * hist.quantile(0.95):.1f}ms"
+            )
+
+    tokens: Dict[str, Dict[str, float]] = {}
+    for entry in data["counters"].get("tokens_total", []):
+        labels = entry["labels"]
+        tokens.setdefault(labels.get("prompt", "?"), {})[labels.get("kind", "?")] = entry["value"]
+    if tokens:
+        lines.append("")
+        lines.append(f"{'prompt':<18}{'calls':>8}{'prompt tok':>12}{'compl tok':>12}")
+        for prompt, kinds in sorted(tokens.items()):
+            calls = registry.counter("prompt_calls_total", prompt=prompt)
+            lines.append(
+                f"{prompt:<18}{int(calls):>8}{int(kinds.get('prompt', 0)):>12}"
+                f"{int(kinds.get('completion', 0)):>12}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,53 @@
+"""Cheap token-count approximation.
+
+A real tokenizer is model specific and slow to load; for rate limiting,
+scheduling and planning a character-class heuristic is good enough. CJK text
+averages roughly 0.6-0.7 tokens per character on common BPE vocabularies,
+while ASCII text averages about four characters per token.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Tuple
+
+NON_ASCII_TOKENS_PER_CHAR = 0.7
+ASCII_CHARS_PER_TOKEN = 4.0
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in ``text``."""
+    if not text:
+        return 0
+    # Encoding with "ignore" counts ASCII characters at C speed
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    non_ascii = len(text) - ascii_chars
+    return int(non_ascii * NON_ASCII_TOKENS_PER_CHAR + ascii_chars / ASCII_CHARS_PER_TOKEN) + 1
+
+
+def count_chars(text: str) -> Tuple[int, int]:
+    """Return ``(ascii_chars, non_ascii_chars)`` of ``text``.
+
+    Counts of several strings add up, so text measured once can be combined
+    with other parts through ``estimate_from_counts`` without rebuilding it.
+    """
+    if not text:
+        return 0, 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars, len(text) - ascii_chars
+
+
+def estimate_from_counts(ascii_chars: int, non_ascii: int) -> int:
+    """``estimate_tokens`` of a text with the given character counts."""
+    if not ascii_chars and not non_ascii:
+        return 0
+    return int(non_ascii * NON_ASCII_TOKENS_PER_CHAR + ascii_chars / ASCII_CHARS_PER_TOKEN) + 1
+
+
+def estimate_messages_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    """Estimate prompt tokens for a chat ``messages`` list."""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        total += MESSAGE_OVERHEAD_TOKENS
+        total += estimate_tokens(content if isinstance(content, str) else str(content or ""))
+    return total
@@ -0,0 +1,75 @@
+"""Result sinks for OpenExtract."""
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from openextract.pipelines.base import PipelineResult
+from openextract.writers.base import ResultFilter
+
+# sink type -> "module:Class"; optional dependencies are imported only when used
+WRITER_TYPES: Dict[str, str] = {
+    "json": "openextract.writers.jsonl:JsonArrayWriter",
+    "jsonl": "openextract.writers.jsonl:JsonlWriter",
+    "parquet": "openextract.writers.parquet:ParquetWriter",
+    "sqlite": "openextract.writers.sqlite:SQLiteWriter",
+}
+
+# file suffix -> "module:function" paging through that sink's results
+READERS: Dict[str, str] = {
+    ".json": "openextract.writers.jsonl:read_results",
+    ".jsonl": "openextract.writers.jsonl:read_results",
+    ".parquet": "openextract.writers.parquet:read_results",
+    ".sqlite": "openextract.writers.sqlite:read_results",
+    ".db": "openextract.writers.sqlite:read_results",
+}
+
+
+def _load(target: str) -> Any:
+    module_name, attribute = target.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def build_writer(sink_config: Dict[str, Any]) -> Any:
+    """
+    Instantiate the writer described by one ``outputs.sinks`` entry.
+
+    Args:
+        sink_config: Mapping with ``type``, ``path`` and writer options
+
+    Returns:
+        A ``ResultWriter``
+
+    Raises:
+        ValueError: If ``type`` is not a known sink type
+    """
+    sink_type = sink_config.get("type")
+    if sink_type not in WRITER_TYPES:
+        raise ValueError(f"Unsupported sink type: {sink_type}")
+    options = {key: value for key, value in sink_config.items() if key != "type"}
+    return _load(WRITER_TYPES[sink_type])(**options)
+
+
+def read_results(
+    path: str | Path,
+    selection: Optional[ResultFilter] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[PipelineResult]:
+    """
+    Page through a result file of any sink, chosen by its suffix.
+
+    Args:
+        path: Result file (``.json``, ``.jsonl``, ``.parquet``, ``.sqlite``/``.db``)
+        selection: Results to return (default: all)
+        offset: Matching results to skip
+        limit: Maximum results to return
+
+    Raises:
+        ValueError: If the suffix belongs to no known sink
+    """
+    suffix = Path(path).suffix
+    if suffix not in READERS:
+        raise ValueError(f"Unsupported result file: {path}")
+    return _load(READERS[suffix])(path, selection, offset=offset, limit=limit)
@@ -0,0 +1,110 @@
+"""Result writer interface.
+
+Writers consume ``PipelineResult`` objects one at a time so that a run can
+stream its output instead of materializing every result first. Sinks that
+can be queried also provide a reader that pages through results matching
+a ``ResultFilter`` without loading the whole file.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from openextract.pipelines.base import PipelineResult
+from openextract.utils.jsonrepair import loads_lenient
+
+
+class ResultWriter(Protocol):
+    """Protocol all result sinks should follow."""
+
+    def write(self, result: PipelineResult) -> None:
+        """Persist one result."""
+
+    def close(self) -> None:
+        """Flush pending output and release the underlying file/connection."""
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def section_fields(value: Any) -> Any:
+    """
+    Return the value a section's fields are read from.
+
+    With ``structured_output.parse`` off a section is stored as
+    ``{"content": <model text>}``; that text is parsed leniently so its
+    fields can be flattened, indexed and filtered like parsed sections.
+
+    Args:
+        value: Section value as stored in ``structured_tags``
+
+    Returns:
+        The parsed JSON value, the raw text if it holds none, or ``value``
+        itself for any other section
+    """
+    if not (isinstance(value, dict) and set(value) == {"content"}):
+        return value
+    content = value["content"]
+    if not isinstance(content, str):
+        return value
+    try:
+        parsed, _ = loads_lenient(content)
+    except ValueError:
+        return content
+    return parsed
+
+
+def value_text(value: Any) -> str:
+    """Text form used to compare a section field with a filter value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+@dataclass
+class ResultFilter:
+    """Selection applied by the result readers (see ``read_results``).
+
+    ``where`` maps ``"<section>.<field>"`` (or just ``"<section>"`` for a
+    section whose value is not an object) to the expected value as text;
+    list values match if any element matches. Sections stored as model text
+    are matched on their parsed fields (see ``section_fields``).
+    """
+
+    doc_ids: Optional[List[str]] = None
+    section: Optional[str] = None  # only results that have this section
+    errors: Optional[bool] = None  # True: only failed results, False: only clean ones
+    where: Dict[str, str] = field(default_factory=dict)
+
+    def fields(self) -> List[Tuple[str, Optional[str], str]]:
+        """``where`` as ``(section, field or None, value)`` triples."""
+        triples = []
+        for key, expected in self.where.items():
+            section, _, name = key.partition(".")
+            triples.append((section, name or None, expected))
+        return triples
+
+    def matches(self, result: PipelineResult) -> bool:
+        """Return True if ``result`` passes every condition."""
+        if self.doc_ids is not None and result.doc_id not in self.doc_ids:
+            return False
+        if self.section is not None and self.section not in result.structured_tags:
+            return False
+        if self.errors is not None and bool(result.errors) != self.errors:
+            return False
+        for section, name, expected in self.fields():
+            value = section_fields(result.structured_tags.get(section))
+            if name is not None:
+                value = value.get(name) if isinstance(value, dict) else None
+            if value is None:
+                return False
+            candidates = value if isinstance(value, list) else [value]
+            if not any(value_text(candidate) == expected for candidate in candidates):
+                return False
+        return True
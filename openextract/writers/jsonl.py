@@ -0,0 +1,133 @@
+"""Streaming JSON and JSONL result writers and their reader."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from openextract.pipelines.base import PipelineResult
+from openextract.writers.base import ResultFilter
+
+
+class JsonlWriter:
+    """Write one JSON object per line, flushing after every record."""
+
+    def __init__(self, path: str | Path, flush: bool = True):
+        """
+        Open a JSONL file for writing.
+
+        Args:
+            path: Output file path (parent directories are created)
+            flush: Flush after each record so the file can be tailed
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush = flush
+        self.count = 0
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, result: PipelineResult) -> None:
+        self._file.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        self.count += 1
+        if self.flush:
+            self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class JsonArrayWriter:
+    """Write results as a JSON array, one element at a time.
+
+    The output matches ``json.dump(results, f, indent=indent)`` but elements
+    are written as they arrive, so memory does not grow with the corpus.
+    """
+
+    def __init__(self, path: str | Path, indent: int | None = 2, flush: bool = True):
+        """
+        Open a JSON file for writing.
+
+        Args:
+            path: Output file path (parent directories are created)
+            indent: Indentation passed to ``json.dumps`` (None for compact)
+            flush: Flush after each record so progress is visible on disk
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.indent = indent
+        self.flush = flush
+        self.count = 0
+        self._prefix = "\n" + " " * indent if indent is not None else ""
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+
+    def __enter__(self) -> "JsonArrayWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, result: PipelineResult) -> None:
+        text = json.dumps(result.to_dict(), ensure_ascii=False, indent=self.indent)
+        if self.indent is not None:
+            text = text.replace("\n", self._prefix)
+        separator = "," if self.count else ""
+        separator += self._prefix if self.indent is not None else (" " if self.count else "")
+        self._file.write(separator + text)
+        self.count += 1
+        if self.flush:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.count and self.indent is not None:
+            self._file.write("\n")
+        self._file.write("]")
+        self._file.close()
+
+
+def read_results(
+    path: str | Path,
+    selection: Optional[ResultFilter] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[PipelineResult]:
+    """
+    Page through a JSONL file (read line by line) or a JSON array file.
+
+    A JSON array has to be parsed as a whole; prefer JSONL, Parquet or
+    SQLite output for large corpora.
+
+    Args:
+        path: ``.jsonl`` or ``.json`` result file
+        selection: Results to return (default: all)
+        offset: Matching results to skip
+        limit: Maximum results to return
+    """
+    selection = selection or ResultFilter()
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            records: Iterable[Dict[str, Any]] = (json.loads(line) for line in f if line.strip())
+        else:
+            records = json.load(f)
+        returned = 0
+        for record in records:
+            result = PipelineResult.from_dict(record)
+            if not selection.matches(result):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            if limit is not None and returned >= limit:
+                return
+            returned += 1
+            yield result
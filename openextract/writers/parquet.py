@@ -0,0 +1,362 @@
+"""Columnar Parquet result sink (requires ``pyarrow``).
+
+Every field of every section becomes its own column, named
+``<section>.<field>`` (sections whose value is not an object get one
+column named after the section), so analytical tools can read just the
+fields they need. Column types are inferred from the first row group:
+booleans, integers, floats, strings and lists of strings keep their type;
+anything else is stored as JSON text. Values that do not fit the inferred
+schema (a new field, or a different type in a later row group) are kept
+in the ``extra`` column as JSON, so no data is lost. Sections stored as
+model text (``{"content": ...}``, with ``structured_output.parse`` off) are
+parsed for their columns, and the text itself is kept in ``raw_sections`` so
+reading the file returns the section as it was written.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from openextract.pipelines.base import PipelineResult
+from openextract.writers.base import ResultFilter, section_fields
+
+# Columns written for every result, before the section columns
+BASE_COLUMNS = (
+    "doc_id",
+    "title",
+    "error_count",
+    "errors",
+    "usage",
+    "duplicate_of",
+    "fingerprints",
+    "raw_sections",
+    "extra",
+)
+_METADATA_KEY = b"openextract"
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401 - makes pyarrow.parquet available
+    except ImportError as e:
+        raise ImportError("Parquet results require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def flatten(result: PipelineResult) -> Dict[Tuple[str, Optional[str]], Any]:
+    """Map ``(section, field)`` (field None for non-object sections) to values."""
+    values: Dict[Tuple[str, Optional[str]], Any] = {}
+    for section, value in result.structured_tags.items():
+        value = section_fields(value)
+        if isinstance(value, dict):
+            for name, field_value in value.items():
+                values[(section, str(name))] = field_value
+        else:
+            values[(section, None)] = value
+    return values
+
+
+def _raw_sections(result: PipelineResult) -> Optional[str]:
+    """JSON object of the sections stored as model text, or None."""
+    texts = {
+        section: value["content"]
+        for section, value in result.structured_tags.items()
+        if section_fields(value) is not value
+    }
+    return json.dumps(texts, ensure_ascii=False) if texts else None
+
+
+def _column_name(section: str, name: Optional[str]) -> str:
+    return section if name is None else f"{section}.{name}"
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "strings"
+    return "json"
+
+
+def _merge_kinds(kinds: set) -> str:
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    if kinds == {"int", "float"}:
+        return "float"
+    return "json"
+
+
+def _fits(kind: str, value: Any) -> bool:
+    actual = _kind(value)
+    return actual == kind or kind == "json" or (kind == "float" and actual == "int")
+
+
+class ParquetWriter:
+    """Buffer results and write them to Parquet one row group at a time."""
+
+    def __init__(self, path: str | Path, row_group_size: int = 10000, compression: str = "zstd"):
+        """
+        Prepare a Parquet file (created on the first flush).
+
+        Args:
+            path: Output file path (parent directories are created)
+            row_group_size: Results buffered per row group
+            compression: Parquet codec (``zstd``, ``snappy``, ``gzip``, ``none``)
+        """
+        self._pa = _import_pyarrow()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.row_group_size = max(1, int(row_group_size))
+        self.compression = compression
+        self.count = 0
+        self._rows: List[PipelineResult] = []
+        self._writer: Any = None
+        self._schema: Any = None
+        # (section, field) -> kind, fixed by the first row group
+        self._columns: Dict[Tuple[str, Optional[str]], str] = {}
+        self._closed = False
+
+    def __enter__(self) -> "ParquetWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, result: PipelineResult) -> None:
+        self._rows.append(result)
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered results as one row group."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        flat = [flatten(result) for result in rows]
+        if self._writer is None:
+            self._open(flat)
+        pa = self._pa
+        columns: Dict[str, List[Any]] = {
+            "doc_id": [result.doc_id for result in rows],
+            "title": [result.title for result in rows],
+            "error_count": [len(result.errors) for result in rows],
+            "errors": [
+                json.dumps(result.errors, ensure_ascii=False) if result.errors else None
+                for result in rows
+            ],
+            "usage": [json.dumps(result.usage) if result.usage else None for result in rows],
+            "duplicate_of": [result.duplicate_of for result in rows],
+            "fingerprints": [
+                json.dumps(result.fingerprints) if result.fingerprints else None
+                for result in rows
+            ],
+            "raw_sections": [_raw_sections(result) for result in rows],
+        }
+        extras: List[Dict[str, Any]] = [{} for _ in rows]
+        for key, kind in self._columns.items():
+            column: List[Any] = []
+            for index, values in enumerate(flat):
+                value = values.pop(key, None)
+                if value is None or not _fits(kind, value):
+                    if value is not None:
+                        extras[index][_column_name(*key)] = value
+                    column.append(None)
+                elif kind == "json":
+                    column.append(json.dumps(value, ensure_ascii=False))
+                elif kind == "float":
+                    column.append(float(value))
+                else:
+                    column.append(value)
+            columns[_column_name(*key)] = column
+        for index, values in enumerate(flat):
+            # Fields first seen after the schema was fixed
+            for key, value in values.items():
+                extras[index][_column_name(*key)] = value
+        columns["extra"] = [
+            json.dumps(extra, ensure_ascii=False) if extra else None for extra in extras
+        ]
+        table = pa.Table.from_pydict(
+            {name: columns[name] for name in self._schema.names}, schema=self._schema
+        )
+        self._writer.write_table(table)
+
+    def _open(self, flat: List[Dict[Tuple[str, Optional[str]], Any]]) -> None:
+        """Infer the schema from the first row group and open the file."""
+        pa = self._pa
+        kinds: Dict[Tuple[str, Optional[str]], set] = {}
+        for values in flat:
+            for key, value in values.items():
+                if value is not None:
+                    kinds.setdefault(key, set()).add(_kind(value))
+        self._columns = {
+            key: _merge_kinds(found)
+            for key, found in kinds.items()
+            # A section named like a base column is kept in ``extra``
+            if _column_name(*key) not in BASE_COLUMNS
+        }
+        types = {
+            "bool": pa.bool_(),
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "string": pa.string(),
+            "strings": pa.list_(pa.string()),
+            "json": pa.string(),
+        }
+        fields = [
+            pa.field("doc_id", pa.string(), nullable=False),
+            pa.field("title", pa.string()),
+            pa.field("error_count", pa.int32()),
+            pa.field("errors", pa.string()),
+            pa.field("usage", pa.string()),
+            pa.field("duplicate_of", pa.string()),
+            pa.field("fingerprints", pa.string()),
+            pa.field("raw_sections", pa.string()),
+            pa.field("extra", pa.string()),
+        ]
+        fields += [pa.field(_column_name(*key), types[kind]) for key, kind in self._columns.items()]
+        metadata = {
+            "columns": [
+                {"section": section, "field": name, "kind": kind}
+                for (section, name), kind in self._columns.items()
+            ]
+        }
+        self._schema = pa.schema(
+            fields, metadata={_METADATA_KEY: json.dumps(metadata, ensure_ascii=False)}
+        )
+        compression = None if self.compression == "none" else self.compression
+        self._writer = pa.parquet.ParquetWriter(
+            str(self.path), self._schema, compression=compression
+        )
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self._writer is None:
+            # No results: still leave a readable (empty) file behind
+            self._open([])
+        self._writer.close()
+
+
+def _rebuild(row: Dict[str, Any], columns: List[Dict[str, Any]]) -> PipelineResult:
+    """Turn one flat Parquet row back into a ``PipelineResult``."""
+    tags: Dict[str, Any] = {}
+    extra = json.loads(row["extra"]) if row.get("extra") else {}
+    texts = json.loads(row["raw_sections"]) if row.get("raw_sections") else {}
+    for column in columns:
+        section, name, kind = column["section"], column["field"], column["kind"]
+        key = _column_name(section, name)
+        value = row.get(key)
+        if value is None:
+            value = extra.pop(key, None)
+        elif kind == "json":
+            value = json.loads(value)
+        if value is None or section in texts:
+            continue
+        if name is None:
+            tags[section] = value
+        else:
+            tags.setdefault(section, {})[name] = value
+    for key, value in extra.items():
+        section, _, name = key.partition(".")
+        if section in texts:
+            continue
+        if name:
+            tags.setdefault(section, {})[name] = value
+        else:
+            tags[section] = value
+    for section, text in texts.items():
+        tags[section] = {"content": text}
+    return PipelineResult(
+        doc_id=row["doc_id"],
+        title=row.get("title") or "",
+        structured_tags=tags,
+        errors=json.loads(row["errors"]) if row.get("errors") else [],
+        usage=json.loads(row["usage"]) if row.get("usage") else {},
+        duplicate_of=row.get("duplicate_of"),
+        fingerprints=json.loads(row["fingerprints"]) if row.get("fingerprints") else {},
+    )
+
+
+def _expression(selection: ResultFilter, columns: List[Dict[str, Any]]) -> Any:
+    """Build the part of ``selection`` Parquet can evaluate while scanning."""
+    import pyarrow.compute as pc
+
+    conditions = []
+    if selection.doc_ids is not None:
+        conditions.append(pc.field("doc_id").isin(selection.doc_ids))
+    if selection.errors is not None:
+        conditions.append(
+            pc.field("error_count") > 0 if selection.errors else pc.field("error_count") == 0
+        )
+    kinds = {_column_name(column["section"], column["field"]): column["kind"] for column in columns}
+    for section, name, expected in selection.fields():
+        key = _column_name(section, name)
+        converters = {"int": int, "float": float, "string": str}
+        if kinds.get(key) in converters:
+            try:
+                conditions.append(pc.field(key) == converters[kinds[key]](expected))
+            except ValueError:
+                pass
+        elif kinds.get(key) == "bool" and expected in ("true", "false"):
+            conditions.append(pc.field(key) == (expected == "true"))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def read_results(
+    path: str | Path,
+    selection: Optional[ResultFilter] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    batch_size: int = 1024,
+) -> Iterator[PipelineResult]:
+    """
+    Page through a Parquet result file, scanning it batch by batch.
+
+    Conditions on ``doc_id``, errors and scalar fields are evaluated by the
+    scanner (skipping row groups whose statistics rule them out); the rest
+    of ``selection`` is checked per result.
+
+    Args:
+        path: Parquet file written by ``ParquetWriter``
+        selection: Results to return (default: all)
+        offset: Matching results to skip
+        limit: Maximum results to return
+        batch_size: Rows decoded at a time
+    """
+    _import_pyarrow()
+    import pyarrow.dataset as ds
+
+    selection = selection or ResultFilter()
+    dataset = ds.dataset(str(path), format="parquet")
+    metadata = dataset.schema.metadata or {}
+    columns = json.loads(metadata.get(_METADATA_KEY, b"{}")).get("columns", [])
+    scanner = dataset.scanner(filter=_expression(selection, columns), batch_size=batch_size)
+    returned = 0
+    for batch in scanner.to_batches():
+        for row in batch.to_pylist():
+            result = _rebuild(row, columns)
+            if not selection.matches(result):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            if limit is not None and returned >= limit:
+                return
+            returned += 1
+            yield result
@@ -0,0 +1,199 @@
+"""Indexed SQLite result sink.
+
+Results go into two tables: ``results`` (one row per document, in output
+order) and ``sections`` (one row per document and section, holding the
+section value as JSON). Both are indexed, so lookups by ``doc_id``, by
+section and by field value (through SQLite's JSON functions) do not scan
+every extraction. Sections stored as model text (``{"content": ...}``) keep
+their parsed value in ``sections.fields``, which is what field conditions
+are evaluated on. Rows are inserted in batched transactions.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+from openextract.pipelines.base import PipelineResult
+from openextract.writers.base import ResultFilter, section_fields
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    seq INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    error_count INTEGER NOT NULL,
+    errors TEXT,
+    usage TEXT,
+    duplicate_of TEXT,
+    fingerprints TEXT
+);
+CREATE INDEX IF NOT EXISTS results_doc_id ON results (doc_id);
+CREATE INDEX IF NOT EXISTS results_errors ON results (error_count);
+CREATE TABLE IF NOT EXISTS sections (
+    seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fields TEXT,
+    PRIMARY KEY (seq, section)
+);
+CREATE INDEX IF NOT EXISTS sections_section ON sections (section, seq);
+"""
+
+
+class SQLiteWriter:
+    """Insert results into an indexed SQLite database in batches."""
+
+    def __init__(self, path: str | Path, batch_size: int = 500):
+        """
+        Create (or overwrite) the result database.
+
+        Args:
+            path: Database file path (parent directories are created)
+            batch_size: Results inserted per transaction
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self.count = 0
+        for stale in (self.path, Path(f"{self.path}-wal"), Path(f"{self.path}-shm")):
+            if stale.exists():
+                stale.unlink()
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._rows: List[Tuple[Any, ...]] = []
+        self._sections: List[Tuple[Any, ...]] = []
+
+    def __enter__(self) -> "SQLiteWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, result: PipelineResult) -> None:
+        seq = self.count
+        self.count += 1
+        self._rows.append(
+            (
+                seq,
+                result.doc_id,
+                result.title,
+                len(result.errors),
+                json.dumps(result.errors, ensure_ascii=False) if result.errors else None,
+                json.dumps(result.usage) if result.usage else None,
+                result.duplicate_of,
+                json.dumps(result.fingerprints) if result.fingerprints else None,
+            )
+        )
+        for position, (section, value) in enumerate(result.structured_tags.items()):
+            fields = section_fields(value)
+            self._sections.append(
+                (
+                    seq,
+                    position,
+                    section,
+                    json.dumps(value, ensure_ascii=False),
+                    None if fields is value else json.dumps(fields, ensure_ascii=False),
+                )
+            )
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert buffered results in one transaction."""
+        if not self._rows:
+            return
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._rows)
+            self._conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?)", self._sections)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        self._rows = []
+        self._sections = []
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+
+def _where(selection: ResultFilter) -> Tuple[str, List[Any]]:
+    """Translate ``selection`` into a SQL condition on ``results r``."""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if selection.doc_ids is not None:
+        conditions.append(f"r.doc_id IN ({', '.join('?' for _ in selection.doc_ids)})")
+        params.extend(selection.doc_ids)
+    if selection.errors is not None:
+        conditions.append("r.error_count > 0" if selection.errors else "r.error_count = 0")
+    if selection.section is not None:
+        conditions.append(
+            "EXISTS (SELECT 1 FROM sections s WHERE s.seq = r.seq AND s.section = ?)"
+        )
+        params.append(selection.section)
+    for section, name, expected in selection.fields():
+        # Field path inside the section value; lists match on any element
+        path = "$" if name is None else '$."' + name.replace('"', '\\"') + '"'
+        conditions.append(
+            """EXISTS (
+                SELECT 1 FROM sections s, json_each(COALESCE(s.fields, s.value), ?) e
+                WHERE s.seq = r.seq AND s.section = ?
+                AND CASE e.type WHEN 'true' THEN 'true' WHEN 'false' THEN 'false'
+                    ELSE CAST(e.value AS TEXT) END = ?
+            )"""
+        )
+        params.extend([path, section, expected])
+    return (" AND ".join(conditions) or "1"), params
+
+
+def read_results(
+    path: str | Path,
+    selection: Optional[ResultFilter] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[PipelineResult]:
+    """
+    Page through a SQLite result database with the filter evaluated in SQL.
+
+    Args:
+        path: Database written by ``SQLiteWriter``
+        selection: Results to return (default: all)
+        offset: Matching results to skip
+        limit: Maximum results to return
+    """
+    selection = selection or ResultFilter()
+    conn = sqlite3.connect(f"file:{Path(path)}?mode=ro", uri=True)
+    try:
+        condition, params = _where(selection)
+        cursor = conn.execute(
+            f"""
+            SELECT r.seq, r.doc_id, r.title, r.errors, r.usage, r.duplicate_of, r.fingerprints
+            FROM results r WHERE {condition}
+            ORDER BY r.seq LIMIT ? OFFSET ?
+            """,
+            [*params, -1 if limit is None else limit, offset],
+        )
+        for seq, doc_id, title, errors, usage, duplicate_of, fingerprints in cursor:
+            sections = conn.execute(
+                "SELECT section, value FROM sections WHERE seq = ? ORDER BY position", (seq,)
+            )
+            yield PipelineResult(
+                doc_id=doc_id,
+                title=title,
+                structured_tags={section: json.loads(value) for section, value in sections},
+                errors=json.loads(errors) if errors else [],
+                usage=json.loads(usage) if usage else {},
+                duplicate_of=duplicate_of,
+                fingerprints=json.loads(fingerprints) if fingerprints else {},
+            )
+    finally:
+        conn.close()
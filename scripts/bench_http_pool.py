@@ -0,0 +1,87 @@
+"""Benchmark pooled keep-alive sessions against per-call ``requests.post``.
+
+Starts a zero-latency ``MockChatServer`` and fires the same number of
+requests through (a) bare ``requests.post`` as the provider used to do and
+(b) ``SiliconFlowProvider.dispatch`` with its pooled sessions, printing
+requests per second for both.
+
+Usage:
+    uv run python scripts/bench_http_pool.py --requests 2000 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import requests
+
+from openextract.bench.mock_server import MockChatServer, MockServerConfig
+from openextract.providers.base import ProviderConfig
+from openextract.providers.siliconflow import SiliconFlowProvider
+
+PAYLOAD = {
+    "model": "stub-model",
+    "messages": [{"role": "user", "content": "ping"}],
+    "temperature": 0.2,
+    "max_tokens": 16,
+}
+
+
+def measure(call: Callable[[], None], total: int, concurrency: int) -> float:
+    """Run ``call`` ``total`` times across ``concurrency`` threads; return req/s."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(call) for _ in range(total)]:
+            future.result()
+    return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = MockChatServer(MockServerConfig(latency_ms=0, latency_distribution="constant")).start()
+    api_base = server.api_base
+
+    config = ProviderConfig(
+        name="stub",
+        api_base=api_base,
+        model="stub-model",
+        api_key="stub-key",
+        concurrency=args.concurrency,
+    )
+
+    def unpooled() -> None:
+        response = requests.post(
+            f"{api_base}/chat/completions",
+            json=PAYLOAD,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=config.timeout,
+        )
+        response.raise_for_status()
+        response.json()
+
+    try:
+        before = measure(unpooled, args.requests, args.concurrency)
+        with SiliconFlowProvider(config) as provider:
+            after = measure(
+                lambda: provider.dispatch(PAYLOAD), args.requests, args.concurrency
+            )
+    finally:
+        server.stop()
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"requests.post (no session): {before:10.1f} req/s")
+    print(f"pooled sessions:            {after:10.1f} req/s")
+    print(f"speedup:                    {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
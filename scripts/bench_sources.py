@@ -0,0 +1,136 @@
+"""Benchmark data sources: rows per second and peak RSS.
+
+Generates a synthetic corpus in every supported format, then reads it back
+with each source adapter (and with the legacy ``pd.read_excel`` +
+``iterrows`` approach for comparison). Every reader runs in a fresh
+subprocess so peak RSS is measured in isolation.
+
+Usage:
+    uv run python scripts/bench_sources.py --rows 20000 --content-chars 2000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from openextract.bench.runner import peak_rss_mb
+
+COLUMNS = ["Id", "Title", "Content", "Source", "PublishDate", "Region", "Url"]
+READERS = ["pandas-legacy", "excel", "csv", "jsonl", "parquet"]
+
+
+def make_rows(count: int, content_chars: int):
+    """Yield synthetic policy-like rows."""
+    rng = random.Random(42)
+    alphabet = "政策通知关于加强管理推进发展实施方案优化营商环境若干措施，。"
+    for i in range(count):
+        length = max(1, int(rng.gauss(content_chars, content_chars / 4)))
+        yield [
+            i + 1,
+            f"关于第{i + 1}号事项的通知",
+            "".join(rng.choice(alphabet) for _ in range(length)),
+            "gov.cn",
+            "2024-01-01",
+            "北京",
+            f"https://example.com/{i + 1}",
+        ]
+
+
+def generate(directory: Path, rows: int, content_chars: int) -> None:
+    """Write the same synthetic corpus as xlsx, csv, jsonl and (if possible) parquet."""
+    from openpyxl import Workbook
+
+    data = list(make_rows(rows, content_chars))
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(COLUMNS)
+    for row in data:
+        sheet.append(row)
+    workbook.save(directory / "corpus.xlsx")
+
+    with open(directory / "corpus.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(data)
+
+    with open(directory / "corpus.jsonl", "w", encoding="utf-8") as f:
+        for row in data:
+            f.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return
+    table = pa.table({column: [row[i] for row in data] for i, column in enumerate(COLUMNS)})
+    pq.write_table(table, directory / "corpus.parquet")
+
+
+def measure(reader: str, directory: Path) -> None:
+    """Read the corpus with one reader and print a JSON result line."""
+    start = time.perf_counter()
+    count = 0
+    if reader == "pandas-legacy":
+        import pandas as pd
+
+        df = pd.read_excel(directory / "corpus.xlsx", sheet_name=0)
+        for idx, row in df.iterrows():
+            str(row.get("Id", f"row_{idx}"))
+            str(row.get("Title", ""))
+            str(row.get("Content", ""))
+            {col: row[col] for col in df.columns if col not in ["Id", "Title", "Content"]}
+            count += 1
+    else:
+        from openextract.sources import build_source
+
+        extension = {"excel": "xlsx"}.get(reader, reader)
+        source = build_source({"type": reader, "path": str(directory / f"corpus.{extension}")})
+        for _ in source:
+            count += 1
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"reader": reader, "rows": count, "seconds": elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--content-chars", type=int, default=2000)
+    parser.add_argument("--readers", nargs="+", default=READERS, choices=READERS)
+    parser.add_argument("--measure", nargs=2, metavar=("READER", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], Path(args.measure[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        print(f"Generating {args.rows} rows (~{args.content_chars} chars each)...")
+        generate(directory, args.rows, args.content_chars)
+
+        print(f"{'reader':<15}{'rows':>10}{'rows/s':>12}{'peak RSS MB':>14}")
+        for reader in args.readers:
+            if reader == "parquet" and not (directory / "corpus.parquet").exists():
+                print(f"{reader:<15}{'skipped (pyarrow not installed)':>36}")
+                continue
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", reader, str(directory)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rate = result["rows"] / result["seconds"] if result["seconds"] else float("inf")
+            print(f"{reader:<15}{result['rows']:>10}{rate:>12.0f}{result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
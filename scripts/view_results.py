@@ -1,48 +1,112 @@
-"""Display test results in a readable format."""
+"""Display test results in a readable format.
+
+Reads any result sink (``.json``, ``.jsonl``, ``.parquet``, ``.sqlite``) one
+page at a time, so large outputs are never loaded whole:
+
+    python scripts/view_results.py output/test_results/results.parquet --limit 10 --offset 20
+    python scripts/view_results.py output/test_results/results.sqlite --errors
+    python scripts/view_results.py results.sqlite --where policy_extract.文档类型=通知
+"""
+import argparse
 import json
 from pathlib import Path
 
-results_file = Path("output/test_results/results.json")
+from openextract.utils.jsonrepair import loads_lenient
+from openextract.writers import read_results
+from openextract.writers.base import ResultFilter
 
-if not results_file.exists():
-    print("❌ Results file not found!")
-    exit(1)
 
-with open(results_file, "r", encoding="utf-8") as f:
-    results = json.load(f)
+def print_result(index, result):
+    print(f"📄 文档 {index}: {result.title}")
+    print(f"   ID: {result.doc_id}")
 
-print(f"{'='*70}")
-print(f"测试结果汇总 - 共处理 {len(results)} 篇文档")
-print(f"{'='*70}\n")
-
-for i, result in enumerate(results, 1):
-    print(f"📄 文档 {i}: {result['title']}")
-    print(f"   ID: {result['doc_id']}")
-    
-    if result['errors']:
-        print(f"   ⚠️  错误: {result['errors']}")
+    if result.errors:
+        print(f"   ⚠️  错误: {result.errors}")
     else:
         print(f"   ✓ 处理成功")
-    
+
     print(f"\n   提取结果:")
-    for section, data in result['structured_tags'].items():
+    for section, data in result.structured_tags.items():
         print(f"   [{section}]")
-        if isinstance(data, dict) and 'content' in data:
-            # Try to parse nested JSON
+        nested = data
+        if isinstance(data, dict) and set(data) == {'content'}:
+            # Raw model output: repair fences, trailing commas and truncation
             try:
-                nested = json.loads(data['content'])
-                for key, value in nested.items():
-                    if isinstance(value, list):
-                        print(f"     • {key}:")
-                        for item in value:
-                            print(f"       - {item}")
-                    else:
-                        print(f"     • {key}: {value}")
-            except:
+                nested, _ = loads_lenient(data['content'])
+            except ValueError:
                 print(f"     {data['content']}")
+                continue
+        if isinstance(nested, dict):
+            for key, value in nested.items():
+                if isinstance(value, list):
+                    print(f"     • {key}:")
+                    for item in value:
+                        print(f"       - {item}")
+                else:
+                    print(f"     • {key}: {value}")
         else:
-            print(f"     {json.dumps(data, ensure_ascii=False, indent=6)}")
-    
+            print(f"     {json.dumps(nested, ensure_ascii=False, indent=6)}")
+
     print(f"\n{'-'*70}\n")
 
-print(f"✅ 测试完成！结果已保存至: {results_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Page through OpenExtract results.")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default="output/test_results/results.json",
+        help="Result file: .json, .jsonl, .parquet or .sqlite/.db.",
+    )
+    parser.add_argument("--offset", type=int, default=0, help="Matching results to skip.")
+    parser.add_argument("--limit", type=int, default=20, help="Results to show (0 for all).")
+    parser.add_argument("--doc-id", action="append", help="Only these doc_ids (repeatable).")
+    parser.add_argument("--section", help="Only results that have this section.")
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument("--errors", action="store_true", help="Only results with errors.")
+    status.add_argument("--ok", action="store_true", help="Only results without errors.")
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="SECTION.FIELD=VALUE",
+        help="Only results whose field equals VALUE (any element for lists; repeatable).",
+    )
+    args = parser.parse_args()
+
+    results_file = Path(args.path)
+    if not results_file.exists():
+        print("❌ Results file not found!")
+        exit(1)
+
+    where = {}
+    for condition in args.where:
+        key, separator, value = condition.partition("=")
+        if not separator:
+            parser.error(f"--where expects SECTION.FIELD=VALUE, got {condition!r}")
+        where[key] = value
+    selection = ResultFilter(
+        doc_ids=args.doc_id,
+        section=args.section,
+        errors=True if args.errors else (False if args.ok else None),
+        where=where,
+    )
+
+    print(f"{'='*70}")
+    print(f"测试结果 - {results_file}（从第 {args.offset + 1} 条起）")
+    print(f"{'='*70}\n")
+
+    shown = 0
+    for result in read_results(
+        results_file, selection, offset=args.offset, limit=args.limit or None
+    ):
+        shown += 1
+        print_result(args.offset + shown, result)
+
+    print(f"✅ 共显示 {shown} 篇文档")
+    if args.limit and shown == args.limit:
+        print(f"   下一页: --offset {args.offset + shown}")
+
+
+if __name__ == "__main__":
+    main()